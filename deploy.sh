@@ -37,7 +37,7 @@ echo "🎉 Deployment complete!"
 echo ""
 echo "🚀 To start the server:"
 echo "   source backend_venv/bin/activate"
-echo "   python server.py"
+echo "   python start_server.py"
 echo ""
 echo "🌐 Then open: http://localhost:3000"
 echo ""
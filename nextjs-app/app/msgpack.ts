@@ -0,0 +1,218 @@
+// Minimal MessagePack codec for the server's binary framing (set_role with
+// encoding: "msgpack"). Covers nil, booleans, numbers, strings, binary,
+// arrays and maps; extension types are not used by the protocol.
+
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
+export function encode(value: unknown): Uint8Array {
+  const bytes: number[] = [];
+  write(bytes, value);
+  return new Uint8Array(bytes);
+}
+
+function pushUint(bytes: number[], value: number, size: number) {
+  for (let shift = (size - 1) * 8; shift >= 0; shift -= 8) {
+    bytes.push(Math.floor(value / Math.pow(2, shift)) & 0xff);
+  }
+}
+
+// Header of a length-prefixed type: the fix form when it fits, else an
+// 8-, 16- or 32-bit length after the type byte (null: no 8-bit form)
+function writeLength(
+  bytes: number[],
+  length: number,
+  fixBase: number,
+  fixLimit: number,
+  codes: [number | null, number, number]
+) {
+  if (length < fixLimit) {
+    bytes.push(fixBase | length);
+  } else if (codes[0] !== null && length < 0x100) {
+    bytes.push(codes[0], length);
+  } else if (length < 0x10000) {
+    bytes.push(codes[1]);
+    pushUint(bytes, length, 2);
+  } else {
+    bytes.push(codes[2]);
+    pushUint(bytes, length, 4);
+  }
+}
+
+function write(bytes: number[], value: unknown) {
+  if (value === null || value === undefined) {
+    bytes.push(0xc0);
+  } else if (typeof value === "boolean") {
+    bytes.push(value ? 0xc3 : 0xc2);
+  } else if (typeof value === "number") {
+    writeNumber(bytes, value);
+  } else if (typeof value === "string") {
+    const utf8 = textEncoder.encode(value);
+    writeLength(bytes, utf8.length, 0xa0, 32, [0xd9, 0xda, 0xdb]);
+    for (let i = 0; i < utf8.length; i++) bytes.push(utf8[i]);
+  } else if (value instanceof Uint8Array) {
+    writeLength(bytes, value.length, 0, 0, [0xc4, 0xc5, 0xc6]);
+    for (let i = 0; i < value.length; i++) bytes.push(value[i]);
+  } else if (Array.isArray(value)) {
+    writeLength(bytes, value.length, 0x90, 16, [null, 0xdc, 0xdd]);
+    for (let i = 0; i < value.length; i++) write(bytes, value[i]);
+  } else if (typeof value === "object") {
+    const keys = Object.keys(value as object).filter(
+      (key) => (value as Record<string, unknown>)[key] !== undefined
+    );
+    writeLength(bytes, keys.length, 0x80, 16, [null, 0xde, 0xdf]);
+    for (const key of keys) {
+      write(bytes, key);
+      write(bytes, (value as Record<string, unknown>)[key]);
+    }
+  } else {
+    throw new Error(`Cannot encode ${typeof value} as MessagePack`);
+  }
+}
+
+function writeNumber(bytes: number[], value: number) {
+  if (Number.isInteger(value) && Math.abs(value) <= Number.MAX_SAFE_INTEGER) {
+    if (value >= 0) {
+      if (value < 0x80) {
+        bytes.push(value);
+      } else if (value < 0x100) {
+        bytes.push(0xcc, value);
+      } else if (value < 0x10000) {
+        bytes.push(0xcd);
+        pushUint(bytes, value, 2);
+      } else if (value < 0x100000000) {
+        bytes.push(0xce);
+        pushUint(bytes, value, 4);
+      } else {
+        bytes.push(0xcf);
+        pushUint(bytes, value, 8);
+      }
+      return;
+    }
+    if (value >= -32) {
+      bytes.push(value & 0xff);
+      return;
+    }
+    if (value >= -0x80000000) {
+      bytes.push(0xd2);
+      pushUint(bytes, value >>> 0, 4);
+      return;
+    }
+  }
+  const view = new DataView(new ArrayBuffer(8));
+  view.setFloat64(0, value);
+  bytes.push(0xcb);
+  for (let i = 0; i < 8; i++) bytes.push(view.getUint8(i));
+}
+
+export function decode(data: ArrayBuffer | Uint8Array): unknown {
+  const bytes = data instanceof Uint8Array ? data : new Uint8Array(data);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let offset = 0;
+
+  const uint = (size: number) => {
+    let value = 0;
+    for (let i = 0; i < size; i++) value = value * 256 + bytes[offset + i];
+    offset += size;
+    return value;
+  };
+  const str = (length: number) => {
+    const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+    offset += length;
+    return value;
+  };
+  const bin = (length: number) => {
+    const value = bytes.slice(offset, offset + length);
+    offset += length;
+    return value;
+  };
+  const array = (length: number) => {
+    const value: unknown[] = [];
+    for (let i = 0; i < length; i++) value.push(read());
+    return value;
+  };
+  const map = (length: number) => {
+    const value: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = read();
+      value[String(key)] = read();
+    }
+    return value;
+  };
+
+  const read = (): unknown => {
+    const type = bytes[offset++];
+    if (type === undefined) throw new Error("Truncated MessagePack data");
+    if (type < 0x80) return type;
+    if (type < 0x90) return map(type & 0x0f);
+    if (type < 0xa0) return array(type & 0x0f);
+    if (type < 0xc0) return str(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+
+    let value: number;
+    switch (type) {
+      case 0xc0:
+        return null;
+      case 0xc2:
+        return false;
+      case 0xc3:
+        return true;
+      case 0xc4:
+        return bin(uint(1));
+      case 0xc5:
+        return bin(uint(2));
+      case 0xc6:
+        return bin(uint(4));
+      case 0xca:
+        value = view.getFloat32(offset);
+        offset += 4;
+        return value;
+      case 0xcb:
+        value = view.getFloat64(offset);
+        offset += 8;
+        return value;
+      case 0xcc:
+        return uint(1);
+      case 0xcd:
+        return uint(2);
+      case 0xce:
+        return uint(4);
+      case 0xcf:
+        return uint(8);
+      case 0xd0:
+        value = view.getInt8(offset);
+        offset += 1;
+        return value;
+      case 0xd1:
+        value = view.getInt16(offset);
+        offset += 2;
+        return value;
+      case 0xd2:
+        value = view.getInt32(offset);
+        offset += 4;
+        return value;
+      case 0xd3:
+        value = view.getInt32(offset) * 0x100000000 + view.getUint32(offset + 4);
+        offset += 8;
+        return value;
+      case 0xd9:
+        return str(uint(1));
+      case 0xda:
+        return str(uint(2));
+      case 0xdb:
+        return str(uint(4));
+      case 0xdc:
+        return array(uint(2));
+      case 0xdd:
+        return array(uint(4));
+      case 0xde:
+        return map(uint(2));
+      case 0xdf:
+        return map(uint(4));
+      default:
+        throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+  };
+
+  return read();
+}
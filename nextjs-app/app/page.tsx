@@ -14,6 +14,7 @@ import {
   Wifi,
   WifiOff,
 } from "lucide-react";
+import * as msgpack from "./msgpack";
 
 // Add declaration for webkitSpeechRecognition
 declare global {
@@ -48,6 +49,20 @@ interface UserRole {
   travelerLanguage?: string;
 }
 
+// Wire framing: "msgpack" asks the server for binary MessagePack frames at
+// set_role (less CPU and bandwidth on busy kiosks); JSON until it agrees
+type WireEncoding = "json" | "msgpack";
+const WIRE_ENCODING: WireEncoding =
+  process.env.NEXT_PUBLIC_WS_ENCODING === "msgpack" ? "msgpack" : "json";
+
+function encodeFrame(message: object, encoding: WireEncoding) {
+  return encoding === "msgpack" ? msgpack.encode(message) : JSON.stringify(message);
+}
+
+function decodeFrame(data: string | ArrayBuffer): any {
+  return typeof data === "string" ? JSON.parse(data) : msgpack.decode(data);
+}
+
 const LANGUAGES = {
   es: { name: "Spanish", flag: "🇪🇸" },
   fr: { name: "French", flag: "🇫🇷" },
@@ -76,6 +91,11 @@ export default function Home() {
   });
   const [transcriptions, setTranscriptions] = useState<TranscriptionData[]>([]);
   const [currentTranscript, setCurrentTranscript] = useState("");
+  const [partialTranslation, setPartialTranslation] = useState<{
+    original: string;
+    translated: string;
+    role: "traveler" | "assistant";
+  } | null>(null);
   const [selectedLanguage, setSelectedLanguage] = useState("es");
   const [translationEnabled, setTranslationEnabled] = useState(true);
   const [volume, setVolume] = useState(0);
@@ -91,16 +111,19 @@ export default function Home() {
   const [showRoleSelector, setShowRoleSelector] = useState(false);
 
   const originalTextRef = useRef<HTMLDivElement>(null);
+  const encodingRef = useRef<WireEncoding>("json");
   const translatedTextRef = useRef<HTMLDivElement>(null);
 
   // Initialize WebSocket connection
   useEffect(() => {
     const connectWebSocket = () => {
       const newSocket = new WebSocket("ws://localhost:8765");
+      newSocket.binaryType = "arraybuffer"; // MessagePack frames
 
       newSocket.onopen = () => {
         setConnectionStatus((prev) => ({ ...prev, connected: true }));
         console.log("Connected to WebSocket server");
+        encodingRef.current = "json";
 
         // Set initial role when connected
         const message = {
@@ -109,9 +132,13 @@ export default function Home() {
           session_id: userRole.sessionId,
           language:
             userRole.type === "traveler" ? userRole.travelerLanguage : "en",
+          encoding: WIRE_ENCODING === "json" ? undefined : WIRE_ENCODING,
         };
         newSocket.send(JSON.stringify(message));
         console.log("🎭 Initial role set:", userRole);
+
+        // Replay the session's recent exchanges (lost if we reconnected)
+        newSocket.send(JSON.stringify({ type: "sync_history" }));
       };
 
       newSocket.onclose = () => {
@@ -127,9 +154,39 @@ export default function Home() {
 
       newSocket.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
-
-          if (data.type === "traveler_message") {
+          const data = decodeFrame(event.data);
+
+          if (data.type === "encoding") {
+            // Server accepted (or declined) the requested framing
+            encodingRef.current = data.encoding;
+          } else if (data.type === "history") {
+            // Session history in one frame, in the shape of the live messages
+            const history: TranscriptionData[] = (data.messages || []).map(
+              (message: any) => ({
+                original: message.original || "",
+                translated:
+                  message.translated ??
+                  message.translated_for_assistant ??
+                  message.translated_for_traveler ??
+                  "",
+                timestamp: message.timestamp,
+                type: message.type,
+                role:
+                  message.type === "traveler_message" ||
+                  message.type === "transcription_sent"
+                    ? "traveler"
+                    : "assistant",
+              })
+            );
+            setTranscriptions(history);
+          } else if (data.type === "partial_translation") {
+            // Other side is still speaking: show the live translation
+            setPartialTranslation({
+              original: data.original || "",
+              translated: data.translated || "",
+              role: data.role,
+            });
+          } else if (data.type === "traveler_message") {
             // Message from traveler to assistant
             const transcriptionData: TranscriptionData = {
               original: data.original || "",
@@ -138,6 +195,7 @@ export default function Home() {
               type: "traveler_message",
               role: "traveler",
             };
+            setPartialTranslation(null);
             setTranscriptions((prev) => [...prev, transcriptionData]);
             setConnectionStatus((prev) => ({ ...prev, processing: false }));
           } else if (data.type === "assistant_response") {
@@ -149,6 +207,7 @@ export default function Home() {
               type: "assistant_response",
               role: "assistant",
             };
+            setPartialTranslation(null);
             setTranscriptions((prev) => [...prev, transcriptionData]);
             setConnectionStatus((prev) => ({ ...prev, processing: false }));
           } else if (data.type === "transcription_sent") {
@@ -193,6 +252,13 @@ export default function Home() {
             setConnectionStatus((prev) => ({ ...prev, processing: false }));
           } else if (data.type === "processing") {
             setConnectionStatus((prev) => ({ ...prev, processing: true }));
+          } else if (data.type === "overloaded") {
+            // Server shed this message; the hint says when to try again
+            console.warn(
+              `Server overloaded (${data.reason}), retry in ${data.retry_after_ms}ms:`,
+              data.original
+            );
+            setConnectionStatus((prev) => ({ ...prev, processing: false }));
           } else if (data.type === "error") {
             console.error("Server error:", data.message);
             setConnectionStatus((prev) => ({ ...prev, processing: false }));
@@ -257,6 +323,21 @@ export default function Home() {
           // Update current transcript with interim results
           if (interimTranscript) {
             setCurrentTranscript(interimTranscript);
+
+            // Stream interim results so the other side sees a live translation
+            if (socket && socket.readyState === WebSocket.OPEN) {
+              socket.send(
+                encodeFrame(
+                  {
+                    type: "interim_transcription",
+                    text: interimTranscript,
+                    traveler_language:
+                      userRole.travelerLanguage || selectedLanguage,
+                  },
+                  encodingRef.current
+                )
+              );
+            }
           }
 
           // Handle final transcript
@@ -283,7 +364,7 @@ export default function Home() {
                 translation_enabled: translationEnabled,
               };
               console.log("📦 Message payload:", message);
-              socket.send(JSON.stringify(message));
+              socket.send(encodeFrame(message, encodingRef.current));
             } else if (finalTranscript.trim()) {
               console.log("⚠️ Socket not ready, transcript:", finalTranscript);
             }
@@ -373,7 +454,7 @@ export default function Home() {
         session_id: sessionId,
         language: role === "traveler" ? travelerLang || selectedLanguage : "en",
       };
-      socket.send(JSON.stringify(message));
+      socket.send(encodeFrame(message, encodingRef.current));
       console.log("🎭 Role updated:", newUserRole);
     }
   };
@@ -913,6 +994,36 @@ ${transcriptions
                 </motion.div>
               )}
 
+              {/* Live translation of what the other side is saying */}
+              {partialTranslation && partialTranslation.role !== userRole.type && (
+                <motion.div
+                  initial={{ opacity: 0, scale: 0.95 }}
+                  animate={{ opacity: 1, scale: 1 }}
+                  className={`mb-3 p-3 rounded-lg border-l-4 border-dashed ${
+                    partialTranslation.role === "traveler"
+                      ? "bg-blue-700/20 border-blue-400 ml-0 mr-8"
+                      : "bg-green-700/20 border-green-400 ml-8 mr-0"
+                  }`}
+                >
+                  <div className="flex items-center gap-2 mb-2">
+                    <span className="text-lg">
+                      {partialTranslation.role === "traveler" ? "🧳" : "🤝"}
+                    </span>
+                    <span className="text-sm font-medium text-slate-300">
+                      {partialTranslation.role === "traveler"
+                        ? "Traveler"
+                        : "Local Assistant"}
+                    </span>
+                    <span className="text-xs text-slate-400 ml-auto">
+                      Speaking...
+                    </span>
+                  </div>
+                  <div className="text-white/70 font-medium italic">
+                    "{partialTranslation.translated}"
+                  </div>
+                </motion.div>
+              )}
+
               {transcriptions.length === 0 && !currentTranscript && (
                 <div className="text-slate-400 text-center py-8">
                   <div className="text-4xl mb-4">💬</div>
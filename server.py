@@ -5,69 +5,235 @@ Speech recognition is done in the browser.
 Works completely offline without internet connection once models are downloaded.
 """
 
+import abc
+import argparse
 import asyncio
+import concurrent.futures
+import heapq
 import json
 import logging
+import logging.handlers
+import queue
+import threading
 import time
 import os
-from typing import Dict, Any
+import re
+import signal
+import socket
+import unicodedata
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
 import websockets
 
-# Conditional imports for ML libraries
+# Optional fast codecs: orjson for JSON, msgpack for binary frames
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Conditional imports for ML libraries, deferred until the first model load
+# (or run in the background once the server socket is bound)
 ML_AVAILABLE = False
 pipeline = None
 AutoTokenizer = None
 AutoModelForSeq2SeqLM = None
+torch = None
+_ml_import_lock = threading.Lock()
+_ml_import_attempted = False
 
 def _import_ml_libraries():
-    """Import ML libraries if available"""
-    global ML_AVAILABLE, pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-    if ML_AVAILABLE:
-        return
-    
-    try:
-        from transformers import pipeline as _pipeline, AutoTokenizer as _AutoTokenizer, AutoModelForSeq2SeqLM as _AutoModelForSeq2SeqLM
-        import torch
-        pipeline = _pipeline
-        AutoTokenizer = _AutoTokenizer
-        AutoModelForSeq2SeqLM = _AutoModelForSeq2SeqLM
-        ML_AVAILABLE = True
-        logger.info("ML libraries loaded successfully")
-    except (ImportError, OSError) as e:
-        logger.warning(f"ML libraries not available: {e}")
-        logger.warning("Server will run with mock translations")
-        ML_AVAILABLE = False
-        
-        # Mock classes
-        class MockPipeline:
-            def __call__(self, text, **kwargs):
-                return [{"translation_text": f"[MOCK TRANSLATION] {text}"}]
+    """Import ML libraries if available; concurrent callers wait for the first"""
+    global ML_AVAILABLE, pipeline, AutoTokenizer, AutoModelForSeq2SeqLM, torch, _ml_import_attempted
+    with _ml_import_lock:
+        if _ml_import_attempted:
+            return
+        _ml_import_attempted = True
+
+        try:
+            from transformers import pipeline as _pipeline, AutoTokenizer as _AutoTokenizer, AutoModelForSeq2SeqLM as _AutoModelForSeq2SeqLM
+            import torch as _torch
+            torch = _torch
+            pipeline = _pipeline
+            AutoTokenizer = _AutoTokenizer
+            AutoModelForSeq2SeqLM = _AutoModelForSeq2SeqLM
+            if TORCH_INTEROP_THREADS:
+                torch.set_num_interop_threads(TORCH_INTEROP_THREADS)
+            ML_AVAILABLE = True
+            logger.info("ML libraries loaded successfully")
+        except (ImportError, OSError) as e:
+            logger.warning(f"ML libraries not available: {e}")
+            logger.warning("Server will run with mock translations")
+            ML_AVAILABLE = False
         
-        class MockAutoTokenizer:
-            @staticmethod
-            def from_pretrained(*args, **kwargs):
-                return None
+            # Mock classes
+            class MockAutoTokenizer:
+                @staticmethod
+                def from_pretrained(*args, **kwargs):
+                    return None
         
-        class MockAutoModelForSeq2SeqLM:
-            @staticmethod
-            def from_pretrained(*args, **kwargs):
-                return None
+            class MockAutoModelForSeq2SeqLM:
+                @staticmethod
+                def from_pretrained(*args, **kwargs):
+                    return None
         
-        def mock_pipeline(*args, **kwargs):
-            return MockPipeline()
+            def mock_pipeline(*args, **kwargs):
+                return MockTranslator()
         
-        pipeline = mock_pipeline
-        AutoTokenizer = MockAutoTokenizer
-        AutoModelForSeq2SeqLM = MockAutoModelForSeq2SeqLM
+            pipeline = mock_pipeline
+            AutoTokenizer = MockAutoTokenizer
+            AutoModelForSeq2SeqLM = MockAutoModelForSeq2SeqLM
+
+
+MOCK_TRANSLATION_PREFIX = "[MOCK TRANSLATION] "
+
+
+class MockTranslator:
+    """Stand-in for a model that could not be loaded: echoes texts with a marker"""
+
+    def __call__(self, text, **kwargs):
+        texts = text if isinstance(text, list) else [text]
+        return [{"translation_text": f"{MOCK_TRANSLATION_PREFIX}{t}"} for t in texts]
+
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+def is_mock_translation(text: str) -> bool:
+    """True for MockTranslator output, which must not be cached like a real translation"""
+    return text.startswith(MOCK_TRANSLATION_PREFIX)
+
+
+# Logging: level, "text" or "json" records, a queue-backed handler so the event
+# loop never waits on stdout, and per-message-type sampling of the per-message
+# INFO lines, e.g. "interim_transcription=0.01,transcription=0.1" (1 logs all)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "1") == "1"
+LOG_SAMPLE = os.environ.get("LOG_SAMPLE", "interim_transcription=0.01")
+
+# Configure logging (main() switches to configure_logging())
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 # Set cache directory for offline models
 MODELS_CACHE_DIR = os.environ.get("TRANSFORMERS_CACHE", "./models")
 os.makedirs(MODELS_CACHE_DIR, exist_ok=True)
 
+# Inference executor: "thread" (shared models), "process" (any worker runs any model)
+# or "sharded" (each worker process owns a set of model keys)
+INFERENCE_EXECUTOR = os.environ.get("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", os.cpu_count() or 1))
+# Sharded mode: a busy model key is replicated to at most this many workers
+WORKER_MAX_REPLICAS = int(os.environ.get("WORKER_MAX_REPLICAS", 2))
+# Load torch weights from an mmapped file so worker processes share one copy
+SHARED_WEIGHTS = os.environ.get("SHARED_WEIGHTS", "0") == "1"
+
+# Micro-batching: wait up to BATCH_MAX_WAIT_MS to group up to BATCH_MAX_SIZE requests per model
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 5))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 16))
+
+# Translation result cache (size 0 disables it, empty file disables persistence)
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", 10000))
+TRANSLATION_CACHE_TTL = float(os.environ.get("TRANSLATION_CACHE_TTL", 24 * 3600))
+TRANSLATION_CACHE_FILE = os.environ.get("TRANSLATION_CACHE_FILE", "")
+# Seconds between saves of the cache and phrase memory files while running (0 = on shutdown only)
+PERSIST_INTERVAL = float(os.environ.get("PERSIST_INTERVAL", 300))
+
+# Phrase memory: assistant replies counted per deployment (up to this many phrases,
+# 0 disables); the top K seen at least MIN_COUNT times are pretranslated into the
+# travelers' languages whenever the server is idle
+PHRASE_MEMORY_SIZE = int(os.environ.get("PHRASE_MEMORY_SIZE", 1000))
+PHRASE_MEMORY_TOP_K = int(os.environ.get("PHRASE_MEMORY_TOP_K", 50))
+PHRASE_MEMORY_MIN_COUNT = int(os.environ.get("PHRASE_MEMORY_MIN_COUNT", 2))
+PHRASE_MEMORY_FILE = os.environ.get("PHRASE_MEMORY_FILE", "")
+PHRASE_PRETRANSLATE_INTERVAL = float(os.environ.get("PHRASE_PRETRANSLATE_INTERVAL", 1.0))
+
+# Session history: the last HISTORY_MAX_EXCHANGES translated exchanges per session
+# (0 disables), replayed to clients that send sync_history. Sessions without
+# connections for HISTORY_IDLE_SECONDS move to HISTORY_FILE, an append-only log
+# (or are dropped if it is unset), where they are kept for HISTORY_TTL seconds
+HISTORY_MAX_EXCHANGES = int(os.environ.get("HISTORY_MAX_EXCHANGES", 200))
+HISTORY_IDLE_SECONDS = float(os.environ.get("HISTORY_IDLE_SECONDS", 300))
+HISTORY_FILE = os.environ.get("HISTORY_FILE", "")
+HISTORY_TTL = float(os.environ.get("HISTORY_TTL", 24 * 3600))
+
+# Long utterances are split into sentences (and sentences longer than this many
+# characters at clause or word boundaries) that are translated as one batch
+SEGMENT_MAX_CHARS = int(os.environ.get("SEGMENT_MAX_CHARS", 300))
+
+# Longest output the opus-mt models produce, in tokens
+MODEL_MAX_LENGTH = 512
+
+# Inference backend: "torch" (fp32), "quantized" (INT8 dynamic) or "onnx" (ONNX Runtime).
+# Per-pair overrides follow the default, e.g. "quantized,es=onnx,fr:from_en=torch"
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "torch")
+MODEL_BACKENDS = ("torch", "quantized", "onnx")
+
+# Generation settings are chosen per request from the input's token count: max
+# length scales with it, and short inputs decode greedily. Profiles trade latency
+# for quality; per-pair overrides follow the default, e.g. "fast,de=quality"
+GENERATION_PROFILE = os.environ.get("GENERATION_PROFILE", "balanced")
+GENERATION_PROFILES = {
+    # max_length = tokens * length_ratio + length_margin; beam search above greedy_max_tokens
+    "fast": {"length_ratio": 1.5, "length_margin": 8, "greedy_max_tokens": MODEL_MAX_LENGTH, "num_beams": 1},
+    "balanced": {"length_ratio": 2.0, "length_margin": 10, "greedy_max_tokens": 16, "num_beams": 4},
+    "quality": {"length_ratio": 3.0, "length_margin": 16, "greedy_max_tokens": 0, "num_beams": 4},
+}
+
+# torch intra-op threads per inference call (0 = torch's default), with per-pair
+# overrides, e.g. "2,de=4". Inter-op threads are process-wide (0 = torch's default)
+TORCH_THREADS = os.environ.get("TORCH_THREADS", "0")
+TORCH_INTEROP_THREADS = int(os.environ.get("TORCH_INTEROP_THREADS", 0))
+
+# Token ids of recently translated texts kept per model, to skip re-tokenizing
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 4096))
+
+# Memory budget for resident models in MB (0 = unlimited); LRU models are evicted past it
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", 0))
+
+# Seconds a broadcast waits on one recipient before giving up on that socket
+BROADCAST_SEND_TIMEOUT = float(os.environ.get("BROADCAST_SEND_TIMEOUT", 2.0))
+
+# WebSocket connection policy: permessage-deflate ("deflate" or "none"), the largest
+# incoming message in bytes, incoming messages buffered and the outgoing buffer
+# high-water mark in bytes per connection, and ping interval/timeout in seconds
+# (0 disables). Connections that send nothing for CONNECTION_IDLE_TIMEOUT seconds
+# are closed (0 = never; pings already drop dead peers)
+WS_COMPRESSION = os.environ.get("WS_COMPRESSION", "deflate")
+WS_MAX_SIZE = int(os.environ.get("WS_MAX_SIZE", 64 * 1024))
+WS_MAX_QUEUE = int(os.environ.get("WS_MAX_QUEUE", 16))
+WS_WRITE_LIMIT = int(os.environ.get("WS_WRITE_LIMIT", 32 * 1024))
+WS_PING_INTERVAL = float(os.environ.get("WS_PING_INTERVAL", 20))
+WS_PING_TIMEOUT = float(os.environ.get("WS_PING_TIMEOUT", 20))
+CONNECTION_IDLE_TIMEOUT = float(os.environ.get("CONNECTION_IDLE_TIMEOUT", 0))
+
+# Admission control for transcription messages: queued per connection, in flight
+# server-wide, and a token bucket per session (messages/second and burst size)
+MAX_QUEUED_PER_CONNECTION = int(os.environ.get("MAX_QUEUED_PER_CONNECTION", 4))
+MAX_IN_FLIGHT = int(os.environ.get("MAX_IN_FLIGHT", 256))
+SESSION_RATE_LIMIT = float(os.environ.get("SESSION_RATE_LIMIT", 5.0))
+SESSION_RATE_BURST = float(os.environ.get("SESSION_RATE_BURST", 10.0))
+# Longest session id, role or language a client may set
+CLIENT_FIELD_MAX_CHARS = int(os.environ.get("CLIENT_FIELD_MAX_CHARS", 128))
+# Seconds admitted transcriptions may keep translating after their connection closes
+DISCONNECT_DRAIN_TIMEOUT = float(os.environ.get("DISCONNECT_DRAIN_TIMEOUT", 30.0))
+
+# Pub/sub bus linking server nodes: "" (single node), "memory://<name>" (in-process)
+# or "redis://host:port" (Redis or any server speaking its pub/sub protocol)
+MESSAGE_BUS = os.environ.get("MESSAGE_BUS", "")
+NODE_ID = os.environ.get("NODE_ID", f"{socket.gethostname()}-{os.getpid()}")
+# Seconds between node announcements (warm models and session membership)
+BUS_HEARTBEAT = float(os.environ.get("BUS_HEARTBEAT", 5.0))
+
+# Local HTTP port serving /metrics (Prometheus text format) and /ready (0 = off)
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 0))
+
+# Startup preloading: "all", or comma-separated languages / directions ("es,fr:to_en")
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "")
+# File created once preloading is done, for deploy scripts and healthchecks
+READY_FILE = os.environ.get("READY_FILE", "")
+
 # Available offline translation models (bidirectional)
 TRANSLATION_MODELS = {
     "es": {
@@ -93,23 +259,1688 @@ TRANSLATION_MODELS = {
 }
 
 
+def resolve_preload_models(spec: str) -> List[str]:
+    """Turn a preload spec ("all", "es", "fr:to_en", ...) into model keys"""
+    model_keys = []
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        if item == "all":
+            languages, directions = list(TRANSLATION_MODELS), ["to_en", "from_en"]
+        else:
+            language, _, direction = item.partition(":")
+            if language not in TRANSLATION_MODELS:
+                raise ValueError(f"Language '{language}' not supported")
+            if direction and direction not in ("to_en", "from_en"):
+                raise ValueError(f"Unknown direction '{direction}' (use 'to_en' or 'from_en')")
+            languages = [language]
+            directions = [direction] if direction else ["to_en", "from_en"]
+
+        for language in languages:
+            for direction in directions:
+                model_key = TRANSLATION_MODELS[language][direction]
+                if model_key not in model_keys:
+                    model_keys.append(model_key)
+    return model_keys
+
+
+_SENTENCE_END = re.compile(r"([.!?…]+[\"'»”)\]]*)(\s+)")
+_LINE_BREAK = re.compile(r"(\s*\n\s*)")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+_ABBREVIATIONS = {
+    "mr.", "mrs.", "ms.", "dr.", "st.", "sr.", "sra.", "srta.", "dra.",
+    "m.", "mme.", "mlle.", "hr.", "fr.", "prof.", "etc.", "p.ej.", "z.b.",
+}
+
+
+def _split_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    """Split an overlong sentence at clause boundaries, then at spaces"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    chunks, current = [], ""
+    for part in _CLAUSE_END.split(sentence):
+        words = [part] if len(part) <= max_chars else part.split()
+        for word in words:
+            if current and len(current) + 1 + len(word) > max_chars:
+                chunks.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_sentences(text: str, max_chars: int = SEGMENT_MAX_CHARS) -> List[Tuple[str, str]]:
+    """Split text into (segment, separator) pairs; joining them rebuilds the text"""
+    pieces = []
+    lines = _LINE_BREAK.split(text.strip())  # [line, break, line, ...]
+    for line, line_break in zip(lines[::2], lines[1::2] + [""]):
+        start = 0
+        for match in _SENTENCE_END.finditer(line):
+            sentence = line[start : match.end(1)]
+            last_word = sentence.rsplit(None, 1)[-1].lower()
+            if last_word in _ABBREVIATIONS:
+                continue  # "Sr. López" is one sentence
+            pieces.append((sentence, match.group(2)))
+            start = match.end()
+        if start < len(line):
+            pieces.append((line[start:], line_break))
+        elif pieces:
+            pieces[-1] = (pieces[-1][0], line_break)
+
+    segments = []
+    for sentence, separator in pieces:
+        chunks = _split_long_sentence(sentence, max_chars)
+        segments.extend((chunk, " ") for chunk in chunks[:-1])
+        segments.append((chunks[-1], separator))
+    return segments
+
+
+def _resolve_model_overrides(spec: str, parse, default):
+    """Parse "default,target=value,..." into (default, {model_key: parse(value)})"""
+    overrides = {}
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        target, _, value = item.rpartition("=")
+        value = parse(value)
+        if not target:
+            default = value
+            continue
+        for model_key in resolve_preload_models(target):
+            overrides[model_key] = value
+    return default, overrides
+
+
+def _choice(choices, kind: str):
+    """Parser accepting one of choices, for _resolve_model_overrides"""
+    def parse(value: str) -> str:
+        if value not in choices:
+            raise ValueError(f"Unknown {kind} '{value}' (use one of {tuple(choices)})")
+        return value
+    return parse
+
+
+def resolve_model_backends(spec: str):
+    """Parse a backend spec into (default backend, {model_key: backend})"""
+    return _resolve_model_overrides(spec, _choice(MODEL_BACKENDS, "backend"), "torch")
+
+
+def resolve_generation_profiles(spec: str):
+    """Parse a generation profile spec into (default profile, {model_key: profile})"""
+    return _resolve_model_overrides(
+        spec, _choice(GENERATION_PROFILES, "generation profile"), "balanced"
+    )
+
+
+def resolve_thread_counts(spec: str):
+    """Parse a thread count spec into (default threads, {model_key: threads})"""
+    return _resolve_model_overrides(spec, int, 0)
+
+
+def estimate_token_count(text: str) -> int:
+    """Rough SentencePiece token count, for translators without a tokenizer"""
+    return round(len(text.split()) * 1.3) + 1  # +1 for </s>
+
+
+def generation_settings(token_count: int, profile: str = "balanced") -> Dict[str, int]:
+    """Generation keyword arguments for an input of token_count tokens"""
+    settings = GENERATION_PROFILES[profile]
+    max_length = int(token_count * settings["length_ratio"]) + settings["length_margin"]
+    greedy = token_count <= settings["greedy_max_tokens"]
+    return {
+        "max_length": min(MODEL_MAX_LENGTH, max_length),
+        "num_beams": 1 if greedy else settings["num_beams"],
+    }
+
+
+def _directory_bytes(path: str) -> int:
+    """Total size of the files under a directory"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return total
+
+
+def _quantized_model_bytes(model) -> int:
+    """Serialized size of a quantized model (packed weights are not parameters)"""
+    import io
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+# Translator owned by each process-pool worker (see InferenceExecutor)
+_worker_translator = None
+
+
+def _init_inference_worker(
+    backend: str, memory_budget_mb: float, shared_weights: bool, generation_profile: str, threads: str
+):
+    """Create the per-process translator for a process-pool worker"""
+    global _worker_translator
+    # A forked worker inherits the parent's queue handler, but not the listener
+    # thread that drains it; write this process's records inline instead
+    configure_logging(use_queue=False)
+    metrics.drain()  # Values forked from the parent are already counted there
+    _worker_translator = OfflineTranslator(
+        executor_kind="process",  # This process runs one call at a time
+        cache_size=0,  # Front process caches
+        memory_budget_mb=memory_budget_mb,
+        backend=backend,
+        shared_weights=shared_weights,
+        generation_profile=generation_profile,
+        threads=threads,
+    )
+
+
+def _run_in_inference_worker(method_name: str, *args):
+    """Run an OfflineTranslator method inside a process-pool worker"""
+    return getattr(_worker_translator, method_name)(*args)
+
+
+# Message types clients send; anything else is counted and sampled as "unknown"
+MESSAGE_TYPES = (
+    "set_role",
+    "interim_transcription",
+    "transcription",
+    "sync_history",
+    "health",
+    "start_recording",
+    "stop_recording",
+)
+
+# Wire encodings a client can pick with set_role's "encoding"; JSON is always accepted
+MESSAGE_ENCODINGS = ("json", "msgpack") if msgpack is not None else ("json",)
+
+
+def json_dumps(payload) -> str:
+    """Serialize to JSON text, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload)
+
+
+def json_loads(data):
+    """Parse JSON text or bytes, with orjson when it is installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def load_json_file(path: str, description: str):
+    """Parsed contents of a JSON file; None if it is missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load {description} {path}: {e}")
+        return None
+
+
+def write_json_atomic(path: str, payload, **dump_options):
+    """Write JSON to a temporary file, then rename it over path.
+
+    Readers (and the next start, after a crash) see the old file or the new
+    one, never half of one. The temporary name is unique per thread, so
+    concurrent writers of the same path do not clobber each other's file.
+    """
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, **dump_options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_json_file(path: str, payload, description: str) -> bool:
+    """write_json_atomic, logging instead of raising when the file cannot be written"""
+    try:
+        write_json_atomic(path, payload, ensure_ascii=False)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not save {description} {path}: {e}")
+        return False
+
+
+def encode_message(payload: Dict[str, Any], encoding: str = "json"):
+    """Frame a message: JSON text, or MessagePack bytes sent as a binary frame"""
+    if encoding == "msgpack":
+        return msgpack.packb(payload)
+    return json_dumps(payload)
+
+
+def decode_message(message) -> Dict[str, Any]:
+    """Parse a text frame as JSON and a binary frame as MessagePack"""
+    if isinstance(message, (bytes, bytearray)) and msgpack is not None:
+        return msgpack.unpackb(message)
+    return json_loads(message)
+
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_LOG_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with `extra=` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload.update(
+            (key, value) for key, value in vars(record).items() if key not in _LOG_RECORD_FIELDS
+        )
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records unformatted; the listener thread formats and writes them"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, on the event loop. Log arguments on
+        # the hot path are immutable (str/int), so formatting later is safe
+        return record
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, use_queue: bool = LOG_ASYNC, stream=None):
+    """Replace the root handlers; returns the QueueListener to stop, if any"""
+    handler = logging.StreamHandler(stream)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    elif fmt == "text":
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    else:
+        raise ValueError(f"Unknown log format '{fmt}' (use text or json)")
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.setLevel(level)
+
+    if not use_queue:
+        root.addHandler(handler)
+        return None
+    records = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(records))
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.start()
+    return listener
+
+
+class LogSampler:
+    """Deterministic per-key sampling: with rate 0.1, every 10th call logs"""
+
+    def __init__(self, spec: str = LOG_SAMPLE):
+        self.intervals: Dict[str, int] = {}  # 0 = never
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, rate = item.partition("=")
+            rate = float(rate)
+            self.intervals[key] = round(1 / rate) if rate > 0 else 0
+        self.counts: Dict[str, int] = {}
+
+    def sample(self, key) -> bool:
+        interval = self.intervals.get(key, 1)
+        if interval == 1:
+            return True
+        if interval == 0:
+            return False
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        return count % interval == 0
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, Any], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def drain(self) -> Dict[tuple, float]:
+        """Take the values counted so far and start again from zero"""
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
+    def merge(self, values: Dict[tuple, float]):
+        """Add values drained from the same counter in another process"""
+        with self.lock:
+            for key, amount in values.items():
+                self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in self.values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.series: Dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def drain(self) -> Dict[tuple, list]:
+        """Take the series observed so far and start again from empty"""
+        with self.lock:
+            series, self.series = self.series, {}
+        return series
+
+    def merge(self, series: Dict[tuple, list]):
+        """Add series drained from the same histogram in another process"""
+        with self.lock:
+            for key, counts in series.items():
+                current = self.series.get(key)
+                if current is None:
+                    self.series[key] = list(counts)
+                else:
+                    self.series[key] = [a + b for a, b in zip(current, counts)]
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for labels, series in self.series.items():
+                for bound, count in zip(self.buckets, series):
+                    bucket_labels = labels + (("le", bound),)
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {count}")
+                lines.append(f'{self.name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {series[-1]}')
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []  # Callables returning gauge samples at scrape time
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Register `collector() -> [(name, help, {labels} or None, value), ...]` gauges"""
+        self.collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def drain(self) -> Dict[str, dict]:
+        """Counter and histogram values since the last drain, by metric name.
+
+        Inference worker processes record into their own copy of the registry;
+        the server merges what they drain into its own.
+        """
+        return {metric.name: metric.drain() for metric in self.metrics}
+
+    def merge(self, drained: Dict[str, dict]):
+        """Add values from another process's drain()"""
+        by_name = {metric.name: metric for metric in self.metrics}
+        for name, values in drained.items():
+            if name in by_name:
+                by_name[name].merge(values)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+
+        gauges: Dict[str, Tuple[str, list]] = {}
+        for collector in list(self.collectors):
+            try:
+                samples = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            for name, help_text, labels, value in samples:
+                gauges.setdefault(name, (help_text, []))[1].append((labels or {}, value))
+        for name, (help_text, samples) in gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    "translation_stage_seconds", "Time spent per stage of the translation path"
+)
+BATCH_SIZE = metrics.histogram(
+    "translation_batch_size", "Texts per batched model call", BATCH_SIZE_BUCKETS
+)
+GENERATIONS_TOTAL = metrics.counter(
+    "translation_generations_total", "Texts translated, by generation profile and decoding mode"
+)
+MESSAGES_TOTAL = metrics.counter("translation_messages_total", "WebSocket messages received by type")
+
+
+class TranslationCache:
+    """Bounded LRU + TTL cache of translations keyed by (model key, normalized text)"""
+
+    def __init__(
+        self,
+        max_entries: int = TRANSLATION_CACHE_SIZE,
+        ttl: float = TRANSLATION_CACHE_TTL,
+        path: str = TRANSLATION_CACHE_FILE,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()  # (model_key, text) -> (translation, stored_at)
+        self.lock = threading.Lock()  # Shared by the event loop and pool threads
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Canonical form of a source text: NFC, trimmed, single spaces"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def get(self, model_key: str, text: str) -> Optional[str]:
+        """Return the cached translation or None"""
+        if self.max_entries <= 0:
+            return None
+
+        key = (model_key, self.normalize(text))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            translation, stored_at = entry
+            if self.ttl > 0 and time.time() - stored_at > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def put(self, model_key: str, text: str, translation: str):
+        """Store a translation, evicting the least recently used entries.
+
+        Mock output from a model that failed to load is not stored, so it is
+        not served once the model is fixed.
+        """
+        if self.max_entries <= 0 or is_mock_translation(translation):
+            return
+
+        key = (model_key, self.normalize(text))
+        with self.lock:
+            self.entries[key] = (translation, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def load(self):
+        """Warm the cache from the persisted file, skipping expired entries"""
+        records = load_json_file(self.path, "translation cache")
+        if records is None:
+            return
+
+        now = time.time()
+        with self.lock:
+            for model_key, text, translation, stored_at in records:
+                if self.ttl > 0 and now - stored_at > self.ttl:
+                    continue
+                if is_mock_translation(translation):
+                    continue  # Saved by earlier versions
+                self.entries[(model_key, text)] = (translation, stored_at)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        logger.info(f"Loaded {len(self.entries)} cached translations from {self.path}")
+
+    def save(self):
+        """Persist the cache (oldest first, so reloading keeps LRU order)"""
+        if not self.path:
+            return
+        with self.lock:
+            records = [
+                [model_key, text, translation, stored_at]
+                for (model_key, text), (translation, stored_at) in self.entries.items()
+            ]
+        if save_json_file(self.path, records, "translation cache"):
+            logger.info(f"Saved {len(records)} cached translations to {self.path}")
+
+
+class PhraseMemory:
+    """Frequent assistant replies, pretranslated so a matching reply needs no model call.
+
+    Counts replies per (language, normalized text), keeping at most max_phrases
+    (the least used and least recent are dropped first). The top_k seen at least
+    min_count times are pretranslated by the server while it is idle; translations
+    of phrases that leave the top are dropped, so at most top_k per target
+    language are held. Used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        max_phrases: int = PHRASE_MEMORY_SIZE,
+        top_k: int = PHRASE_MEMORY_TOP_K,
+        min_count: int = PHRASE_MEMORY_MIN_COUNT,
+        path: str = PHRASE_MEMORY_FILE,
+        max_chars: int = 200,
+    ):
+        self.max_phrases = max_phrases
+        self.top_k = top_k
+        self.min_count = min_count
+        self.path = path
+        self.max_chars = max_chars  # Longer replies are not stock phrases
+        self.counts: Dict[Tuple[str, str], List[float]] = {}  # (language, text) -> [count, last_seen]
+        self.translations: Dict[Tuple[str, str, str], str] = {}  # (language, text, target) -> translation
+        self.hits = 0
+        self.misses = 0
+        self.pretranslations = 0
+        self.evictions = 0
+        if path and self.enabled:
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_phrases > 0 and self.top_k > 0
+
+    def record(self, language: str, text: str):
+        """Count one reply"""
+        if not self.enabled:
+            return
+        text = TranslationCache.normalize(text)
+        if not text or len(text) > self.max_chars:
+            return
+
+        key = (language, text)
+        entry = self.counts.get(key)
+        if entry is None:
+            if len(self.counts) >= self.max_phrases:
+                del self.counts[min(self.counts, key=self.counts.__getitem__)]
+                self.evictions += 1
+            entry = self.counts[key] = [0, 0.0]
+        entry[0] += 1
+        entry[1] = time.time()
+
+    def top(self) -> List[Tuple[str, str]]:
+        """The top_k (language, text) phrases seen at least min_count times"""
+        frequent = (key for key, (count, _) in self.counts.items() if count >= self.min_count)
+        return heapq.nlargest(self.top_k, frequent, key=self.counts.__getitem__)
+
+    def lookup(self, language: str, text: str, target_language: str) -> Optional[str]:
+        """Pretranslated reply, or None"""
+        if not self.enabled:
+            return None
+        key = (language, TranslationCache.normalize(text), target_language)
+        translation = self.translations.get(key)
+        if translation is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return translation
+
+    def pending(self, target_languages) -> List[Tuple[str, str, str]]:
+        """(language, text, target) of top phrases still to pretranslate.
+
+        Also drops the translations of phrases no longer in the top.
+        """
+        if not self.enabled:
+            return []
+        top = self.top()
+        kept = set(top)
+        for key in [key for key in self.translations if key[:2] not in kept]:
+            del self.translations[key]
+        return [
+            (language, text, target)
+            for language, text in top
+            for target in target_languages
+            if target != language and (language, text, target) not in self.translations
+        ]
+
+    def store(self, language: str, text: str, target_language: str, translation: str):
+        if is_mock_translation(translation):
+            return  # Retried once the model loads
+        self.translations[(language, text, target_language)] = translation
+        self.pretranslations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory counters"""
+        lookups = self.hits + self.misses
+        return {
+            "phrases": len(self.counts),
+            "max_phrases": self.max_phrases,
+            "pretranslated": len(self.translations),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "pretranslations": self.pretranslations,
+            "evictions": self.evictions,
+        }
+
+    def load(self):
+        """Restore phrase counts from the persisted file (translations are redone)"""
+        records = load_json_file(self.path, "phrase memory")
+        if records is None:
+            return
+
+        records.sort(key=lambda record: record[2:], reverse=True)  # Keep the most used
+        for language, text, count, last_seen in records[: self.max_phrases]:
+            self.counts[(language, text)] = [count, last_seen]
+        logger.info(f"Loaded {len(self.counts)} phrases from {self.path}")
+
+    def save(self):
+        """Persist the phrase counts"""
+        if self.path and self.enabled:
+            self._write(self._records())
+
+    async def save_async(self):
+        """save, with the file written in a thread"""
+        if self.path and self.enabled:
+            await asyncio.to_thread(self._write, self._records())
+
+    def _records(self) -> list:
+        return [[language, text, count, last_seen] for (language, text), (count, last_seen) in self.counts.items()]
+
+    def _write(self, records: list):
+        if save_json_file(self.path, records, "phrase memory"):
+            logger.info(f"Saved {len(records)} phrases to {self.path}")
+
+
+class Exchange:
+    """One translated utterance of a session"""
+
+    __slots__ = ("at", "role", "language", "original", "translations")
+
+    def __init__(self, at: float, role: str, language: str, original: str, translations: tuple):
+        self.at = at
+        self.role = role
+        self.language = language  # Source language
+        self.original = original
+        self.translations = translations  # ((language, text), ...), the requested target first
+
+    def to_record(self) -> list:
+        return [self.at, self.role, self.language, self.original, [list(pair) for pair in self.translations]]
+
+    @classmethod
+    def from_record(cls, record: list) -> "Exchange":
+        at, role, language, original, translations = record
+        return cls(at, role, language, original, tuple(tuple(pair) for pair in translations))
+
+    def translation(self, language: Optional[str] = None) -> str:
+        """Translation for a listener language, else the requested one"""
+        for target, text in self.translations:
+            if target == language:
+                return text
+        return self.translations[0][1] if self.translations else self.original
+
+
+class SessionHistory:
+    """Recent exchanges per session, in bounded ring buffers, spilled to disk when idle.
+
+    Spilled sessions are appended to the log as one JSON line each, indexed by
+    offset, and read back when the session is joined again. Superseded lines are
+    dead space until the log is compacted, which also drops sessions past the TTL.
+    In-memory state is used from the event loop; file I/O runs in a thread.
+    """
+
+    def __init__(
+        self,
+        max_exchanges: int = HISTORY_MAX_EXCHANGES,
+        path: str = HISTORY_FILE,
+        idle_seconds: float = HISTORY_IDLE_SECONDS,
+        ttl: float = HISTORY_TTL,
+    ):
+        self.max_exchanges = max_exchanges
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.ttl = ttl
+        self.sessions: Dict[Any, deque] = {}  # session_id -> Exchanges, oldest first
+        self.last_active: Dict[Any, float] = {}
+        self.spilled: Dict[Any, Tuple[int, int, float]] = {}  # session_id -> (offset, length, last_at)
+        self.live_bytes = 0
+        self.dead_bytes = 0
+        self.spills = 0
+        self.restores = 0
+        self.dropped = 0
+        self._file_lock = asyncio.Lock()
+        if path and self.enabled:
+            self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_exchanges > 0
+
+    def record(self, session_id, role: str, language: str, original: str, translations: Dict[str, str], target: str):
+        """Add an exchange; `target` is the language the speaker asked for"""
+        if not self.enabled:
+            return
+        exchanges = self.sessions.get(session_id)
+        if exchanges is None:
+            exchanges = self.sessions[session_id] = deque(maxlen=self.max_exchanges)
+        pairs = [(target, translations[target])] if target in translations else []
+        pairs += [(other, text) for other, text in translations.items() if other != target]
+        now = time.time()
+        exchanges.append(Exchange(now, role, language, original, tuple(pairs)))
+        self.last_active[session_id] = now
+
+    def touch(self, session_id):
+        """Mark a session active (joined), so it is not spilled"""
+        if session_id in self.sessions:
+            self.last_active[session_id] = time.time()
+
+    def replay(self, session_id, role: str, language: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recent exchanges as the messages a client in this role would have received"""
+        exchanges = list(self.sessions.get(session_id, ()))
+        if limit is not None:
+            exchanges = exchanges[-limit:] if limit > 0 else []
+        messages = []
+        for exchange in exchanges:
+            timestamp = time.strftime("%H:%M:%S", time.localtime(exchange.at))
+            if exchange.role == "traveler" and role == "assistant":
+                message = {
+                    "type": "traveler_message",
+                    "translated": exchange.translation(language),
+                    "traveler_language": exchange.language,
+                    "target_language": language,
+                }
+            elif exchange.role == "traveler":
+                message = {"type": "transcription_sent", "translated_for_assistant": exchange.translation("en")}
+            elif role == "traveler":
+                message = {
+                    "type": "assistant_response",
+                    "translated": exchange.translation(language),
+                    "traveler_language": language,
+                }
+            else:
+                message = {"type": "response_sent", "translated_for_traveler": exchange.translation()}
+            message["original"] = exchange.original
+            message["timestamp"] = timestamp
+            messages.append(message)
+        return messages
+
+    async def restore(self, session_id):
+        """Bring a spilled session back into memory, ahead of anything recorded since"""
+        if session_id not in self.spilled:
+            return
+        async with self._file_lock:
+            entry = self.spilled.pop(session_id, None)
+            if entry is None:
+                return
+            offset, length, last_at = entry
+            self.live_bytes -= length
+            self.dead_bytes += length  # Superseded once the session spills again
+            if self.ttl > 0 and time.time() - last_at > self.ttl:
+                return
+            try:
+                line = await asyncio.to_thread(self._read, offset, length)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not restore history of session {session_id}: {e}")
+                return
+
+        restored = deque(
+            (Exchange.from_record(record) for record in line["exchanges"]), maxlen=self.max_exchanges
+        )
+        restored.extend(self.sessions.get(session_id, ()))
+        self.sessions[session_id] = restored
+        self.last_active[session_id] = time.time()
+        self.restores += 1
+
+    async def spill_idle(self, active_sessions=(), idle_seconds: Optional[float] = None):
+        """Move sessions idle for idle_seconds (and not in active_sessions) to the log"""
+        idle_seconds = self.idle_seconds if idle_seconds is None else idle_seconds
+        now = time.time()
+        idle = [
+            session_id
+            for session_id, last_active in self.last_active.items()
+            if now - last_active >= idle_seconds and session_id not in active_sessions
+        ]
+        if not idle:
+            return
+        if not self.path:
+            for session_id in idle:
+                self.sessions.pop(session_id, None)
+                del self.last_active[session_id]
+            self.dropped += len(idle)
+            return
+
+        snapshot = {session_id: self.last_active[session_id] for session_id in idle}
+        lines = [
+            (
+                json_dumps(
+                    {
+                        "session": session_id,
+                        "last_at": snapshot[session_id],
+                        "exchanges": [exchange.to_record() for exchange in self.sessions.get(session_id, ())],
+                    }
+                )
+                + "\n"
+            ).encode("utf-8")
+            for session_id in idle
+        ]
+        async with self._file_lock:
+            try:
+                offsets = await asyncio.to_thread(self._append, lines)
+            except OSError as e:
+                logger.warning(f"Could not spill session history to {self.path}: {e}")
+                return
+            for session_id, line, offset in zip(idle, lines, offsets):
+                if self.last_active.get(session_id) != snapshot[session_id]:
+                    self.dead_bytes += len(line)  # Active again while writing; stays in memory
+                    continue
+                previous = self.spilled.get(session_id)
+                if previous is not None:
+                    self.live_bytes -= previous[1]
+                    self.dead_bytes += previous[1]
+                self.spilled[session_id] = (offset, len(line), snapshot[session_id])
+                self.live_bytes += len(line)
+                self.sessions.pop(session_id, None)
+                del self.last_active[session_id]
+                self.spills += 1
+            if self.dead_bytes > max(self.live_bytes, 1024 * 1024):
+                await asyncio.to_thread(self._compact)
+
+    def _append(self, lines: List[bytes]) -> List[int]:
+        offsets = []
+        with open(self.path, "ab") as f:
+            for line in lines:
+                offsets.append(f.tell())
+                f.write(line)
+        return offsets
+
+    def _read(self, offset: int, length: int) -> Dict[str, Any]:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json_loads(f.read(length))
+
+    def _load_index(self):
+        """Index the log left by a previous run (the last line per session wins)"""
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = json_loads(line)
+                    session_id = record["session"]
+                except (ValueError, KeyError, TypeError):
+                    self.dead_bytes += len(line)  # Torn write from a crash
+                    offset += len(line)
+                    continue
+                previous = self.spilled.get(session_id)
+                if previous is not None:
+                    self.live_bytes -= previous[1]
+                    self.dead_bytes += previous[1]
+                self.spilled[session_id] = (offset, len(line), record["last_at"])
+                self.live_bytes += len(line)
+                offset += len(line)
+        self._compact()
+        logger.info(f"Indexed history of {len(self.spilled)} sessions in {self.path}")
+
+    def _compact(self):
+        """Rewrite the log with only the indexed, unexpired sessions (caller holds the lock)"""
+        now = time.time()
+        tmp_path = f"{self.path}.tmp"
+        spilled, offset = {}, 0
+        with open(self.path, "rb") as source, open(tmp_path, "wb") as target:
+            for session_id, (old_offset, length, last_at) in sorted(self.spilled.items(), key=lambda item: item[1][0]):
+                if self.ttl > 0 and now - last_at > self.ttl:
+                    continue
+                source.seek(old_offset)
+                target.write(source.read(length))
+                spilled[session_id] = (offset, length, last_at)
+                offset += length
+        os.replace(tmp_path, self.path)
+        self.spilled = spilled
+        self.live_bytes, self.dead_bytes = offset, 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Store counters"""
+        return {
+            "sessions": len(self.sessions),
+            "exchanges": sum(len(exchanges) for exchanges in self.sessions.values()),
+            "spilled_sessions": len(self.spilled),
+            "log_bytes": self.live_bytes + self.dead_bytes,
+            "spills": self.spills,
+            "restores": self.restores,
+            "dropped": self.dropped,
+        }
+
+
+def _model_memory_bytes(translator) -> int:
+    """Bytes held by a translator's model parameters and buffers (0 for mocks)"""
+    model = getattr(translator, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class ModelRegistry:
+    """Loaded pipelines with per-model memory accounting and LRU eviction past a budget"""
+
+    def __init__(self, budget_mb: float = MODEL_MEMORY_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.models = OrderedDict()  # model_key -> pipeline, least recently used first
+        self.sizes: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.events = deque(maxlen=100)  # Recent load/evict events
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def __contains__(self, model_key: str) -> bool:
+        return model_key in self.models
+
+    def __iter__(self):
+        return iter(list(self.models))
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(self.sizes.values())
+
+    def get(self, model_key: str):
+        """Return a loaded pipeline (marking it recently used) or None"""
+        with self.lock:
+            translator = self.models.get(model_key)
+            if translator is not None:
+                self.models.move_to_end(model_key)
+            return translator
+
+    def add(self, model_key: str, translator, load_seconds: float = 0.0, size: Optional[int] = None):
+        """Register a freshly loaded pipeline, then evict down to the budget"""
+        if size is None:
+            size = _model_memory_bytes(translator)
+        with self.lock:
+            self.models[model_key] = translator
+            self.sizes[model_key] = size
+            self.loads += 1
+            self._record("load", model_key, size, load_seconds)
+            self._evict_over_budget(keep=model_key)
+        logger.info(
+            f"Model resident: {model_key} ({size / 1024 / 1024:.1f} MB, "
+            f"total {self.resident_bytes / 1024 / 1024:.1f} MB)"
+        )
+
+    def acquire(self, model_key: str):
+        """Mark a model as in use so it cannot be evicted"""
+        with self.lock:
+            self.in_flight[model_key] = self.in_flight.get(model_key, 0) + 1
+
+    def release(self, model_key: str):
+        """Undo acquire once the request has finished"""
+        with self.lock:
+            self.in_flight[model_key] -= 1
+            if not self.in_flight[model_key]:
+                del self.in_flight[model_key]
+
+    def _evict_over_budget(self, keep: str):
+        """Drop least recently used idle models until under budget (caller holds lock)"""
+        if self.budget_bytes <= 0:
+            return
+        for model_key in list(self.models):
+            if self.resident_bytes <= self.budget_bytes:
+                return
+            if model_key == keep or self.in_flight.get(model_key):
+                continue
+            del self.models[model_key]
+            size = self.sizes.pop(model_key)
+            self.evictions += 1
+            self._record("evict", model_key, size)
+            logger.info(f"Evicted model {model_key} ({size / 1024 / 1024:.1f} MB)")
+
+        if self.resident_bytes > self.budget_bytes:
+            logger.warning(
+                f"Resident models use {self.resident_bytes / 1024 / 1024:.1f} MB, over the "
+                f"{self.budget_bytes / 1024 / 1024:.1f} MB budget; all others are in use"
+            )
+
+    def _record(self, event: str, model_key: str, size: int, seconds: float = 0.0):
+        self.events.append(
+            {
+                "time": time.time(),
+                "event": event,
+                "model": model_key,
+                "bytes": size,
+                "seconds": round(seconds, 3),
+            }
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Resident models, sizes and load/evict history"""
+        with self.lock:
+            return {
+                "resident_bytes": self.resident_bytes,
+                "budget_bytes": self.budget_bytes,
+                "models": dict(self.sizes),
+                "in_flight": dict(self.in_flight),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "events": list(self.events),
+            }
+
+
+class InferenceExecutor:
+    """Runs blocking translator calls off the event loop on a worker pool.
+
+    Every method run on the pool takes the model key as its first argument;
+    the sharded pool routes on it.
+    """
+
+    def __init__(
+        self,
+        translator,
+        kind: str = INFERENCE_EXECUTOR,
+        max_workers: int = INFERENCE_WORKERS,
+        max_replicas: int = WORKER_MAX_REPLICAS,
+    ):
+        if kind not in ("thread", "process", "sharded"):
+            raise ValueError(
+                f"Unknown inference executor '{kind}' (use 'thread', 'process' or 'sharded')"
+            )
+
+        self.translator = translator
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_replicas = max(1, max_replicas)
+        self.pending = 0  # Submitted but not yet finished
+        self.completed = 0
+        self.worker_calls: Dict[int, asyncio.Future] = {}  # Unfinished run_on_workers calls
+
+        worker_args = (
+            translator.backend_spec,
+            translator.memory_budget_mb,
+            translator.shared_weights,
+            translator.generation_profile_spec,
+            translator.threads_spec,
+        )
+        if kind == "sharded":
+            # One single-process pool per worker, so a model key stays on its workers
+            self.pools = [
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=1, initializer=_init_inference_worker, initargs=worker_args
+                )
+                for _ in range(self.max_workers)
+            ]
+            self.worker_pending = [0] * self.max_workers
+            self.assignments: Dict[str, List[int]] = {}  # model_key -> worker indexes
+        elif kind == "process":
+            self.pools = [
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_inference_worker,
+                    initargs=worker_args,
+                )
+            ]
+        else:
+            self.pools = [
+                concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            ]
+        logger.info(f"Inference executor started: {kind} pool with {self.max_workers} workers")
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted calls still waiting for a free worker"""
+        if self.kind == "sharded":
+            return sum(max(0, pending - 1) for pending in self.worker_pending)
+        return max(0, self.pending - self.max_workers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool state"""
+        stats = {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "in_flight": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+        }
+        if self.kind == "sharded":
+            stats["worker_in_flight"] = list(self.worker_pending)
+            stats["assignments"] = {key: list(workers) for key, workers in self.assignments.items()}
+        return stats
+
+    def _pick_worker(self, model_key: str) -> int:
+        """Least busy worker hosting a model; new or saturated keys get another worker"""
+        workers = self.assignments.setdefault(model_key, [])
+        busy = not workers or min(self.worker_pending[w] for w in workers) > 0
+        if busy and len(workers) < min(self.max_replicas, self.max_workers):
+            hosted = {w: 0 for w in range(self.max_workers)}
+            for assigned in self.assignments.values():
+                for w in assigned:
+                    hosted[w] += 1
+            candidates = [w for w in range(self.max_workers) if w not in workers]
+            # Idle workers first, then those hosting the fewest models
+            new_worker = min(candidates, key=lambda w: (self.worker_pending[w], hosted[w]))
+            if not workers or self.worker_pending[new_worker] == 0:
+                workers.append(new_worker)
+                logger.info(f"Model {model_key} assigned to inference worker {new_worker}")
+        return min(workers, key=lambda w: self.worker_pending[w])
+
+    async def run(self, method_name: str, *args):
+        """Run a translator method on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        worker = None
+        if self.kind == "sharded":
+            worker = self._pick_worker(args[0])
+            future = loop.run_in_executor(
+                self.pools[worker], _run_in_inference_worker, method_name, *args
+            )
+            self.worker_pending[worker] += 1
+        elif self.kind == "process":
+            future = loop.run_in_executor(self.pools[0], _run_in_inference_worker, method_name, *args)
+        else:
+            future = loop.run_in_executor(self.pools[0], getattr(self.translator, method_name), *args)
+
+        self.pending += 1
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            if worker is not None:
+                self.worker_pending[worker] -= 1
+
+    def run_on_workers(self, method_name: str) -> List[asyncio.Future]:
+        """Queue a translator method that takes no arguments once per worker process.
+
+        A sharded pool runs it on every worker. A process pool gets one call per
+        worker, but an idle worker may take several of them, so some workers are
+        only reached by a later round. Workers still busy with the previous
+        round's call are skipped. Thread pools share this process: no calls.
+        """
+        if self.kind == "thread":
+            return []
+        loop = asyncio.get_running_loop()
+        futures = []
+        for slot in range(self.max_workers):
+            if slot in self.worker_calls:
+                continue
+            pool = self.pools[slot if self.kind == "sharded" else 0]
+            future = loop.run_in_executor(pool, _run_in_inference_worker, method_name)
+            self.worker_calls[slot] = future
+            future.add_done_callback(lambda _, slot=slot: self.worker_calls.pop(slot, None))
+            futures.append(future)
+        return futures
+
+    def shutdown(self):
+        """Stop the pool without waiting for running calls"""
+        for pool in self.pools:
+            pool.shutdown(wait=False)
+
+
+class BatchScheduler:
+    """Groups concurrent translation requests per model key into batched pipeline calls"""
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        max_batch_size: int = BATCH_MAX_SIZE,
+    ):
+        self.executor = executor
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.pending: Dict[str, list] = {}  # model_key -> [(text, future, enqueued_at)]
+        self.wakeups: Dict[str, asyncio.Event] = {}
+        self.collectors: Dict[str, asyncio.Task] = {}
+        self.running = set()  # Batch tasks in flight
+        self.batches = 0
+        self.items = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Batching counters"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "waiting": sum(len(items) for items in self.pending.values()),
+        }
+
+    async def translate(self, model_key: str, text: str) -> str:
+        """Queue a text for the next batch of its model and await the translation"""
+        if model_key not in self.collectors:
+            self.pending[model_key] = []
+            self.wakeups[model_key] = asyncio.Event()
+            self.collectors[model_key] = asyncio.create_task(self._collect(model_key))
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[model_key].append((text, future, time.perf_counter()))
+        self.wakeups[model_key].set()
+        return await future
+
+    async def _collect(self, model_key: str):
+        """Cut batches for one model: dispatch when full or when max wait elapses"""
+        loop = asyncio.get_running_loop()
+        items = self.pending[model_key]
+        wakeup = self.wakeups[model_key]
+
+        while True:
+            await wakeup.wait()
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = items[: self.max_batch_size]
+            del items[: self.max_batch_size]
+            if items:
+                wakeup.set()  # Leftovers start the next batch straight away
+            else:
+                wakeup.clear()
+
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                continue  # Every caller gave up (e.g. superseded interim results)
+
+            task = asyncio.create_task(self._run_batch(model_key, batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run_batch(self, model_key: str, batch: list):
+        """Run one batch on the inference pool and hand each result to its caller"""
+        self.batches += 1
+        self.items += len(batch)
+        dispatched = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            STAGE_SECONDS.observe(dispatched - enqueued_at, stage="batch_wait", model=model_key)
+        BATCH_SIZE.observe(len(batch), model=model_key)
+        try:
+            # Includes time queued on the pool, tokenization, generation and decoding
+            with STAGE_SECONDS.time(stage="inference", model=model_key):
+                results = await self.executor.run(
+                    "translate_batch", model_key, [text for text, _, _ in batch]
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def shutdown(self):
+        """Stop the collectors"""
+        for task in self.collectors.values():
+            task.cancel()
+        self.collectors.clear()
+
+
+class Seq2SeqTranslator:
+    """Calls a seq2seq model directly instead of through pipeline("translation").
+
+    Takes the same call arguments and returns the same results as the pipeline,
+    without its per-call pre- and postprocessing. Texts are encoded in one
+    tokenizer call, and token ids of recent texts are reused. Inputs are padded
+    into per-thread buffers, generation runs under torch.inference_mode, and
+    outputs are decoded in one batch_decode.
+    """
+
+    def __init__(self, model_key: str, model, tokenizer, threads: int = 0, token_cache_size: int = TOKEN_CACHE_SIZE):
+        self.model_key = model_key
+        self.model = model
+        self.tokenizer = tokenizer
+        self.threads = threads
+        self.pad_token_id = tokenizer.pad_token_id
+        self.token_cache: "OrderedDict[str, Any]" = OrderedDict()  # text -> 1-D id tensor
+        self.token_cache_size = token_cache_size
+        self._token_lock = threading.Lock()
+        self._buffers = threading.local()  # Pool threads may share a model
+
+    def encode(self, texts: List[str]) -> list:
+        """Token ids of each text as a 1-D tensor, tokenizing only uncached texts"""
+        ids = [None] * len(texts)
+        missing = []
+        with self._token_lock:
+            for i, text in enumerate(texts):
+                token_ids = self.token_cache.get(text)
+                if token_ids is None:
+                    missing.append(i)
+                else:
+                    self.token_cache.move_to_end(text)
+                    ids[i] = token_ids
+        if not missing:
+            return ids
+
+        start = time.perf_counter()
+        encoded = self.tokenizer(
+            [texts[i] for i in missing], truncation=True, max_length=MODEL_MAX_LENGTH
+        )["input_ids"]
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="tokenize", model=self.model_key)
+        with self._token_lock:
+            for i, token_ids in zip(missing, encoded):
+                ids[i] = torch.tensor(token_ids, dtype=torch.long)
+                if self.token_cache_size:
+                    self.token_cache[texts[i]] = ids[i]
+            while len(self.token_cache) > self.token_cache_size:
+                self.token_cache.popitem(last=False)
+        return ids
+
+    def _pad(self, ids: list):
+        """Right-pad token ids into this thread's reusable input buffers"""
+        rows, length = len(ids), max(len(token_ids) for token_ids in ids)
+        size = rows * length
+        buffers = self._buffers
+        if getattr(buffers, "size", 0) < size:
+            buffers.size = max(size, 2 * getattr(buffers, "size", 0), 1024)
+            buffers.input_ids = torch.empty(buffers.size, dtype=torch.long)
+            buffers.attention_mask = torch.empty(buffers.size, dtype=torch.long)
+        input_ids = buffers.input_ids[:size].view(rows, length).fill_(self.pad_token_id)
+        attention_mask = buffers.attention_mask[:size].view(rows, length).zero_()
+        for row, token_ids in enumerate(ids):
+            input_ids[row, : len(token_ids)] = token_ids
+            attention_mask[row, : len(token_ids)] = 1
+        return input_ids, attention_mask
+
+    def generate(self, ids: list, max_length: int = MODEL_MAX_LENGTH, num_beams: int = 1, **generate_kwargs) -> List[str]:
+        """Translate already-encoded texts"""
+        # Process-wide; per-model counts only occur in process workers (see OfflineTranslator)
+        if self.threads and torch.get_num_threads() != self.threads:
+            torch.set_num_threads(self.threads)
+        input_ids, attention_mask = self._pad(ids)
+
+        start = time.perf_counter()
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                max_length=max_length,
+                num_beams=num_beams,
+                **generate_kwargs,
+            )
+        generated = time.perf_counter()
+        translations = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        STAGE_SECONDS.observe(generated - start, stage="generate", model=self.model_key)
+        STAGE_SECONDS.observe(time.perf_counter() - generated, stage="decode", model=self.model_key)
+        return translations
+
+    def __call__(self, texts, max_length: int = MODEL_MAX_LENGTH, num_beams: int = 1, batch_size=None, **generate_kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        translations = self.generate(self.encode(texts), max_length, num_beams, **generate_kwargs)
+        return [{"translation_text": translation} for translation in translations]
+
+
 class OfflineTranslator:
     """Manages bidirectional offline translation models"""
 
-    def __init__(self):
-        _import_ml_libraries()  # Import ML libraries when translator is created
-        self.translators = {}
+    def __init__(
+        self,
+        executor_kind: str = INFERENCE_EXECUTOR,
+        max_workers: int = INFERENCE_WORKERS,
+        batch_max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        batch_max_size: int = BATCH_MAX_SIZE,
+        cache_size: int = TRANSLATION_CACHE_SIZE,
+        cache_ttl: float = TRANSLATION_CACHE_TTL,
+        cache_file: str = TRANSLATION_CACHE_FILE,
+        memory_budget_mb: float = MODEL_MEMORY_BUDGET_MB,
+        backend: str = MODEL_BACKEND,
+        segment_max_chars: int = SEGMENT_MAX_CHARS,
+        shared_weights: bool = SHARED_WEIGHTS,
+        generation_profile: str = GENERATION_PROFILE,
+        threads: str = TORCH_THREADS,
+    ):
+        # ML libraries are imported on the first model load, not here
+        self.threads_spec = threads
+        self.threads, self.thread_overrides = resolve_thread_counts(threads)
+        if self.thread_overrides and executor_kind == "thread":
+            # torch.set_num_threads is process-wide: concurrent calls for different
+            # models on pool threads would keep overwriting each other's count
+            raise ValueError(
+                f"Per-model torch threads ('{threads}') need the process or sharded "
+                "executor; the thread executor takes a single count"
+            )
+        self.generation_profile_spec = generation_profile
+        self.generation_profile, self.generation_overrides = resolve_generation_profiles(
+            generation_profile
+        )
+        self.shared_weights = shared_weights
+        self.segment_max_chars = segment_max_chars
+        self.backend_spec = backend
+        self.backend, self.backend_overrides = resolve_model_backends(backend)
+        self.memory_budget_mb = memory_budget_mb
+        self.translators = ModelRegistry(memory_budget_mb)
         self.supported_languages = list(TRANSLATION_MODELS.keys())
+        self.cache = TranslationCache(cache_size, cache_ttl, cache_file)
+        self._in_flight: Dict[tuple, asyncio.Future] = {}  # Uncached texts being translated
+        self._direct_models: Dict[str, bool] = {}  # Direct pair model -> cached locally
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers
+        self.batch_max_wait_ms = batch_max_wait_ms
+        self.batch_max_size = batch_max_size
+        self._executor = None  # Created on first async call
+        self._batcher = None
+        self._load_lock = threading.Lock()  # Guards _model_locks
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self.load_times: Dict[str, float] = {}  # model_key -> seconds
+        self.worker_models: Dict[int, Dict[str, Any]] = {}  # Worker pid -> ModelRegistry stats
         logger.info(
             f"Bidirectional translator initialized. Supported languages: {self.supported_languages}"
         )
 
+    @property
+    def executor(self) -> InferenceExecutor:
+        """Inference pool used by the async translate APIs"""
+        if self._executor is None:
+            self._executor = InferenceExecutor(self, self.executor_kind, self.max_workers)
+        return self._executor
+
+    @property
+    def batcher(self) -> BatchScheduler:
+        """Per-model micro-batching queue in front of the pipelines"""
+        if self._batcher is None:
+            self._batcher = BatchScheduler(
+                self.executor, self.batch_max_wait_ms, self.batch_max_size
+            )
+        return self._batcher
+
+    def shutdown(self):
+        """Release the batching queues and the inference pool, persist the cache"""
+        self.cache.save()
+        if self._batcher is not None:
+            self._batcher.shutdown()
+            self._batcher = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def worker_stats(self) -> Dict[str, Any]:
+        """This process's model registry and the metrics recorded since the last call"""
+        return {"pid": os.getpid(), "models": self.translators.stats(), "metrics": metrics.drain()}
+
+    async def refresh_worker_stats(self, timeout: float = 1.0):
+        """Collect worker_stats from the inference worker processes.
+
+        Stats calls queue behind running translations; those that do not finish
+        within timeout are merged whenever they do.
+        """
+        if self._executor is None:
+            return
+        calls = self._executor.run_on_workers("worker_stats")
+        for call in calls:
+            call.add_done_callback(self._merge_worker_stats)
+        if calls:
+            await asyncio.wait(calls, timeout=timeout)
+
+    def _merge_worker_stats(self, call: asyncio.Future):
+        if call.cancelled():
+            return
+        if call.exception() is not None:
+            logger.warning(f"Could not collect inference worker stats: {call.exception()}")
+            return
+        stats = call.result()
+        metrics.merge(stats["metrics"])
+        self.worker_models[stats["pid"]] = stats["models"]
+
+    def model_stats(self) -> Dict[str, Any]:
+        """ModelRegistry stats of this process and every worker process, combined.
+
+        Sizes of a model resident in several workers add up; the budget applies
+        per process.
+        """
+        registries = [self.translators.stats()] + list(self.worker_models.values())
+        if len(registries) == 1:
+            return registries[0]
+
+        models: Dict[str, int] = {}
+        in_flight: Dict[str, int] = {}
+        for stats in registries:
+            for model_key, size in stats["models"].items():
+                models[model_key] = models.get(model_key, 0) + size
+            for model_key, count in stats["in_flight"].items():
+                in_flight[model_key] = in_flight.get(model_key, 0) + count
+        events = sorted((event for stats in registries for event in stats["events"]), key=lambda event: event["time"])
+        return {
+            "resident_bytes": sum(stats["resident_bytes"] for stats in registries),
+            "budget_bytes": registries[0]["budget_bytes"],
+            "models": models,
+            "in_flight": in_flight,
+            "loads": sum(stats["loads"] for stats in registries),
+            "evictions": sum(stats["evictions"] for stats in registries),
+            "events": events[-100:],
+        }
+
+    def loaded_models(self) -> List[str]:
+        """Keys of the models resident here or in any worker process"""
+        return list(self.model_stats()["models"])
+
+    @property
+    def pending_calls(self) -> int:
+        """Calls running or queued on the inference pool (0 before it is created)"""
+        return self._executor.pending if self._executor is not None else 0
+
+    def executor_stats(self) -> Optional[Dict[str, Any]]:
+        """Inference pool stats, or None if no async call has created the pool yet"""
+        return self._executor.stats() if self._executor is not None else None
+
+    def batcher_stats(self) -> Optional[Dict[str, Any]]:
+        """Batching queue stats, or None if batching has not started"""
+        return self._batcher.stats() if self._batcher is not None else None
+
     def load_model(self, model_key: str):
         """Load a translation model by key"""
-        if model_key in self.translators:
-            return self.translators[model_key]
+        translator = self.translators.get(model_key)
+        if translator is not None:
+            return translator
 
+        # Pool threads may ask for the same model at once; load it only once,
+        # while different models still load in parallel
+        with self._load_lock:
+            model_lock = self._model_locks.setdefault(model_key, threading.Lock())
+        with model_lock:
+            translator = self.translators.get(model_key)
+            if translator is not None:
+                return translator
+            return self._load_model(model_key)
+
+    def _load_model(self, model_key: str):
+        """Load a translation model (caller holds the model's lock)"""
         logger.info(f"Loading translation model: {model_key}")
+        start = time.perf_counter()
+        _import_ml_libraries()
 
         try:
             # Try to load model and tokenizer from local cache first
@@ -117,23 +1948,43 @@ class OfflineTranslator:
                 model_key,
                 cache_dir=MODELS_CACHE_DIR,
                 local_files_only=True,  # Force offline mode
+                use_fast=True,  # Falls back to the Python tokenizer if there is no fast one
             )
-            model = AutoModelForSeq2SeqLM.from_pretrained(
-                model_key,
-                cache_dir=MODELS_CACHE_DIR,
-                local_files_only=True,  # Force offline mode
-            )
+            backend = self.backend_for(model_key)
+            size = None  # Measured from the model parameters by the registry
+            if backend == "onnx":
+                try:
+                    model, size = self._load_onnx_model(model_key)
+                except ImportError as e:
+                    logger.warning(f"ONNX backend unavailable ({e}), using torch for {model_key}")
+                    backend = "torch"
+            if backend != "onnx":
+                model = AutoModelForSeq2SeqLM.from_pretrained(
+                    model_key,
+                    cache_dir=MODELS_CACHE_DIR,
+                    local_files_only=True,  # Force offline mode
+                )
+                if self.shared_weights and backend == "torch" and model is not None:
+                    self._map_shared_weights(model_key, model)
+                if backend == "quantized" and model is not None:
+                    model = torch.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                    size = _quantized_model_bytes(model)
+
+            if model is not None and tokenizer is not None:
+                translator = Seq2SeqTranslator(
+                    model_key, model, tokenizer, self.threads_for(model_key)
+                )
+            else:  # Mock libraries
+                translator = pipeline("translation", model=model, tokenizer=tokenizer, device=-1)
 
-            # Create translation pipeline
-            translator = pipeline(
-                "translation",
-                model=model,
-                tokenizer=tokenizer,
-                device=-1,  # Use CPU (set to 0 for GPU)
+            self.load_times[model_key] = time.perf_counter() - start
+            STAGE_SECONDS.observe(self.load_times[model_key], stage="model_load", model=model_key)
+            logger.info(
+                f"Model loaded successfully: {model_key} [{backend}] ({self.load_times[model_key]:.2f}s)"
             )
-
-            self.translators[model_key] = translator
-            logger.info(f"Model loaded successfully: {model_key}")
+            self.translators.add(model_key, translator, self.load_times[model_key], size)
             return translator
 
         except Exception as e:
@@ -141,13 +1992,8 @@ class OfflineTranslator:
             logger.warning("Using fallback mock translator for demonstration")
             
             # Create a mock translator for demonstration
-            class MockTranslator:
-                def __call__(self, text, **kwargs):
-                    # Simple mock translation - just add [TRANSLATED] prefix
-                    return [{"translation_text": f"[MOCK TRANSLATION] {text}"}]
-            
             mock_translator = MockTranslator()
-            self.translators[model_key] = mock_translator
+            self.translators.add(model_key, mock_translator)
             return mock_translator
 
     def translate_to_english(self, text: str, source_language: str) -> str:
@@ -157,12 +2003,9 @@ class OfflineTranslator:
                 raise ValueError(f"Language '{source_language}' not supported")
 
             model_key = TRANSLATION_MODELS[source_language]["to_en"]
-            translator = self.load_model(model_key)
-
-            result = translator(text, max_length=512)
-            translation = result[0]["translation_text"]
+            translation = self._translate_segmented(model_key, text)
 
-            logger.info(f"Translated to English: '{text}' → '{translation}'")
+            logger.debug("Translated to English: '%s' → '%s'", text, translation)
             return translation
 
         except Exception as e:
@@ -176,13 +2019,347 @@ class OfflineTranslator:
                 raise ValueError(f"Language '{target_language}' not supported")
 
             model_key = TRANSLATION_MODELS[target_language]["from_en"]
+            translation = self._translate_segmented(model_key, text)
+
+            logger.debug(
+                "Translated from English: '%s' → '%s' (%s)", text, translation, target_language
+            )
+            return translation
+
+        except Exception as e:
+            logger.error(f"Translation from English error: {e}")
+            return f"Translation error: {str(e)}"
+
+    def _translate_cached(self, model_key: str, text: str) -> str:
+        """Translate one text in the calling thread, going through the result cache"""
+        translation = self.cache.get(model_key, text)
+        if translation is None:
+            translation = self.translate_batch(model_key, [text])[0]
+            self.check_direct_model(model_key, translation)
+            self.cache.put(model_key, text, translation)
+        return translation
+
+    async def _translate_cached_async(self, model_key: str, text: str) -> str:
+        """Translate one text via the batching queue, going through the result cache.
+
+        Concurrent requests for the same uncached text share one translation, so
+        listeners in several languages pivot each utterance through English once.
+        """
+        translation = self.cache.get(model_key, text)
+        if translation is not None:
+            return translation
+
+        key = (model_key, self.cache.normalize(text))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._translate_and_cache(model_key, text))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded: a cancelled caller must not cancel the work others wait on
+        return await asyncio.shield(task)
+
+    async def _translate_and_cache(self, model_key: str, text: str) -> str:
+        translation = await self.batcher.translate(model_key, text)
+        self.check_direct_model(model_key, translation)
+        self.cache.put(model_key, text, translation)
+        return translation
+
+    def check_direct_model(self, model_key: str, translation: str):
+        """A direct pair model whose output is a mock failed to load: pivot instead.
+
+        Callers translating outside the async APIs (e.g. batch jobs) run this
+        on every result they get from translate_batch.
+        """
+        if self._direct_models.get(model_key) and is_mock_translation(translation):
+            self._direct_models[model_key] = False
+            logger.warning(f"Direct model {model_key} failed to load, pivoting through English instead")
+
+    def _map_shared_weights(self, model_key: str, model):
+        """Swap a model's tensors for ones mmapped from a weights file.
+
+        Pages of a read-only private mapping come from the page cache, so every
+        worker process that maps the same file shares one copy of the weights.
+        The file is written under MODELS_CACHE_DIR the first time.
+        """
+        weights_path = os.path.join(
+            MODELS_CACHE_DIR, "shared", model_key.replace("/", "--") + ".pt"
+        )
+        if not os.path.exists(weights_path):
+            os.makedirs(os.path.dirname(weights_path), exist_ok=True)
+            tmp_path = f"{weights_path}.{os.getpid()}.tmp"
+            torch.save(model.state_dict(), tmp_path)
+            os.replace(tmp_path, weights_path)  # Workers may race to write it
+
+        state_dict = torch.load(weights_path, mmap=True, weights_only=True)
+        model.load_state_dict(state_dict, assign=True)
+        model.tie_weights()
+        logger.info(f"Mapped shared weights for {model_key} from {weights_path}")
+
+    def backend_for(self, model_key: str) -> str:
+        """Inference backend configured for a model"""
+        return self.backend_overrides.get(model_key, self.backend)
+
+    def threads_for(self, model_key: str) -> int:
+        """torch intra-op threads configured for a model (0 = torch's default)"""
+        return self.thread_overrides.get(model_key, self.threads)
+
+    def profile_for(self, model_key: str) -> str:
+        """Generation profile configured for a model"""
+        return self.generation_overrides.get(model_key, self.generation_profile)
+
+    def _load_onnx_model(self, model_key: str):
+        """Load an ONNX Runtime model, exporting it under MODELS_CACHE_DIR on first use"""
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM  # Optional dependency
+
+        onnx_dir = os.path.join(MODELS_CACHE_DIR, "onnx", model_key.replace("/", "--"))
+        if os.path.isdir(onnx_dir) and os.listdir(onnx_dir):
+            model = ORTModelForSeq2SeqLM.from_pretrained(onnx_dir)
+        else:
+            logger.info(f"Exporting {model_key} to ONNX: {onnx_dir}")
+            model = ORTModelForSeq2SeqLM.from_pretrained(
+                model_key,
+                export=True,
+                cache_dir=MODELS_CACHE_DIR,
+                local_files_only=True,  # Force offline mode
+            )
+            model.save_pretrained(onnx_dir)
+        return model, _directory_bytes(onnx_dir)
+
+    def warm_up_model(self, model_key: str) -> float:
+        """Load a model and run one inference so the first real request is hot"""
+        start = time.perf_counter()
+        self.translate_batch(model_key, ["Hello"])
+        elapsed = time.perf_counter() - start
+        logger.info(f"Model warmed up: {model_key} ({elapsed:.2f}s)")
+        return elapsed
+
+    async def preload_async(self, model_keys: List[str]):
+        """Load and warm up models in parallel on the inference pool"""
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.executor.run("warm_up_model", model_key) for model_key in model_keys),
+            return_exceptions=True,
+        )
+        for model_key, result in zip(model_keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to preload {model_key}: {result}")
+        logger.info(
+            f"Preloaded {len(model_keys)} models in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _translate_segmented(self, model_key: str, text: str) -> str:
+        """Translate sentence by sentence in one batch, so nothing is truncated"""
+        segments = split_sentences(text, self.segment_max_chars)
+        if len(segments) <= 1:
+            return self._translate_cached(model_key, text)
+
+        translations = [self.cache.get(model_key, segment) for segment, _ in segments]
+        missing = [i for i, translation in enumerate(translations) if translation is None]
+        if missing:
+            results = self.translate_batch(model_key, [segments[i][0] for i in missing])
+            self.check_direct_model(model_key, results[0])
+            for i, result in zip(missing, results):
+                translations[i] = result
+                self.cache.put(model_key, segments[i][0], result)
+        return "".join(
+            translation + separator
+            for translation, (_, separator) in zip(translations, segments)
+        )
+
+    async def _translate_segmented_async(self, model_key: str, text: str) -> str:
+        """Translate sentences concurrently; the batcher runs them as one padded batch"""
+        segments = split_sentences(text, self.segment_max_chars)
+        if len(segments) <= 1:
+            return await self._translate_cached_async(model_key, text)
+
+        translations = await asyncio.gather(
+            *(self._translate_cached_async(model_key, segment) for segment, _ in segments)
+        )
+        return "".join(
+            translation + separator
+            for translation, (_, separator) in zip(translations, segments)
+        )
+
+    async def translate_interim_async(self, text: str, source_language: str, target_language: str) -> str:
+        """Translate a still-growing utterance between any two supported languages.
+
+        Complete sentences are the stable prefix and go through the cache, so each
+        is translated once however many interim updates repeat it. The trailing
+        fragment changes with every update and is translated without caching.
+        """
+        route = self.route(source_language, target_language)
+        segments = split_sentences(text, self.segment_max_chars)
+        if not route or not segments:
+            return text
+
+        async def translate_fragment(fragment: str) -> str:
+            for model_key in route:
+                fragment = await self.batcher.translate(model_key, fragment)
+            return fragment
+
+        *stable, (fragment, _) = segments
+        translations = await asyncio.gather(
+            *(self.translate_route_async(route, segment) for segment, _ in stable),
+            translate_fragment(fragment),
+        )
+        return "".join(
+            translation + separator
+            for translation, (_, separator) in zip(translations, segments)
+        )
+
+    def direct_model_key(self, source_language: str, target_language: str) -> Optional[str]:
+        """opus-mt model for a non-English pair, if it is in the local model cache
+        and has not failed to load"""
+        model_key = f"Helsinki-NLP/opus-mt-{source_language}-{target_language}"
+        if model_key not in self._direct_models:
+            cache_path = os.path.join(MODELS_CACHE_DIR, "models--" + model_key.replace("/", "--"))
+            self._direct_models[model_key] = os.path.isdir(cache_path)
+        return model_key if self._direct_models[model_key] else None
+
+    def route(self, source_language: str, target_language: str) -> List[str]:
+        """Model keys to chain for a language pair: direct, or pivot through English"""
+        for language in (source_language, target_language):
+            if language != "en" and language not in TRANSLATION_MODELS:
+                raise ValueError(f"Language '{language}' not supported")
+
+        if source_language == target_language:
+            return []
+        if source_language == "en":
+            return [TRANSLATION_MODELS[target_language]["from_en"]]
+        if target_language == "en":
+            return [TRANSLATION_MODELS[source_language]["to_en"]]
+
+        direct = self.direct_model_key(source_language, target_language)
+        if direct:
+            return [direct]
+        return [
+            TRANSLATION_MODELS[source_language]["to_en"],
+            TRANSLATION_MODELS[target_language]["from_en"],
+        ]
+
+    def translate(self, text: str, source_language: str, target_language: str) -> str:
+        """Translate between any two supported languages (English included)"""
+        try:
+            route = self.route(source_language, target_language)
+            translation = text
+            for model_key in route:
+                translation = self._translate_segmented(model_key, translation)
+            if route != self.route(source_language, target_language):
+                # The direct model failed to load; pivot through English instead
+                return self.translate(text, source_language, target_language)
+
+            logger.debug(
+                "Translated %s→%s: '%s' → '%s'", source_language, target_language, text, translation
+            )
+            return translation
+
+        except Exception as e:
+            logger.error(f"Translation {source_language}→{target_language} error: {e}")
+            return f"Translation error: {str(e)}"
+
+    async def translate_async(self, text: str, source_language: str, target_language: str) -> str:
+        """Awaitable translate; a pivot's English is cached and shared between listeners"""
+        try:
+            route = self.route(source_language, target_language)
+            translation = await self.translate_route_async(route, text) if route else text
+            if route != self.route(source_language, target_language):
+                # The direct model failed to load; pivot through English instead
+                return await self.translate_async(text, source_language, target_language)
+
+            logger.debug(
+                "Translated %s→%s: '%s' → '%s'", source_language, target_language, text, translation
+            )
+            return translation
+
+        except Exception as e:
+            logger.error(f"Translation {source_language}→{target_language} error: {e}")
+            return f"Translation error: {str(e)}"
+
+    async def translate_route_async(self, route: List[str], text: str) -> str:
+        """Run text through a chain of models, caching every hop"""
+        for model_key in route:
+            text = await self._translate_segmented_async(model_key, text)
+        return text
+
+    def translate_batch(self, model_key: str, texts: List[str]) -> List[str]:
+        """Translate several texts with one padded model call per decoding mode.
+
+        Generation settings follow the model's profile and each text's token
+        count; texts needing the same number of beams share a call, whose max
+        length covers the longest of them.
+        """
+        self.translators.acquire(model_key)  # Not evictable while translating
+        try:
             translator = self.load_model(model_key)
+            profile = self.profile_for(model_key)
+            direct = isinstance(translator, Seq2SeqTranslator)
+            if direct:
+                ids = translator.encode(texts)  # Encoded once, for counting and generating
+                token_counts = [len(token_ids) for token_ids in ids]
+            else:
+                token_counts = [estimate_token_count(text) for text in texts]
+
+            groups: Dict[int, List[int]] = {}  # num_beams -> text indexes
+            max_lengths: Dict[int, int] = {}
+            for i, token_count in enumerate(token_counts):
+                settings = generation_settings(token_count, profile)
+                groups.setdefault(settings["num_beams"], []).append(i)
+                max_lengths[settings["num_beams"]] = max(
+                    max_lengths.get(settings["num_beams"], 0), settings["max_length"]
+                )
 
-            result = translator(text, max_length=512)
-            translation = result[0]["translation_text"]
+            translations = [None] * len(texts)
+            for num_beams, indexes in groups.items():
+                if direct:
+                    results = translator.generate(
+                        [ids[i] for i in indexes], max_lengths[num_beams], num_beams
+                    )
+                else:
+                    results = [
+                        result["translation_text"]
+                        for result in translator(
+                            [texts[i] for i in indexes],
+                            max_length=max_lengths[num_beams],
+                            num_beams=num_beams,
+                            batch_size=len(indexes),
+                        )
+                    ]
+                for i, result in zip(indexes, results):
+                    translations[i] = result
+                GENERATIONS_TOTAL.inc(
+                    len(indexes), profile=profile, decoding="greedy" if num_beams == 1 else "beam"
+                )
+        finally:
+            self.translators.release(model_key)
+        return translations
 
-            logger.info(
-                f"Translated from English: '{text}' → '{translation}' ({target_language})"
+    async def translate_to_english_async(self, text: str, source_language: str) -> str:
+        """Awaitable translate_to_english, batched and run on the inference pool"""
+        try:
+            if source_language not in TRANSLATION_MODELS:
+                raise ValueError(f"Language '{source_language}' not supported")
+
+            model_key = TRANSLATION_MODELS[source_language]["to_en"]
+            translation = await self._translate_segmented_async(model_key, text)
+
+            logger.debug("Translated to English: '%s' → '%s'", text, translation)
+            return translation
+
+        except Exception as e:
+            logger.error(f"Translation to English error: {e}")
+            return f"Translation error: {str(e)}"
+
+    async def translate_from_english_async(self, text: str, target_language: str) -> str:
+        """Awaitable translate_from_english, batched and run on the inference pool"""
+        try:
+            if target_language not in TRANSLATION_MODELS:
+                raise ValueError(f"Language '{target_language}' not supported")
+
+            model_key = TRANSLATION_MODELS[target_language]["from_en"]
+            translation = await self._translate_segmented_async(model_key, text)
+
+            logger.debug(
+                "Translated from English: '%s' → '%s' (%s)", text, translation, target_language
             )
             return translation
 
@@ -191,13 +2368,305 @@ class OfflineTranslator:
             return f"Translation error: {str(e)}"
 
 
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` tokens per second up to `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> bool:
+        """Spend one token if available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the next token is available"""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else 1.0
+
+
+SESSION_CHANNEL_PREFIX = "translation:session:"
+NODES_CHANNEL = "translation:nodes"
+
+
+def session_channel(session_id) -> str:
+    """Bus channel of one session's broadcasts, subscribed by nodes with members in it"""
+    return f"{SESSION_CHANNEL_PREFIX}{session_id}"
+
+
+class MessageBus(abc.ABC):
+    """Pub/sub transport between server nodes (payloads are JSON strings)"""
+
+    @abc.abstractmethod
+    async def start(self, handler, channels: List[str]):
+        """Connect and call `await handler(channel, payload)` for every message"""
+
+    @abc.abstractmethod
+    async def subscribe(self, channel: str):
+        """Also receive a channel, from now on"""
+
+    @abc.abstractmethod
+    async def unsubscribe(self, channel: str):
+        """Stop receiving a channel"""
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, payload: str):
+        """Send a payload to every node subscribed to the channel"""
+
+    async def close(self):
+        pass
+
+
+class InProcessBus(MessageBus):
+    """Bus between servers running in the same process (tests, single-box setups)"""
+
+    _subscribers: Dict[str, Dict[str, list]] = {}  # bus name -> channel -> handlers
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self.handler = None
+        self.channels: List[str] = []
+
+    async def start(self, handler, channels: List[str]):
+        self.handler = handler
+        for channel in channels:
+            await self.subscribe(channel)
+
+    async def subscribe(self, channel: str):
+        if channel not in self.channels:
+            self.channels.append(channel)
+            self._subscribers.setdefault(self.name, {}).setdefault(channel, []).append(self.handler)
+
+    async def unsubscribe(self, channel: str):
+        if channel in self.channels:
+            self.channels.remove(channel)
+            handlers = self._subscribers.get(self.name, {}).get(channel, [])
+            if self.handler in handlers:
+                handlers.remove(self.handler)
+
+    async def publish(self, channel: str, payload: str):
+        for handler in list(self._subscribers.get(self.name, {}).get(channel, ())):
+            await handler(channel, payload)
+
+    async def close(self):
+        for channel in list(self.channels):
+            await self.unsubscribe(channel)
+
+
+def _resp_command(*parts: str) -> bytes:
+    """Encode a command in the Redis serialization protocol (RESP)"""
+    encoded = [part.encode("utf-8") for part in parts]
+    return b"".join(
+        [f"*{len(encoded)}\r\n".encode()]
+        + [b"$%d\r\n%s\r\n" % (len(part), part) for part in encoded]
+    )
+
+
+async def _read_resp(reader: asyncio.StreamReader):
+    """Read one RESP value"""
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RuntimeError(f"Bus error: {body.decode()}")
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode("utf-8")
+    if kind == b"*":
+        return [await _read_resp(reader) for _ in range(int(body))]
+    raise RuntimeError(f"Bus protocol error: unexpected {line!r}")
+
+
+class RedisBus(MessageBus):
+    """Bus over the Redis pub/sub protocol, spoken directly over asyncio streams"""
+
+    def __init__(self, url: str):
+        address = url.split("://", 1)[-1].rstrip("/")
+        host, _, port = address.partition(":")
+        self.host = host or "localhost"
+        self.port = int(port or 6379)
+        self.publisher = None  # (reader, writer)
+        self.publish_lock = asyncio.Lock()
+        self.listener = None
+        self.channels: List[str] = []  # Resubscribed on reconnect
+        self.subscriber = None  # Writer of the current subscription connection
+
+    async def start(self, handler, channels: List[str]):
+        self.channels = list(channels)
+        self.publisher = await asyncio.open_connection(self.host, self.port)
+        subscriber = await asyncio.open_connection(self.host, self.port)
+        self.listener = asyncio.create_task(self._listen(subscriber, handler))
+        logger.info(f"Message bus connected: redis://{self.host}:{self.port}")
+
+    async def _listen(self, connection, handler):
+        """Deliver subscribed messages, reconnecting if the bus goes away"""
+        while True:
+            try:
+                reader, writer = connection
+                self.subscriber = writer
+                writer.write(_resp_command("SUBSCRIBE", *self.channels))
+                await writer.drain()
+                while True:
+                    reply = await _read_resp(reader)
+                    if isinstance(reply, list) and reply[0] == "message":
+                        try:
+                            await handler(reply[1], reply[2])
+                        except Exception as e:
+                            logger.error(f"❌ Error handling bus message: {e}")
+            except asyncio.CancelledError:
+                connection[1].close()
+                raise
+            except (OSError, asyncio.IncompleteReadError, RuntimeError) as e:
+                logger.warning(f"Message bus subscription lost ({e}), reconnecting")
+            self.subscriber = None
+            while True:
+                await asyncio.sleep(1.0)
+                try:
+                    connection = await asyncio.open_connection(self.host, self.port)
+                    break
+                except OSError:
+                    continue
+
+    async def subscribe(self, channel: str):
+        if channel not in self.channels:
+            self.channels.append(channel)
+            await self._send_subscription("SUBSCRIBE", channel)
+
+    async def unsubscribe(self, channel: str):
+        if channel in self.channels:
+            self.channels.remove(channel)
+            await self._send_subscription("UNSUBSCRIBE", channel)
+
+    async def _send_subscription(self, command: str, channel: str):
+        """Change the live subscription; the listener reads the confirmation"""
+        writer = self.subscriber
+        if writer is None:
+            return  # Reconnecting; the listener subscribes to self.channels
+        try:
+            writer.write(_resp_command(command, channel))
+            await writer.drain()
+        except (OSError, ConnectionError) as e:
+            logger.warning(f"Message bus {command} {channel} failed ({e}); applied on reconnect")
+
+    async def publish(self, channel: str, payload: str):
+        async with self.publish_lock:
+            try:
+                reader, writer = self.publisher
+                writer.write(_resp_command("PUBLISH", channel, payload))
+                await writer.drain()
+                await _read_resp(reader)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                logger.warning(f"Message bus publish failed ({e}), reconnecting")
+                self.publisher = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        self.subscriber = None
+        if self.listener is not None:
+            self.listener.cancel()
+        if self.publisher is not None:
+            self.publisher[1].close()
+
+
+def create_message_bus(url: str) -> Optional[MessageBus]:
+    """Bus for a MESSAGE_BUS url, or None for a standalone node"""
+    if not url:
+        return None
+    if url.startswith("memory://") or url == "memory":
+        return InProcessBus(url.split("://", 1)[-1] or "default")
+    if url.startswith("redis://"):
+        return RedisBus(url)
+    raise ValueError(f"Unknown message bus '{url}' (use memory://<name> or redis://host:port)")
+
+
 class TranslationServer:
-    def __init__(self, host="localhost", port=8765):
+    def __init__(
+        self,
+        host="localhost",
+        port=8765,
+        executor_kind=INFERENCE_EXECUTOR,
+        inference_workers=INFERENCE_WORKERS,
+        batch_max_wait_ms=BATCH_MAX_WAIT_MS,
+        batch_max_size=BATCH_MAX_SIZE,
+        preload=PRELOAD_MODELS,
+        ready_file=READY_FILE,
+        bus=MESSAGE_BUS,
+        node_id=NODE_ID,
+        metrics_port=METRICS_PORT,
+        log_sample=LOG_SAMPLE,
+        compression=WS_COMPRESSION,
+        max_message_size=WS_MAX_SIZE,
+        max_queue=WS_MAX_QUEUE,
+        write_limit=WS_WRITE_LIMIT,
+        ping_interval=WS_PING_INTERVAL,
+        ping_timeout=WS_PING_TIMEOUT,
+        idle_timeout=CONNECTION_IDLE_TIMEOUT,
+    ):
+        if compression not in ("deflate", "none"):
+            raise ValueError(f"Unknown WebSocket compression '{compression}' (use 'deflate' or 'none')")
         self.host = host
         self.port = port
+        # Connection policy (see serve_options)
+        self.compression = compression
+        self.max_message_size = max_message_size
+        self.max_queue = max_queue
+        self.write_limit = write_limit
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.idle_timeout = idle_timeout
+        self.idle_closed = 0
+        self.sessions_closed = 0
+        self._reaper_task = None
+        self.metrics_port = metrics_port
+        self.metrics = metrics
+        self.log_sampler = LogSampler(log_sample)
+        self.bus = create_message_bus(bus) if isinstance(bus, str) else bus
+        self.node_id = node_id
+        # Other nodes' announcements: node_id -> {"models", "members", "seen"}
+        self.cluster_nodes: Dict[str, Dict[str, Any]] = {}
+        self._announce_task = None
+        self._membership_changed = asyncio.Event()
+        self._subscription_tasks = set()  # Session channel (un)subscriptions in progress
+        self.preload_models = resolve_preload_models(preload)
+        self.ready_file = ready_file
+        self.ready = asyncio.Event()  # Set once preloading has finished
         self.clients: Dict[Any, Dict[str, Any]] = {}
-        self.translator = OfflineTranslator()
-        self.conversation_sessions = {}  # Track conversation sessions
+        # session_id -> role -> connections, kept in step with self.clients
+        self.sessions: Dict[Any, Dict[str, set]] = {}
+        self.send_timeout = BROADCAST_SEND_TIMEOUT
+        # Admission control
+        self.max_queued_per_connection = MAX_QUEUED_PER_CONNECTION
+        self.max_in_flight = MAX_IN_FLIGHT
+        self.drain_timeout = DISCONNECT_DRAIN_TIMEOUT
+        self.in_flight = 0  # Transcriptions queued or being translated, server-wide
+        self.rate_limiters: Dict[Any, TokenBucket] = {}  # session_id -> bucket
+        self.rejections: Dict[str, int] = {}  # reason -> count
+        self.transcription_seconds = 0.5  # Moving average, used for retry hints
+        self._closing = set()  # Close tasks for sockets that timed out
+        self.translator = OfflineTranslator(
+            executor_kind, inference_workers, batch_max_wait_ms, batch_max_size
+        )
+        self.phrase_memory = PhraseMemory()
+        self._pretranslate_task = None
+        self.history = SessionHistory()
+        self._history_task = None
+        self._persist_task = None
 
     async def register_client(self, websocket):
         """Register a new client"""
@@ -206,228 +2675,989 @@ class TranslationServer:
             "translation_enabled": True,
             "role": "traveler",  # "traveler" or "assistant"
             "session_id": None,
+            "queued": 0,  # Admitted transcriptions not yet processed
+            "encoding": "json",  # Outbound framing, negotiated at set_role
+            "last_seen": time.monotonic(),  # Last message received, for idle reaping
         }
-        logger.info(f"Client connected: {websocket.remote_address}")
+        self._index_client(websocket)
+        logger.info("Client connected: %s", websocket.remote_address)
 
     async def unregister_client(self, websocket):
         """Unregister a client"""
         if websocket in self.clients:
-            del self.clients[websocket]
-        logger.info(f"Client disconnected: {websocket.remote_address}")
-
-    def translate_traveler_to_assistant(self, text, traveler_language):
-        """Translate traveler's speech to English for local assistant"""
-        try:
-            if traveler_language not in self.translator.supported_languages:
-                return f"Language '{traveler_language}' not supported offline. Supported: {self.translator.supported_languages}"
-
-            if traveler_language == "en":
-                return text  # Already in English
-
-            translation = self.translator.translate_to_english(text, traveler_language)
-            return translation
+            try:
+                self._cancel_interim(self.clients[websocket])
+                self._unindex_client(websocket)
+            finally:
+                del self.clients[websocket]  # Never leak the connection
+        logger.info("Client disconnected: %s", websocket.remote_address)
 
-        except Exception as e:
-            logger.error(f"Traveler→Assistant translation error: {e}")
-            return f"Translation error: {str(e)}"
+    async def translate_traveler_to_assistant(self, text, traveler_language, assistant_language="en"):
+        """Translate traveler's speech to the local assistant's language (English by default)"""
+        return await self._translate_pair(text, traveler_language, assistant_language)
 
-    def translate_assistant_to_traveler(self, text, traveler_language):
+    async def translate_assistant_to_traveler(self, text, traveler_language, assistant_language="en"):
         """Translate assistant's response to traveler's language"""
+        return await self._translate_pair(text, assistant_language, traveler_language)
+
+    async def _translate_pair(self, text, source_language, target_language):
+        """Translate between two languages, reporting unsupported ones to the client"""
         try:
-            if traveler_language not in self.translator.supported_languages:
-                return f"Language '{traveler_language}' not supported offline. Supported: {self.translator.supported_languages}"
+            if source_language == target_language:
+                return text  # Already in the listener's language
 
-            if traveler_language == "en":
-                return text  # Already in traveler's language
+            supported = ["en"] + self.translator.supported_languages
+            for language in (source_language, target_language):
+                if language not in supported:
+                    return f"Language '{language}' not supported offline. Supported: {self.translator.supported_languages}"
 
-            translation = self.translator.translate_from_english(
-                text, traveler_language
-            )
-            return translation
+            return await self.translator.translate_async(text, source_language, target_language)
 
         except Exception as e:
-            logger.error(f"Assistant→Traveler translation error: {e}")
+            logger.error("%s→%s translation error: %s", source_language, target_language, e)
             return f"Translation error: {str(e)}"
 
+    async def _translate_reply(self, text, source_language, target_language):
+        """Translate an assistant reply, from the phrase memory when it was pretranslated"""
+        if source_language != target_language:
+            translation = self.phrase_memory.lookup(source_language, text, target_language)
+            if translation is not None:
+                return translation
+        return await self._translate_pair(text, source_language, target_language)
+
+    def _idle(self) -> bool:
+        """No transcription is queued or translating and the inference pool is free"""
+        return self.in_flight == 0 and self.translator.pending_calls == 0
+
+    async def _pretranslate_loop(self):
+        """Pretranslate frequent replies into the travelers' languages while idle.
+
+        One phrase at a time, checking for idleness before each, so live
+        traffic never queues behind more than one speculative translation.
+        """
+        while True:
+            await asyncio.sleep(PHRASE_PRETRANSLATE_INTERVAL)
+            if not self.ready.is_set():
+                continue
+            supported = ["en"] + self.translator.supported_languages
+            languages = {
+                self.clients[member].get("language", "es")
+                for roles in self.sessions.values()
+                for member in roles.get("traveler", ())
+            }
+            targets = sorted(language for language in languages if language in supported)
+            for language, text, target in self.phrase_memory.pending(targets):
+                if not self._idle():
+                    break
+                try:
+                    route = self.translator.route(language, target)
+                    translation = await self.translator.translate_route_async(route, text)
+                except Exception as e:
+                    logger.debug("Pretranslation %s→%s of '%s' failed: %s", language, target, text, e)
+                    continue
+                self.phrase_memory.store(language, text, target, translation)
+                logger.debug("Pretranslated %s→%s: '%s' → '%s'", language, target, text, translation)
+
+    async def _persist_loop(self):
+        """Save the translation cache and phrase counts every PERSIST_INTERVAL seconds,
+        so a crash or SIGKILL loses at most one interval of them"""
+        while True:
+            await asyncio.sleep(PERSIST_INTERVAL)
+            await asyncio.to_thread(self.translator.cache.save)
+            await self.phrase_memory.save_async()
+
+    async def _history_loop(self):
+        """Spill the history of sessions that have had no connections for a while"""
+        while True:
+            await asyncio.sleep(min(30.0, max(1.0, self.history.idle_seconds / 2)))
+            await self.history.spill_idle(self.sessions.keys())
+
+    def _listener_languages(self, session_id, role: str, default: str) -> List[str]:
+        """Distinct languages of a role's members in a session"""
+        members = self.sessions.get(session_id, {}).get(role, ())
+        languages = {self.clients[member].get("language", default) for member in members}
+        for node in self._live_nodes():
+            languages.update(node["members"].get(session_id, {}).get(role, {}))
+        return sorted(languages) or [default]
+
+    async def _translate_for_listeners(self, text, source_language, target_languages, translate=None):
+        """Translate once per listener language; pivots share their English hop"""
+        translate = translate or self._translate_pair
+        translations = await asyncio.gather(
+            *(translate(text, source_language, language) for language in target_languages)
+        )
+        return dict(zip(target_languages, translations))
+
     async def handle_client(self, websocket):
         """Handle a client connection"""
         await self.register_client(websocket)
+        client_info = self.clients[websocket]
+        # Messages run in order on a per-connection worker, so reading (and
+        # shedding load) never waits on a translation. The worker exits when the
+        # queue drains, so idle connections hold no task
+        pending = deque()
+        worker = None
 
         try:
             async for message in websocket:
+                client_info["last_seen"] = time.monotonic()
                 try:
-                    logger.info(f"📨 Received raw message: {message}")
-                    data = json.loads(message)
-                    logger.info(f"📋 Parsed message data: {data}")
-                    await self.process_message(websocket, data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"❌ Invalid JSON received: {message} - Error: {e}")
+                    with STAGE_SECONDS.time(stage="parse"):
+                        data = decode_message(message)
+                    message_type = data.get("type")
+                    if message_type not in MESSAGE_TYPES:
+                        message_type = "unknown"  # Clients must not mint metric series
+                    MESSAGES_TOTAL.inc(type=message_type)
+                    if logger.isEnabledFor(logging.DEBUG) and self.log_sampler.sample(message_type):
+                        logger.debug("📨 Received raw message: %s", message)
+                    if await self._admit(websocket, data):
+                        pending.append(data)
+                        if worker is None or worker.done():
+                            worker = asyncio.create_task(self._process_queue(websocket, pending))
+                except ValueError as e:  # Malformed JSON or MessagePack
+                    logger.error("❌ Invalid message received: %r - Error: %s", message, e)
                 except Exception as e:
-                    logger.error(f"❌ Error processing message: {e}")
+                    logger.error("❌ Error processing message: %s", e)
 
         except websockets.exceptions.ConnectionClosed:
             logger.info("🔌 Client connection closed")
         except Exception as e:
-            logger.error(f"❌ Error in client handler: {e}")
+            logger.error("❌ Error in client handler: %s", e)
         finally:
+            # Admitted transcriptions are still broadcast to the session; interim
+            # results have nobody waiting for them once the speaker is gone
+            self._cancel_interim(client_info)
+            for data in [data for data in pending if data.get("type") == "interim_transcription"]:
+                pending.remove(data)
+            if worker is not None and not worker.done():
+                try:
+                    await asyncio.wait_for(worker, self.drain_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f"⏱️ Dropped transcriptions from {websocket.remote_address} still "
+                        f"translating {self.drain_timeout}s after it closed"
+                    )
+            self.in_flight -= self.clients.get(websocket, {}).get("queued", 0)
             await self.unregister_client(websocket)
 
+    async def _process_queue(self, websocket, pending: deque):
+        """Process a connection's admitted messages one at a time, until none are left"""
+        while pending:
+            data = pending.popleft()
+            counted = data.get("type") == "transcription"
+            started = time.monotonic()
+            try:
+                await self.process_message(websocket, data)
+            except Exception as e:
+                logger.error("❌ Error processing message: %s", e)
+            finally:
+                if counted:
+                    self.in_flight -= 1
+                    self.clients[websocket]["queued"] -= 1
+                    elapsed = time.monotonic() - started
+                    STAGE_SECONDS.observe(elapsed, stage="transcription")
+                    self.transcription_seconds += 0.1 * (elapsed - self.transcription_seconds)
+
+    async def _admit(self, websocket, data: Dict[str, Any]) -> bool:
+        """Admission control for translation work; rejected transcriptions get `overloaded`"""
+        message_type = data.get("type")
+        if message_type not in ("transcription", "interim_transcription"):
+            return True  # Control messages are cheap and always admitted
+
+        client_info = self.clients[websocket]
+        if message_type == "interim_transcription":
+            # Interim results are superseded anyway; drop them quietly when busy
+            if self.in_flight >= self.max_in_flight:
+                self._count_rejection("interim_dropped")
+                return False
+            return True
+
+        queued = client_info.get("queued", 0)
+        if self.in_flight >= self.max_in_flight:
+            reason, retry_after = "server_busy", self.transcription_seconds
+        elif queued >= self.max_queued_per_connection:
+            reason, retry_after = "connection_queue_full", self.transcription_seconds * queued
+        else:
+            bucket = self.rate_limiters.get(client_info["session_id"])
+            if bucket is None:
+                bucket = TokenBucket(SESSION_RATE_LIMIT, SESSION_RATE_BURST)
+                self.rate_limiters[client_info["session_id"]] = bucket
+            if bucket.take():
+                client_info["queued"] = queued + 1
+                self.in_flight += 1
+                return True
+            reason, retry_after = "session_rate_limited", bucket.retry_after()
+
+        self._count_rejection(reason)
+        logger.warning("🚦 Rejected transcription from %s: %s", websocket.remote_address, reason)
+        try:
+            await self._send(
+                websocket,
+                {
+                    "type": "overloaded",
+                    "reason": reason,
+                    "retry_after_ms": int(retry_after * 1000),
+                    "original": data.get("text", ""),
+                    "timestamp": time.strftime("%H:%M:%S"),
+                },
+            )
+        except Exception as e:
+            logger.error("❌ Error sending overloaded notice: %s", e)
+        return False
+
+    def _count_rejection(self, reason: str):
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def admission_stats(self) -> Dict[str, Any]:
+        """Queue depths and rejection counts"""
+        queued = [info.get("queued", 0) for info in self.clients.values()]
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_connection_queue": max(queued, default=0),
+            "connections_queueing": sum(1 for depth in queued if depth),
+            "rejections": dict(self.rejections),
+        }
+
     async def process_message(self, websocket, data: Dict[str, Any]):
         """Process a message from the client"""
         message_type = data.get("type")
-        logger.info(f"🎯 Processing message type: {message_type}")
+        # Per-message INFO lines are sampled by type; warnings and errors never are
+        log_message = logger.isEnabledFor(logging.INFO) and self.log_sampler.sample(message_type)
+        logger.debug("🎯 Processing message type: %s", message_type)
 
         if message_type == "set_role":
             # Set client role (traveler or assistant)
             role = data.get("role", "traveler")
             session_id = data.get("session_id", "default")
+            language = data.get("language", "en" if role == "assistant" else "es")
+            invalid = self._invalid_fields(session_id=session_id, role=role, language=language)
+            if invalid:
+                await self._send_error(websocket, f"set_role: {invalid}")
+                return
 
             if websocket in self.clients:
+                self._unindex_client(websocket)
                 self.clients[websocket]["role"] = role
                 self.clients[websocket]["session_id"] = session_id
-                self.clients[websocket]["language"] = data.get("language", "es")
-
-            logger.info(f"👤 Client role set: {role}, session: {session_id}")
+                self.clients[websocket]["language"] = language
+                self._index_client(websocket)
+                self.history.touch(session_id)
+                await self.history.restore(session_id)  # Before anything new is recorded
+
+                requested = data.get("encoding")
+                if requested is not None:
+                    # Acknowledged in the current encoding; later messages use the new one
+                    encoding = requested if requested in MESSAGE_ENCODINGS else "json"
+                    await self._send(
+                        websocket,
+                        {"type": "encoding", "encoding": encoding, "supported": list(MESSAGE_ENCODINGS)},
+                    )
+                    self.clients[websocket]["encoding"] = encoding
+
+            logger.info("👤 Client role set: %s, session: %s", role, session_id)
+
+        elif message_type == "interim_transcription":
+            # Speech still in progress: stream partial translations to the session
+            if websocket in self.clients:
+                self._start_interim_translation(self.clients[websocket], data)
 
         elif message_type == "transcription":
             # Handle speech transcription
             original_text = data.get("text", "")
             client_info = self.clients.get(websocket, {})
+            self._cancel_interim(client_info)  # The final result supersedes it
             role = client_info.get("role", "traveler")
             language = client_info.get("language", "es")
             session_id = client_info.get("session_id", "default")
+            timestamp = time.strftime("%H:%M:%S")  # Shared by the reply and every broadcast
 
-            logger.info(
-                f"🎤 Received from {role}: '{original_text}' (language: {language})"
-            )
+            if log_message:
+                logger.info(
+                    "🎤 Received from %s: '%s' (language: %s)",
+                    role,
+                    original_text,
+                    language,
+                    extra={"event": "transcription", "role": role, "session": session_id, "language": language},
+                )
 
             if role == "traveler":
-                # Traveler speaks → translate to English for assistant
-                translated_text = self.translate_traveler_to_assistant(
-                    original_text, language
+                # Traveler speaks → translate to each assistant's language (English by default)
+                translations = await self._translate_for_listeners(
+                    original_text,
+                    language,
+                    self._listener_languages(session_id, "assistant", "en"),
                 )
-                logger.info(f"🌐 Traveler→Assistant: '{translated_text}'")
-
-                # Broadcast to assistants in the same session
-                await self.broadcast_to_assistants(
+                translated_text = translations.get("en", next(iter(translations.values())))
+                self.history.record(
                     session_id,
-                    {
-                        "type": "traveler_message",
-                        "original": original_text,
-                        "translated": translated_text,
-                        "traveler_language": language,
-                        "timestamp": time.strftime("%H:%M:%S"),
-                    },
+                    "traveler",
+                    language,
+                    original_text,
+                    translations,
+                    "en" if "en" in translations else next(iter(translations)),
                 )
+                if log_message:
+                    logger.info("🌐 Traveler→Assistant: '%s'", translated_text)
+
+                # Broadcast to assistants in the same session, each in their language
+                for assistant_language, translation in translations.items():
+                    await self._broadcast(
+                        session_id,
+                        "assistant",
+                        {
+                            "type": "traveler_message",
+                            "original": original_text,
+                            "translated": translation,
+                            "traveler_language": language,
+                            "target_language": assistant_language,
+                            "timestamp": timestamp,
+                        },
+                        language=assistant_language,
+                    )
 
                 # Send confirmation back to traveler
                 response = {
                     "type": "transcription_sent",
                     "original": original_text,
                     "translated_for_assistant": translated_text,
-                    "timestamp": time.strftime("%H:%M:%S"),
+                    "timestamp": timestamp,
                 }
 
             elif role == "assistant":
-                # Assistant responds → translate to traveler's language
-                # First, get the traveler's language from session
+                # Assistant responds → translate to each traveler's language;
+                # the requested traveler_language is used for the confirmation
                 traveler_language = data.get("traveler_language", "es")
-                translated_text = self.translate_assistant_to_traveler(
-                    original_text, traveler_language
+                target_languages = self._listener_languages(session_id, "traveler", traveler_language)
+                if traveler_language not in target_languages:
+                    target_languages.append(traveler_language)
+                translations = await self._translate_for_listeners(
+                    original_text, language, target_languages, self._translate_reply
                 )
-                logger.info(
-                    f"🌐 Assistant→Traveler: '{translated_text}' ({traveler_language})"
-                )
-
-                # Broadcast to travelers in the same session
-                await self.broadcast_to_travelers(
-                    session_id,
-                    {
-                        "type": "assistant_response",
-                        "original": original_text,
-                        "translated": translated_text,
-                        "traveler_language": traveler_language,
-                        "timestamp": time.strftime("%H:%M:%S"),
-                    },
+                self.phrase_memory.record(language, original_text)
+                self.history.record(
+                    session_id, "assistant", language, original_text, translations, traveler_language
                 )
+                translated_text = translations[traveler_language]
+                if log_message:
+                    logger.info(
+                        "🌐 Assistant→Traveler: '%s' (%s)", translated_text, traveler_language
+                    )
+
+                # Broadcast to travelers in the same session, each in their language
+                for target_language, translation in translations.items():
+                    await self._broadcast(
+                        session_id,
+                        "traveler",
+                        {
+                            "type": "assistant_response",
+                            "original": original_text,
+                            "translated": translation,
+                            "traveler_language": target_language,
+                            "timestamp": timestamp,
+                        },
+                        language=target_language,
+                    )
 
                 # Send confirmation back to assistant
                 response = {
                     "type": "response_sent",
                     "original": original_text,
                     "translated_for_traveler": translated_text,
-                    "timestamp": time.strftime("%H:%M:%S"),
+                    "timestamp": timestamp,
                 }
 
             try:
-                await websocket.send(json.dumps(response))
-                logger.info(f"📤 Sent response to {role}")
+                await self._send(websocket, response)
+                logger.debug("📤 Sent response to %s", role)
+            except websockets.exceptions.ConnectionClosed:
+                logger.debug("%s left before its confirmation was sent", role)
             except Exception as e:
-                logger.error(f"❌ Error sending response: {e}")
+                logger.error("❌ Error sending response: %s", e)
+
+        elif message_type == "sync_history":
+            # Reconnected client: replay the session's recent exchanges in one frame
+            client_info = self.clients.get(websocket, {})
+            session_id = client_info.get("session_id", "default")
+            role = client_info.get("role", "traveler")
+            limit = data.get("limit")
+            await self.history.restore(session_id)
+            await self._send(
+                websocket,
+                {
+                    "type": "history",
+                    "session_id": session_id,
+                    "messages": self.history.replay(
+                        session_id,
+                        role,
+                        client_info.get("language", "en" if role == "assistant" else "es"),
+                        limit if isinstance(limit, int) else None,
+                    ),
+                },
+            )
+
+        elif message_type == "health":
+            await self.translator.refresh_worker_stats()
+            model_memory = self.translator.model_stats()
+            await self._send(
+                websocket,
+                {
+                    "type": "health",
+                    "ready": self.ready.is_set(),
+                    "models": list(model_memory["models"]),
+                    "model_memory": model_memory,
+                    "admission": self.admission_stats(),
+                    "phrase_memory": self.phrase_memory.stats(),
+                    "history": self.history.stats(),
+                    "node": self.node_id,
+                    "cluster": {node["node"]: node["models"] for node in self._live_nodes()},
+                },
+            )
 
         elif message_type == "start_recording":
             # Update client settings when recording starts
+            invalid = self._invalid_fields(language=data.get("language", "es"))
+            if invalid:
+                await self._send_error(websocket, f"start_recording: {invalid}")
+                return
             if websocket in self.clients:
                 self.clients[websocket]["language"] = data.get("language", "es")
                 role = self.clients[websocket].get("role", "traveler")
-                logger.info(
-                    f"🔴 {role} started recording - Language: {data.get('language', 'es')}"
-                )
+                if log_message:
+                    logger.info("🔴 %s started recording - Language: %s", role, data.get("language", "es"))
 
         elif message_type == "stop_recording":
             role = self.clients.get(websocket, {}).get("role", "unknown")
-            logger.info(f"⏹️ {role} stopped recording")
+            if log_message:
+                logger.info("⏹️ %s stopped recording", role)
 
         else:
-            logger.warning(f"⚠️ Unknown message type: {message_type}")
+            logger.warning("⚠️ Unknown message type: %s", message_type)
+
+    @staticmethod
+    def _invalid_fields(**fields) -> Optional[str]:
+        """Why client-set fields are unusable (they become index keys), or None"""
+        for name, value in fields.items():
+            if not isinstance(value, str) or not value or len(value) > CLIENT_FIELD_MAX_CHARS:
+                return f"{name} must be a string of 1 to {CLIENT_FIELD_MAX_CHARS} characters"
+        return None
+
+    async def _send_error(self, websocket, message: str):
+        """Tell a client its message was rejected"""
+        logger.warning("⚠️ Rejected message from %s: %s", websocket.remote_address, message)
+        try:
+            await self._send(websocket, {"type": "error", "message": message, "timestamp": time.strftime("%H:%M:%S")})
+        except Exception as e:
+            logger.error("❌ Error sending error message: %s", e)
+
+    def _start_interim_translation(self, client_info: Dict[str, Any], data: Dict[str, Any]):
+        """Translate an interim result in the background, superseding older ones"""
+        text = data.get("text", "").strip()
+        if not text or text == client_info.get("interim_text"):
+            return  # Recognizers often resend identical interim results
+
+        self._cancel_interim(client_info)
+        client_info["interim_text"] = text
+        client_info["interim_task"] = asyncio.create_task(
+            self._translate_interim(client_info, text, data.get("traveler_language", "es"))
+        )
+
+    def _cancel_interim(self, client_info: Dict[str, Any]):
+        """Cancel a client's in-flight interim translation"""
+        task = client_info.pop("interim_task", None)
+        if task is not None and not task.done():
+            task.cancel()
+        client_info.pop("interim_text", None)
+
+    async def _translate_interim(self, client_info: Dict[str, Any], text: str, traveler_language: str):
+        """Send a partial_translation of an interim result to the other side of the session"""
+        role = client_info.get("role", "traveler")
+        session_id = client_info.get("session_id", "default")
+        language = client_info.get("language", "es")
+        if role == "traveler":
+            listener_role = "assistant"
+            target_languages = self._listener_languages(session_id, "assistant", "en")
+        else:
+            listener_role = "traveler"
+            target_languages = self._listener_languages(session_id, "traveler", traveler_language)
+
+        try:
+            translations = await self._translate_for_listeners(
+                text, language, target_languages, self.translator.translate_interim_async
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("❌ Interim translation error: %s", e)
+            return
+
+        timestamp = time.strftime("%H:%M:%S")
+        for target_language, translation in translations.items():
+            await self._broadcast(
+                session_id,
+                listener_role,
+                {
+                    "type": "partial_translation",
+                    "role": role,
+                    "original": text,
+                    "translated": translation,
+                    "source_language": language,
+                    "target_language": target_language,
+                    "timestamp": timestamp,
+                },
+                language=target_language,
+            )
+
+    def _index_client(self, websocket):
+        """Add a connection to the session index under its current session and role"""
+        info = self.clients[websocket]
+        if info["session_id"] not in self.sessions and info["session_id"] is not None:
+            self._update_subscription(info["session_id"], subscribe=True)
+        roles = self.sessions.setdefault(info["session_id"], {})
+        roles.setdefault(info["role"], set()).add(websocket)
+        self._membership_changed.set()
+
+    def _unindex_client(self, websocket):
+        """Remove a connection from the session index, dropping empty entries"""
+        info = self.clients[websocket]
+        roles = self.sessions.get(info["session_id"], {})
+        members = roles.get(info["role"])
+        if members is None:
+            return
+        members.discard(websocket)
+        if not members:
+            del roles[info["role"]]
+        if not roles:
+            self._close_session(info["session_id"])
+        self._membership_changed.set()
+
+    def _close_session(self, session_id):
+        """Free a session's state once its last connection has left"""
+        del self.sessions[session_id]
+        self.rate_limiters.pop(session_id, None)
+        self.history.touch(session_id)  # Spilled once idle for HISTORY_IDLE_SECONDS
+        if session_id is not None:  # Connections that have not sent set_role yet
+            self._update_subscription(session_id, subscribe=False)
+            self.sessions_closed += 1
+            logger.debug("Session %s closed", session_id)
+
+    def _update_subscription(self, session_id, subscribe: bool):
+        """(Un)subscribe this node from a session's bus channel, in call order"""
+        if self.bus is None:
+            return
+        channel = session_channel(session_id)
+        change = self.bus.subscribe(channel) if subscribe else self.bus.unsubscribe(channel)
+
+        async def apply():
+            try:
+                await change
+            except Exception as e:
+                logger.error("❌ Error updating bus subscription %s: %s", channel, e)
+
+        task = asyncio.create_task(apply())
+        self._subscription_tasks.add(task)
+        task.add_done_callback(self._subscription_tasks.discard)
 
     async def broadcast_to_assistants(self, session_id: str, message: dict):
         """Broadcast message to all assistants in the session"""
-        for client, info in self.clients.items():
-            if info.get("role") == "assistant" and info.get("session_id") == session_id:
-                try:
-                    await client.send(json.dumps(message))
-                    logger.info(f"📡 Broadcasted to assistant in session {session_id}")
-                except Exception as e:
-                    logger.error(f"❌ Error broadcasting to assistant: {e}")
+        await self._broadcast(session_id, "assistant", message)
 
     async def broadcast_to_travelers(self, session_id: str, message: dict):
         """Broadcast message to all travelers in the session"""
-        for client, info in self.clients.items():
-            if info.get("role") == "traveler" and info.get("session_id") == session_id:
-                try:
-                    await client.send(json.dumps(message))
-                    logger.info(f"📡 Broadcasted to traveler in session {session_id}")
-                except Exception as e:
-                    logger.error(f"❌ Error broadcasting to traveler: {e}")
+        await self._broadcast(session_id, "traveler", message)
+
+    async def _broadcast(self, session_id: str, role: str, message: dict, language: Optional[str] = None):
+        """Send to every member of a role (optionally one language) concurrently.
+
+        With a message bus the message is also published on the session's
+        channel, and the other nodes with members in the session deliver it.
+        """
+        if self.bus is not None and session_id is not None:
+            envelope = {
+                "node": self.node_id,
+                "session_id": session_id,
+                "role": role,
+                "language": language,
+                "message": message,
+            }
+            try:
+                await self.bus.publish(session_channel(session_id), json_dumps(envelope))
+            except Exception as e:
+                logger.error("❌ Error publishing broadcast: %s", e)
+        await self._deliver(session_id, role, message, language)
+
+    async def _deliver(self, session_id, role: str, message: dict, language: Optional[str] = None):
+        """Send a message to this node's members of a session role, serialized once per encoding"""
+        recipients = list(self.sessions.get(session_id, {}).get(role, ()))
+        if language is not None:
+            recipients = [
+                client for client in recipients if self.clients[client].get("language") == language
+            ]
+        if not recipients:
+            return
+
+        frames = {}
+        for client in recipients:
+            encoding = self.clients[client]["encoding"]
+            if encoding not in frames:
+                frames[encoding] = encode_message(message, encoding)
+
+        with STAGE_SECONDS.time(stage="broadcast"):
+            results = await asyncio.gather(
+                *(
+                    self._send_with_timeout(client, frames[self.clients[client]["encoding"]])
+                    for client in recipients
+                )
+            )
+        logger.debug(
+            "📡 Broadcasted to %d/%d %s(s) in session %s", sum(results), len(recipients), role, session_id
+        )
+
+    async def _on_bus_message(self, channel: str, data: str):
+        """Handle a broadcast or node announcement from another node"""
+        message = json_loads(data)
+        if message.get("node") == self.node_id:
+            return  # Our own publication
+
+        if channel.startswith(SESSION_CHANNEL_PREFIX):
+            await self._deliver(
+                message["session_id"], message["role"], message["message"], message.get("language")
+            )
+        elif channel == NODES_CHANNEL:
+            if message.get("leaving"):
+                self.cluster_nodes.pop(message["node"], None)
+                return
+            message["seen"] = time.monotonic()
+            self.cluster_nodes[message["node"]] = message
+
+    def _live_nodes(self) -> List[Dict[str, Any]]:
+        """Announcements from other nodes that are still heartbeating"""
+        cutoff = time.monotonic() - 3 * BUS_HEARTBEAT
+        return [node for node in self.cluster_nodes.values() if node["seen"] >= cutoff]
+
+    def _membership_snapshot(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """session_id -> role -> language -> member count on this node"""
+        snapshot = {}
+        for session_id, roles in self.sessions.items():
+            if session_id is None:
+                continue  # Clients without a session are not shared
+            for role, members in roles.items():
+                languages = snapshot.setdefault(session_id, {}).setdefault(role, {})
+                for member in members:
+                    language = self.clients[member].get("language")
+                    languages[language] = languages.get(language, 0) + 1
+        return snapshot
+
+    async def _announce_loop(self):
+        """Publish warm models and session membership, early when membership changes"""
+        while True:
+            self._membership_changed.clear()
+            try:
+                await self.translator.refresh_worker_stats()
+                await self.bus.publish(
+                    NODES_CHANNEL,
+                    json_dumps(
+                        {
+                            "node": self.node_id,
+                            "address": f"ws://{self.host}:{self.port}",
+                            "ready": self.ready.is_set(),
+                            "models": self.translator.loaded_models(),
+                            "members": self._membership_snapshot(),
+                        }
+                    ),
+                )
+            except Exception as e:
+                logger.warning(f"Node announcement failed: {e}")
+            try:
+                await asyncio.wait_for(self._membership_changed.wait(), BUS_HEARTBEAT)
+                await asyncio.sleep(0.1)  # Coalesce bursts of joins and leaves
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, websocket, payload: Dict[str, Any]):
+        """Send one message in the connection's negotiated encoding"""
+        encoding = self.clients.get(websocket, {}).get("encoding", "json")
+        await websocket.send(encode_message(payload, encoding))
+
+    async def _send_with_timeout(self, client, payload) -> bool:
+        """Send to one recipient; a socket that cannot keep up is closed, not waited on"""
+        try:
+            await asyncio.wait_for(client.send(payload), self.send_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"⏱️ Send to {client.remote_address} timed out after {self.send_timeout}s, closing it"
+            )
+            self._close_later(client, 1013, "send timeout")
+        except Exception as e:
+            logger.error("❌ Error broadcasting to %s: %s", client.remote_address, e)
+        return False
+
+    def _close_later(self, websocket, code: int, reason: str):
+        """Close a connection in the background; handle_client cleans up after it"""
+        task = asyncio.create_task(websocket.close(code=code, reason=reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _reap_idle_loop(self):
+        """Close connections that have sent nothing for idle_timeout seconds"""
+        while True:
+            await asyncio.sleep(min(30.0, max(1.0, self.idle_timeout / 4)))
+            cutoff = time.monotonic() - self.idle_timeout
+            for websocket, info in list(self.clients.items()):
+                if info["last_seen"] < cutoff:
+                    logger.info("💤 Closing idle connection %s", websocket.remote_address)
+                    info["last_seen"] = float("inf")  # Closed once
+                    self.idle_closed += 1
+                    self._close_later(websocket, 1001, "idle timeout")
+
+    def serve_options(self) -> Dict[str, Any]:
+        """websockets.serve keyword arguments for the connection policy"""
+        return {
+            "compression": "deflate" if self.compression == "deflate" else None,
+            "max_size": self.max_message_size or None,
+            "max_queue": self.max_queue or None,
+            "write_limit": self.write_limit,
+            "ping_interval": self.ping_interval or None,
+            "ping_timeout": self.ping_timeout or None,
+        }
 
     async def start_server(self):
         """Start the WebSocket server"""
         logger.info(f"Starting translation server on {self.host}:{self.port}")
-        async with websockets.serve(self.handle_client, self.host, self.port):
-            logger.info(
-                f"🌐 Translation Server running on ws://{self.host}:{self.port}"
+        if self.ready_file and os.path.exists(self.ready_file):
+            os.remove(self.ready_file)  # Stale from an unclean shutdown
+        metrics_server = None
+        self.metrics.add_collector(self.collect_metrics)
+        loop = asyncio.get_running_loop()
+        try:
+            # docker stop and systemd send SIGTERM; shut down as cleanly as on Ctrl+C
+            loop.add_signal_handler(signal.SIGTERM, self._terminate, asyncio.current_task())
+        except (NotImplementedError, RuntimeError):
+            pass  # No asyncio signal handlers on Windows or outside the main thread
+        try:
+            if self.metrics_port:
+                metrics_server = await asyncio.start_server(
+                    self._handle_http, self.host, self.metrics_port
+                )
+                logger.info(f"📊 Metrics on http://{self.host}:{self.metrics_port}/metrics")
+            if self.bus is not None:
+                await self.bus.start(self._on_bus_message, [NODES_CHANNEL])
+                self._announce_task = asyncio.create_task(self._announce_loop())
+                logger.info(f"Node {self.node_id} joined the message bus")
+            if self.phrase_memory.enabled:
+                self._pretranslate_task = asyncio.create_task(self._pretranslate_loop())
+            if self.history.enabled:
+                self._history_task = asyncio.create_task(self._history_loop())
+            if self.idle_timeout > 0:
+                self._reaper_task = asyncio.create_task(self._reap_idle_loop())
+            if PERSIST_INTERVAL > 0 and (self.translator.cache.path or self.phrase_memory.path):
+                self._persist_task = asyncio.create_task(self._persist_loop())
+            async with websockets.serve(self.handle_client, self.host, self.port, **self.serve_options()):
+                logger.info(
+                    f"🌐 Translation Server running on ws://{self.host}:{self.port}"
+                )
+                await self.warm_up()
+                logger.info("Ready to translate speech from browser")
+                await asyncio.Future()  # Run forever
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
+            self.metrics.remove_collector(self.collect_metrics)
+            if self._persist_task is not None:
+                self._persist_task.cancel()
+            if self._pretranslate_task is not None:
+                self._pretranslate_task.cancel()
+            self.phrase_memory.save()
+            if self._reaper_task is not None:
+                self._reaper_task.cancel()
+            if self._history_task is not None:
+                self._history_task.cancel()
+                if self.history.path:
+                    await self.history.spill_idle(idle_seconds=0)  # Keep every session
+            if metrics_server is not None:
+                metrics_server.close()
+            if self.ready_file and os.path.exists(self.ready_file):
+                os.remove(self.ready_file)
+            if self.bus is not None:
+                if self._announce_task is not None:
+                    self._announce_task.cancel()
+                try:
+                    await self.bus.publish(
+                        NODES_CHANNEL, json_dumps({"node": self.node_id, "leaving": True})
+                    )
+                except Exception:
+                    pass  # Others drop us once our heartbeats stop
+                await self.bus.close()
+            self.translator.shutdown()
+
+    def _terminate(self, server_task: asyncio.Task):
+        """SIGTERM: cancel start_server, whose cleanup saves state and leaves the bus"""
+        logger.info("SIGTERM received, shutting down")
+        server_task.cancel()
+
+    def collect_metrics(self) -> List[Tuple[str, str, Optional[Dict[str, Any]], float]]:
+        """Gauges sampled at scrape time: connections, cache, models, pool, admission"""
+        cache = self.translator.cache.stats()
+        models = self.translator.model_stats()
+        admission = self.admission_stats()
+        phrases = self.phrase_memory.stats()
+        history = self.history.stats()
+        samples = [
+            ("translation_ready", "1 once startup preloading has finished", None, int(self.ready.is_set())),
+            ("translation_active_connections", "Open WebSocket connections", None, len(self.clients)),
+            ("translation_active_sessions", "Sessions with at least one connection", None, len(self.sessions)),
+            ("translation_sessions_closed", "Sessions freed after their last connection left", None, self.sessions_closed),
+            ("translation_idle_connections_closed", "Connections closed by the idle timeout", None, self.idle_closed),
+            ("translation_cache_entries", "Cached translations", None, cache["entries"]),
+            ("translation_cache_hits", "Translation cache hits", None, cache["hits"]),
+            ("translation_cache_misses", "Translation cache misses", None, cache["misses"]),
+            ("translation_cache_evictions", "Translation cache LRU evictions", None, cache["evictions"]),
+            ("translation_cache_expirations", "Translation cache TTL expirations", None, cache["expirations"]),
+            ("translation_models_resident_bytes", "Memory of all loaded models", None, models["resident_bytes"]),
+            ("translation_model_loads", "Models loaded since start", None, models["loads"]),
+            ("translation_model_evictions", "Models evicted for the memory budget", None, models["evictions"]),
+            ("translation_admission_in_flight", "Transcriptions queued or being translated", None, admission["in_flight"]),
+            ("translation_admission_max_connection_queue", "Deepest per-connection queue", None, admission["max_connection_queue"]),
+            ("translation_phrase_memory_phrases", "Assistant phrases counted", None, phrases["phrases"]),
+            ("translation_phrase_memory_pretranslated", "Pretranslated phrase and language pairs", None, phrases["pretranslated"]),
+            ("translation_phrase_memory_hits", "Replies served from the phrase memory", None, phrases["hits"]),
+            ("translation_phrase_memory_misses", "Replies not pretranslated", None, phrases["misses"]),
+            ("translation_phrase_memory_pretranslations", "Speculative translations run", None, phrases["pretranslations"]),
+            ("translation_history_sessions", "Sessions with history in memory", None, history["sessions"]),
+            ("translation_history_exchanges", "Exchanges held in memory", None, history["exchanges"]),
+            ("translation_history_spilled_sessions", "Sessions whose history is on disk", None, history["spilled_sessions"]),
+            ("translation_history_log_bytes", "Size of the history log", None, history["log_bytes"]),
+        ]
+        samples += [
+            ("translation_model_bytes", "Memory of a loaded model", {"model": model_key}, size)
+            for model_key, size in models["models"].items()
+        ]
+        samples += [
+            ("translation_admission_rejections", "Messages rejected by admission control", {"reason": reason}, count)
+            for reason, count in admission["rejections"].items()
+        ]
+        pool = self.translator.executor_stats()
+        if pool is not None:
+            samples += [
+                ("translation_executor_in_flight", "Calls running or queued on the inference pool", None, pool["in_flight"]),
+                ("translation_executor_queue_depth", "Calls waiting for a free inference worker", None, pool["queue_depth"]),
+            ]
+        batching = self.translator.batcher_stats()
+        if batching is not None:
+            samples.append(
+                ("translation_batcher_waiting", "Texts waiting for their batch to be cut", None, batching["waiting"])
             )
-            logger.info("Ready to translate speech from browser")
-            await asyncio.Future()  # Run forever
+        return samples
+
+    async def _handle_http(self, reader, writer):
+        """Serve GET /metrics and /ready on the metrics port"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+                pass  # Skip headers
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else "/"
+
+            content_type = "text/plain; charset=utf-8"
+            if path == "/metrics":
+                await self.translator.refresh_worker_stats()  # Worker metrics and models
+                status, body = "200 OK", self.metrics.render()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/ready":
+                ready = self.ready.is_set()
+                status, body = ("200 OK", "ready\n") if ready else ("503 Service Unavailable", "starting\n")
+            else:
+                status, body = "404 Not Found", "not found\n"
+
+            data = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode()
+                + data
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug("Metrics request failed: %s", e)
+        finally:
+            writer.close()
+
+    async def warm_up(self):
+        """Import the ML libraries off the event loop, preload models, then signal readiness"""
+        if self.translator.executor_kind == "thread":
+            # Process workers import on their own; this process only needs them for thread mode
+            start = time.perf_counter()
+            await asyncio.get_running_loop().run_in_executor(None, _import_ml_libraries)
+            logger.info(f"ML libraries ready ({time.perf_counter() - start:.2f}s)")
+
+        if self.preload_models:
+            logger.info(f"Preloading models: {self.preload_models}")
+            await self.translator.preload_async(self.preload_models)
+
+        self.ready.set()
+        if self.ready_file:
+            with open(self.ready_file, "w") as f:
+                f.write(f"{time.time()}\n")
+            logger.info(f"Readiness file written: {self.ready_file}")
 
 
 def main():
     """Main function to start the server"""
+    parser = argparse.ArgumentParser(description="Offline Translation Server")
+    parser.add_argument("--host", default="localhost", help="WebSocket bind address")
+    parser.add_argument("--port", type=int, default=8765, help="WebSocket port")
+    parser.add_argument(
+        "--preload",
+        default=PRELOAD_MODELS,
+        help='Models to load and warm up at startup: "all" or e.g. "es,fr:to_en"',
+    )
+    parser.add_argument(
+        "--ready-file",
+        default=READY_FILE,
+        help="File to create once preloading has finished",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        help="Port for the Prometheus /metrics and /ready endpoints (0 disables)",
+    )
+    args = parser.parse_args()
+
+    run_server(
+        host=args.host,
+        port=args.port,
+        preload=args.preload,
+        ready_file=args.ready_file,
+        metrics_port=args.metrics_port,
+    )
+
+
+def run_server(**server_options):
+    """Configure logging and run a TranslationServer until interrupted"""
+    log_listener = configure_logging()
+
     logger.info("🚀 Starting Offline Translation Server")
     logger.info(
         "Note: Models will be downloaded on first use (requires internet for initial setup)"
     )
     logger.info(f"Supported languages: {list(TRANSLATION_MODELS.keys())}")
 
-    server = TranslationServer()
+    server = TranslationServer(**server_options)
 
     try:
         asyncio.run(server.start_server())
     except KeyboardInterrupt:
         logger.info("Translation server stopped by user")
+    except asyncio.CancelledError:
+        logger.info("Translation server stopped")  # SIGTERM
     except Exception as e:
         logger.error(f"Translation server error: {e}")
+    finally:
+        if log_listener is not None:
+            log_listener.stop()  # Flush queued records
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Production launcher for the offline translation server.
+Settings come from the command line or the environment. The WebSocket port
+binds right away; torch and transformers are imported in the background
+while the configured models preload.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Options the server reads from the environment when it is imported, so
+# inference worker processes see the same settings
+SERVER_ENVIRONMENT = {
+    "executor": "INFERENCE_EXECUTOR",
+    "workers": "INFERENCE_WORKERS",
+    "backend": "MODEL_BACKEND",
+    "generation_profile": "GENERATION_PROFILE",
+    "threads": "TORCH_THREADS",
+    "log_level": "LOG_LEVEL",
+}
+
+PROFILE_SCRIPT = """
+import time
+start = time.perf_counter()
+import server
+imported = time.perf_counter()
+server._import_ml_libraries()
+print(f"{imported - start:.6f} {time.perf_counter() - imported:.6f}")
+"""
+
+
+def profile_startup(top: int):
+    """Show where startup time goes, using python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        sys.exit(result.returncode)
+
+    modules = []  # (self seconds, cumulative seconds, depth, name)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2  # Two spaces per nesting level
+        modules.append((int(self_us) / 1e6, int(cumulative_us) / 1e6, depth, name.strip()))
+
+    server_seconds, ml_seconds = (float(value) for value in result.stdout.split()[-2:])
+    print("Startup profile (import times include -X importtime overhead)")
+    print(f"  import server          {server_seconds:8.3f}s  (before the socket can bind)")
+    print(f"  torch + transformers   {ml_seconds:8.3f}s  (in the background after binding)")
+
+    print(f"\nSlowest top-level imports (cumulative, top {top}):")
+    top_level = sorted((m for m in modules if m[2] == 0), key=lambda m: m[1], reverse=True)
+    for _, cumulative, _, name in top_level[:top]:
+        print(f"  {cumulative:8.3f}s  {name}")
+
+    print(f"\nSlowest modules (own time, top {top}):")
+    for own, _, _, name in sorted(modules, reverse=True)[:top]:
+        print(f"  {own:8.3f}s  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Start the offline translation server",
+        epilog="Other settings (batching, caching, admission, bus, logging) are read from the "
+        "environment; see DEPLOYMENT.md.",
+    )
+    parser.add_argument("--host", default=os.environ.get("HOST", "localhost"), help="Bind address (HOST)")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8765)), help="WebSocket port (PORT)")
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process", "sharded"],
+        default=os.environ.get("INFERENCE_EXECUTOR"),
+        help="Inference pool kind (INFERENCE_EXECUTOR, default thread)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.environ.get("INFERENCE_WORKERS"),
+        help="Inference workers (INFERENCE_WORKERS, default CPU count)",
+    )
+    parser.add_argument(
+        "--backend",
+        default=os.environ.get("MODEL_BACKEND"),
+        help='torch, quantized or onnx, with optional per-pair overrides (MODEL_BACKEND)',
+    )
+    parser.add_argument(
+        "--generation-profile",
+        default=os.environ.get("GENERATION_PROFILE"),
+        help="fast, balanced or quality, with optional per-pair overrides (GENERATION_PROFILE)",
+    )
+    parser.add_argument(
+        "--threads",
+        default=os.environ.get("TORCH_THREADS"),
+        help='torch intra-op threads per call; per-pair overrides such as "2,de=4" need the process or sharded executor (TORCH_THREADS)',
+    )
+    parser.add_argument(
+        "--preload",
+        default=os.environ.get("PRELOAD_MODELS", ""),
+        help='Models to load and warm up at startup: "all" or e.g. "es,fr:to_en" (PRELOAD_MODELS)',
+    )
+    parser.add_argument(
+        "--ready-file",
+        default=os.environ.get("READY_FILE", ""),
+        help="File created once preloading has finished (READY_FILE)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.environ.get("METRICS_PORT", 0)),
+        help="Port for /metrics and /ready, 0 disables (METRICS_PORT)",
+    )
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL"), help="Log level (LOG_LEVEL)")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print where import time goes instead of starting the server",
+    )
+    parser.add_argument("--profile-top", type=int, default=15, help="Rows per profile table")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        profile_startup(args.profile_top)
+        return
+
+    for option, variable in SERVER_ENVIRONMENT.items():
+        value = getattr(args, option)
+        if value is not None:
+            os.environ[variable] = str(value).upper() if option == "log_level" else str(value)
+
+    sys.path.insert(0, ROOT)
+    import server  # Reads the environment; torch and transformers are imported later
+
+    server.run_server(
+        host=args.host,
+        port=args.port,
+        preload=args.preload,
+        ready_file=args.ready_file,
+        metrics_port=args.metrics_port,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Translate large files offline with the server's models: signage catalogs,
+transcript archives, anything with one (text, source, target) record per line.
+
+Reads JSONL ({"text": ..., "source": "es", "target": "en", ...}) or TSV
+(text, source, target columns) from a file or stdin. TSV output adds
+translation and error columns. Records are read in
+chunks; each chunk's sentences are deduplicated, grouped by model key,
+sorted by length and translated in large batches on OfflineTranslator's
+inference pool. Results are written in input order. Pivot pairs go through
+English hop by hop, so every hop is batched too.
+
+After every chunk a checkpoint records how far the output is complete;
+rerunning the same command resumes from there.
+
+    python utils/batch_translate.py catalog.jsonl -o catalog.en.jsonl
+    cut -f1 signs.txt | python utils/batch_translate.py - --format tsv --source es --target en
+    python utils/batch_translate.py archive.tsv -o archive.out.tsv --executor process --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+
+
+def detect_format(path: str, first_line: str) -> str:
+    if path.endswith((".jsonl", ".json")):
+        return "jsonl"
+    if path.endswith((".tsv", ".txt")):
+        return "tsv"
+    return "jsonl" if first_line.lstrip().startswith("{") else "tsv"
+
+
+def parse_record(line: str, fmt: str, source: Optional[str], target: Optional[str]) -> Dict[str, Any]:
+    """One input line as a record with text/source/target, falling back to the defaults"""
+    if fmt == "jsonl":
+        record = server.json_loads(line)
+        if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+            raise ValueError('expected an object with a "text" string')
+    else:
+        columns = line.split("\t")
+        record = {"text": columns[0]}
+        for name, value in zip(("source", "target"), columns[1:3]):
+            if value:
+                record[name] = value
+    record.setdefault("source", source)
+    record.setdefault("target", target)
+    return record
+
+
+def format_record(record: Dict[str, Any], fmt: str) -> str:
+    if fmt == "jsonl":
+        return server.json_dumps(record) + "\n"
+    columns = [
+        record["text"],
+        record["source"] or "",
+        record["target"] or "",
+        record.get("translation", ""),
+        record.get("error", ""),
+    ]
+    return "\t".join(column.replace("\t", " ").replace("\n", " ") for column in columns) + "\n"
+
+
+class BatchJob:
+    """Translates chunks of records on an OfflineTranslator's inference pool"""
+
+    def __init__(self, translator: server.OfflineTranslator, batch_size: int):
+        self.translator = translator
+        self.batch_size = batch_size
+        self.segments = 0  # Sentences in the input, before deduplication
+        self.translated = 0  # Sentences sent to a model
+        self.cache_hits = 0
+        self.errors = 0  # Records left without a real translation
+
+    async def translate_unique(self, model_key: str, texts: List[str]) -> Dict[str, str]:
+        """Translate distinct texts for one model, shortest first, in batch_size batches"""
+        results = {}
+        missing = []
+        for text in texts:
+            cached = self.translator.cache.get(model_key, text)
+            if cached is None:
+                missing.append(text)
+            else:
+                results[text] = cached
+                self.cache_hits += 1
+
+        # Similar lengths share a batch, so little padding is generated
+        missing.sort(key=len)
+        batches = [missing[i : i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        outputs = await asyncio.gather(
+            *(self.translator.executor.run("translate_batch", model_key, batch) for batch in batches)
+        )
+        for batch, translations in zip(batches, outputs):
+            for text, translation in zip(batch, translations):
+                results[text] = translation
+                self.translator.check_direct_model(model_key, translation)
+                self.translator.cache.put(model_key, text, translation)  # Skips mock output
+        self.translated += len(missing)
+        return results
+
+    async def translate_chunk(self, records: List[Dict[str, Any]]):
+        """Fill in each record's "translation" (or "error"), one batched hop at a time.
+
+        A model that fails to load yields mock output. Records whose direct
+        pair model failed are rerouted through English; any other mock result
+        becomes the record's error.
+        """
+        work = []  # [record, route, segments as [text, separator] lists, next hop]
+        for record in records:
+            try:
+                route = self.translator.route(record["source"], record["target"])
+            except (KeyError, ValueError) as e:
+                record["error"] = str(e)
+                self.errors += 1
+                continue
+            segments = self.split(record["text"])
+            self.segments += len(segments)
+            work.append([record, route, segments, 0])
+
+        while True:
+            active = [item for item in work if item[3] < len(item[1])]
+            if not active:
+                break
+            pending: Dict[str, Dict[str, None]] = {}  # model_key -> texts, in first-seen order
+            for _, route, segments, hop in active:
+                texts = pending.setdefault(route[hop], {})
+                for segment in segments:
+                    texts[segment[0]] = None
+
+            keys = list(pending)
+            results = await asyncio.gather(*(self.translate_unique(key, list(pending[key])) for key in keys))
+            translations = dict(zip(keys, results))
+            for item in active:
+                record, route, segments, hop = item
+                for segment in segments:
+                    segment[0] = translations[route[hop]][segment[0]]
+                if not any(server.is_mock_translation(text) for text, _ in segments):
+                    item[3] += 1
+                    continue
+                rerouted = self.translator.route(record["source"], record["target"])
+                if rerouted != route:  # The direct model failed; start over through English
+                    item[1], item[2], item[3] = rerouted, self.split(record["text"]), 0
+                else:
+                    record["error"] = f"Model {route[hop]} failed to load"
+                    self.errors += 1
+                    work.remove(item)
+
+        for record, _, segments, _ in work:
+            record["translation"] = "".join(text + separator for text, separator in segments)
+
+    def split(self, text: str) -> List[List[str]]:
+        """Sentences of a text as [text, separator] lists, translated in place"""
+        return [list(segment) for segment in server.split_sentences(text, self.translator.segment_max_chars)]
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    checkpoint["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    server.write_json_atomic(path, checkpoint, indent=2)
+
+
+def read_chunks(stream, chunk_size: int, skip_lines: int):
+    """Lists of (line number, stripped line), skipping the lines a checkpoint covers"""
+    chunk = []
+    for number, line in enumerate(stream):
+        if number < skip_lines:
+            continue
+        chunk.append((number, line.rstrip("\r\n")))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def run(args, stream, output, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+    translator = server.OfflineTranslator(
+        executor_kind=args.executor,
+        max_workers=args.workers,
+        generation_profile=args.profile,
+        threads=args.threads,
+    )
+    job = BatchJob(translator, args.batch_size)
+    fmt = args.format
+    records_done = 0
+    previous_seconds = checkpoint["seconds"]  # Spent by the runs this one resumes
+    start = time.perf_counter()
+    try:
+        for chunk in read_chunks(stream, args.chunk_size, checkpoint["lines"]):
+            if fmt == "auto":
+                fmt = detect_format(args.input, chunk[0][1])
+            records = []
+            for number, line in chunk:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(parse_record(line, fmt, args.source, args.target))
+                except ValueError as e:
+                    sys.exit(f"❌ Line {number + 1}: {e}")
+
+            await job.translate_chunk(records)
+            output.write("".join(format_record(record, fmt) for record in records))
+            output.flush()
+            records_done += len(records)
+
+            elapsed = time.perf_counter() - start
+            checkpoint["lines"] = chunk[-1][0] + 1
+            checkpoint["records"] += len(records)
+            checkpoint["seconds"] = round(previous_seconds + elapsed, 2)
+            if args.checkpoint:
+                checkpoint["output_bytes"] = output.tell()
+                save_checkpoint(args.checkpoint, checkpoint)
+            print(
+                f"📊 {checkpoint['records']} records | {records_done / elapsed:.1f} records/s"
+                f" | {job.segments / elapsed:.1f} sentences/s",
+                file=sys.stderr,
+            )
+    finally:
+        translator.shutdown()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "records": records_done,
+        "records_total": checkpoint["records"],
+        "sentences": job.segments,
+        "sentences_translated": job.translated,
+        "cache_hits": job.cache_hits,
+        "errors": job.errors,
+        "seconds": round(elapsed, 2),
+        "records_per_second": round(records_done / elapsed, 1) if elapsed else None,
+        "sentences_per_second": round(job.segments / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate a JSONL or TSV file offline")
+    parser.add_argument("input", help="Input file, or - for stdin")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout, without checkpoints)")
+    parser.add_argument(
+        "--format", choices=["auto", "jsonl", "tsv"], default="auto", help="Input and output format"
+    )
+    parser.add_argument("--source", help="Source language for records without one")
+    parser.add_argument("--target", default="en", help="Target language for records without one")
+    parser.add_argument("--batch-size", type=int, default=64, help="Sentences per model call")
+    parser.add_argument(
+        "--chunk-size", type=int, default=10000, help="Records read, translated and checkpointed at once"
+    )
+    parser.add_argument(
+        "--executor", default=server.INFERENCE_EXECUTOR, help="thread, process or sharded (INFERENCE_EXECUTOR)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=server.INFERENCE_WORKERS, help="Inference workers (INFERENCE_WORKERS)"
+    )
+    parser.add_argument("--profile", default=server.GENERATION_PROFILE, help="Generation profile (GENERATION_PROFILE)")
+    parser.add_argument("--threads", default=server.TORCH_THREADS, help="torch intra-op threads (TORCH_THREADS)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    args = parser.parse_args()
+
+    if args.output and not args.checkpoint:
+        args.checkpoint = f"{args.output}.checkpoint"
+    if not args.output:
+        args.checkpoint = None  # stdout cannot be rewound to a checkpoint
+
+    checkpoint = {
+        "input": "-" if args.input == "-" else os.path.abspath(args.input),
+        "lines": 0,
+        "records": 0,
+        "seconds": 0.0,
+    }
+    resumed = None
+    if args.checkpoint and not args.restart:
+        resumed = load_checkpoint(args.checkpoint)
+    if resumed is not None:
+        if resumed["input"] != checkpoint["input"]:
+            sys.exit(f"❌ {args.checkpoint} belongs to {resumed['input']}; pass --restart to start over")
+        written = os.path.getsize(args.output) if os.path.exists(args.output) else None
+        if written is None or written < resumed["output_bytes"]:
+            found = "is missing" if written is None else f"has {written} bytes"
+            sys.exit(
+                f"❌ {args.output} {found}, but {args.checkpoint} covers {resumed['output_bytes']};"
+                " pass --restart to start over"
+            )
+        checkpoint.update(resumed)
+        print(f"♻️  Resuming after {resumed['records']} records (line {resumed['lines']})", file=sys.stderr)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    if args.output:
+        output = open(args.output, "r+" if resumed else "w", encoding="utf-8")
+        if resumed:
+            output.truncate(resumed["output_bytes"])  # Drop anything written after the checkpoint
+            output.seek(resumed["output_bytes"])
+    else:
+        output = sys.stdout
+
+    try:
+        summary = asyncio.run(run(args, stream, output, checkpoint))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    if summary["errors"]:
+        print(
+            f"⚠️  {summary['errors']} records were not translated (unsupported language pair or"
+            " a model that failed to load); see their \"error\" field",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark translation throughput against micro-batch size.
+Fires concurrent requests at one model through the BatchScheduler.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SENTENCES = [
+    "Hola, ¿dónde está el baño?",
+    "Gracias por su ayuda.",
+    "¿Cuánto cuesta esto?",
+    "Mi vuelo sale a las diez de la mañana.",
+    "Necesito un taxi para ir al aeropuerto, por favor.",
+    "¿Puede repetirlo más despacio?",
+    "He perdido mi pasaporte y no sé qué hacer.",
+    "¿A qué hora abre el restaurante del hotel?",
+]
+
+
+async def run_batch_size(translator, model_key, batch_size, max_wait_ms, requests):
+    """Translate `requests` sentences concurrently and return sentences/sec"""
+    from server import BatchScheduler
+
+    scheduler = BatchScheduler(translator.executor, max_wait_ms, batch_size)
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(requests)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(scheduler.translate(model_key, text) for text in texts))
+    elapsed = time.perf_counter() - start
+    scheduler.shutdown()
+
+    stats = scheduler.stats()
+    return requests / elapsed, stats["avg_batch_size"]
+
+
+async def main(args):
+    from server import OfflineTranslator, TRANSLATION_MODELS
+
+    translator = OfflineTranslator(max_workers=args.workers)
+    model_key = TRANSLATION_MODELS[args.language]["to_en"]
+    translator.load_model(model_key)
+    translator.translate_batch(model_key, SENTENCES[:1])  # Warm-up
+
+    print(f"📊 Model: {model_key} | requests: {args.requests} | workers: {args.workers}")
+    print(f"{'batch size':>10} {'avg batch':>10} {'sent/s':>10}")
+    for batch_size in args.batch_sizes:
+        throughput, avg_batch = await run_batch_size(
+            translator, model_key, batch_size, args.max_wait_ms, args.requests
+        )
+        print(f"{batch_size:>10} {avg_batch:>10.1f} {throughput:>10.1f}")
+
+    translator.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--language", default="es", help="Source language (X→en model)")
+    parser.add_argument("--requests", type=int, default=64, help="Concurrent requests per run")
+    parser.add_argument("--workers", type=int, default=1, help="Inference pool workers")
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="Batch collection window")
+    parser.add_argument(
+        "--batch-sizes",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1, 2, 4, 8, 16, 32],
+        help="Comma-separated max batch sizes to compare",
+    )
+    asyncio.run(main(parser.parse_args()))
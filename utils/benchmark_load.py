@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Load-generation and latency benchmark for the WebSocket translation server.
+Simulates sessions of travelers and assistants exchanging transcriptions and
+reports throughput, end-to-end latency (send → confirmation) and fan-out
+latency (send → broadcast received by each listener) as JSON.
+
+Starts `server.py` in a subprocess in mock-translation or real-model mode,
+or targets a running server with --url. Compare runs with --baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import websockets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from server import decode_message, encode_message  # noqa: E402
+
+CORPUS = {
+    "es": [
+        "Hola, ¿dónde está el baño?",
+        "Gracias por su ayuda.",
+        "¿Cuánto cuesta esto?",
+        "Mi vuelo sale a las diez de la mañana.",
+        "Necesito un taxi para ir al aeropuerto, por favor.",
+        "¿Puede repetirlo más despacio?",
+        "He perdido mi pasaporte y no sé qué hacer.",
+        "¿A qué hora abre el restaurante del hotel?",
+    ],
+    "en": [
+        "The restroom is down the hall on your left.",
+        "You're welcome.",
+        "That will be twelve euros.",
+        "Your gate opens one hour before departure.",
+        "I can call a taxi for you right away.",
+        "Of course, let me say it again.",
+        "Let's contact your embassy together.",
+        "Breakfast is served from seven until ten.",
+    ],
+}
+
+CONFIRMATIONS = ("transcription_sent", "response_sent", "overloaded")
+BROADCASTS = ("traveler_message", "assistant_response")
+
+
+def percentiles(values):
+    """p50/p95/p99/mean/max in milliseconds (nearest rank)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {
+        "p50": round(rank(50) * 1000, 3),
+        "p95": round(rank(95) * 1000, 3),
+        "p99": round(rank(99) * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+class LoadRun:
+    """Shared bookkeeping for one benchmark run"""
+
+    def __init__(self, args):
+        self.args = args
+        self.latencies = []  # Seconds from send to the sender's confirmation
+        self.fanout = []  # Seconds from send to each listener's broadcast
+        self.rejected = 0
+        self.timeouts = 0
+        # (session, speaker role, original) → [send time, rejected] in send order;
+        # each listener walks the list with its own cursor
+        self.sent = defaultdict(list)
+
+    def record_broadcast(self, cursors, session_id, data, received_at):
+        role = "traveler" if data["type"] == "traveler_message" else "assistant"
+        key = (session_id, role, data.get("original"))
+        sends = self.sent.get(key, ())
+        cursor = cursors[key]
+        while cursor < len(sends) and sends[cursor][1]:
+            cursor += 1  # Rejected messages are never broadcast
+        if cursor < len(sends):
+            self.fanout.append(received_at - sends[cursor][0])
+            cursor += 1
+        cursors[key] = cursor
+
+
+async def participant(run, url, session_id, role, language, index, start_barrier):
+    """One connection: speaks its share of the corpus and records broadcasts"""
+    args = run.args
+    confirmations = asyncio.Queue()
+    cursors = defaultdict(int)
+
+    encoding = "json"
+    async with websockets.connect(url, max_size=None) as websocket:
+        set_role = {"type": "set_role", "role": role, "session_id": session_id, "language": language}
+        if args.encoding != "json":
+            set_role["encoding"] = args.encoding
+        await websocket.send(json.dumps(set_role))
+
+        async def read():
+            nonlocal encoding
+            async for message in websocket:
+                received_at = time.perf_counter()
+                data = decode_message(message)
+                if data.get("type") == "encoding":
+                    encoding = data["encoding"]
+                elif data.get("type") in CONFIRMATIONS:
+                    confirmations.put_nowait((received_at, data))
+                elif data.get("type") in BROADCASTS:
+                    run.record_broadcast(cursors, session_id, data, received_at)
+
+        reader = asyncio.create_task(read())
+        await start_barrier.wait()
+
+        corpus = CORPUS[language] if language in CORPUS else CORPUS["en"]
+        try:
+            for i in range(args.messages):
+                text = corpus[(index + i) % len(corpus)]
+                entry = [time.perf_counter(), False]
+                run.sent[(session_id, role, text)].append(entry)
+                message = {"type": "transcription", "text": text}
+                if role == "assistant":
+                    message["traveler_language"] = args.traveler_language
+                await websocket.send(encode_message(message, encoding))
+                try:
+                    received_at, data = await asyncio.wait_for(confirmations.get(), args.timeout)
+                except asyncio.TimeoutError:
+                    run.timeouts += 1
+                    continue
+                if data["type"] == "overloaded":
+                    entry[1] = True
+                    run.rejected += 1
+                else:
+                    run.latencies.append(received_at - entry[0])
+                if args.interval:
+                    await asyncio.sleep(args.interval)
+            await asyncio.sleep(args.drain)  # Let the last broadcasts arrive
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+
+async def run_load(args, url):
+    """Connect every participant, start them together and collect results"""
+    run = LoadRun(args)
+    start_barrier = asyncio.Event()
+    tasks = []
+    for session in range(args.sessions):
+        session_id = f"bench-{session}"
+        for role, count, language in (
+            ("traveler", args.travelers, args.traveler_language),
+            ("assistant", args.assistants, "en"),
+        ):
+            for index in range(count):
+                tasks.append(
+                    asyncio.create_task(
+                        participant(run, url, session_id, role, language, session + index, start_barrier)
+                    )
+                )
+
+    await asyncio.sleep(args.connect_wait)  # Let every set_role land first
+    start = time.perf_counter()
+    start_barrier.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start - args.drain
+
+    confirmed = len(run.latencies)
+    return {
+        "messages_sent": sum(len(sends) for sends in run.sent.values()),
+        "confirmed": confirmed,
+        "rejected": run.rejected,
+        "timeouts": run.timeouts,
+        "broadcasts_received": len(run.fanout),
+        "duration_s": round(elapsed, 3),
+        "throughput_msgs_per_s": round(confirmed / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": percentiles(run.latencies),
+        "fanout_ms": percentiles(run.fanout),
+    }
+
+
+def start_server(args, workdir):
+    """Run server.py in a subprocess and wait for its ready file"""
+    ready_file = os.path.join(workdir, "ready")
+    env = dict(os.environ)
+    if args.mode == "mock":
+        # An empty model cache makes every model load fall back to the mock translator
+        env["TRANSFORMERS_CACHE"] = os.path.join(workdir, "no-models")
+    for item in args.server_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    command = [
+        sys.executable,
+        os.path.join(ROOT, "server.py"),
+        "--port",
+        str(args.port),
+        "--ready-file",
+        ready_file,
+        "--preload",
+        args.traveler_language,
+    ]
+    log = open(os.path.join(workdir, "server.log"), "w")
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + args.startup_timeout
+    while not os.path.exists(ready_file):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            log.close()
+            with open(log.name) as f:
+                sys.stderr.write(f.read()[-4000:])
+            raise SystemExit("Server did not become ready")
+        time.sleep(0.1)
+    return process, log
+
+
+def git_commit():
+    """Current commit, for telling result files apart"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Regressions beyond `max_regression` (a fraction) against a baseline run"""
+    problems = []
+    checks = [
+        ("throughput_msgs_per_s", None, False),
+        ("latency_ms", "p95", True),
+        ("latency_ms", "p99", True),
+        ("fanout_ms", "p95", True),
+    ]
+    for metric, field, lower_is_better in checks:
+        old, new = baseline["results"].get(metric), results.get(metric)
+        if field is not None:
+            old, new = (old or {}).get(field), (new or {}).get(field)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        name = f"{metric}.{field}" if field else metric
+        if (change if lower_is_better else -change) > max_regression:
+            problems.append(f"{name}: {old} → {new} ({change:+.0%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the WebSocket server under load")
+    parser.add_argument("--mode", choices=["mock", "real"], default="mock", help="Mock translations or real models")
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8799, help="Port for the started server")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent sessions")
+    parser.add_argument("--travelers", type=int, default=1, help="Travelers per session")
+    parser.add_argument("--assistants", type=int, default=1, help="Assistants per session")
+    parser.add_argument("--messages", type=int, default=20, help="Transcriptions per participant")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="Seconds a participant waits after each confirmation (keep under the session rate limit)",
+    )
+    parser.add_argument(
+        "--encoding", choices=["json", "msgpack"], default="json", help="Wire framing requested at set_role"
+    )
+    parser.add_argument("--traveler-language", default="es", help="Language travelers speak")
+    parser.add_argument("--corpus", help='JSON file of utterances per language: {"es": [...], "en": [...]}')
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a confirmation")
+    parser.add_argument("--drain", type=float, default=1.0, help="Seconds to wait for late broadcasts")
+    parser.add_argument("--connect-wait", type=float, default=0.5, help="Seconds between connecting and starting")
+    parser.add_argument("--startup-timeout", type=float, default=600.0, help="Seconds to wait for the server")
+    parser.add_argument(
+        "--server-env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Environment variable for the started server (repeatable)",
+    )
+    parser.add_argument("--output", help="Write the results JSON here as well as to stdout")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Exit non-zero if throughput or p95/p99 latency is this much worse than the baseline",
+    )
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            CORPUS.update(json.load(f))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process = log = None
+        url = args.url
+        if url is None:
+            process, log = start_server(args, workdir)
+            url = f"ws://localhost:{args.port}"
+        try:
+            results = asyncio.run(run_load(args, url))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+                log.close()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("mode", "url", "encoding", "sessions", "travelers", "assistants", "messages", "interval", "traveler_language", "server_env")
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("Note: the baseline was run with a different configuration", file=sys.stderr)
+        problems = compare(results, baseline, args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the event-loop cost of logging on the message hot path.
+Drives TranslationServer.process_message for concurrent sessions under
+different logging setups and reports messages/sec and worst loop lag.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PHRASES = [
+    "Hola, ¿dónde está el baño?",
+    "Gracias por su ayuda.",
+    "¿Cuánto cuesta esto?",
+    "Necesito un taxi para ir al aeropuerto, por favor.",
+]
+
+# name: (level, format, queue-backed, sampling spec)
+SETUPS = {
+    "sync-debug": ("DEBUG", "text", False, ""),  # Every line written inline, as before
+    "sync-info": ("INFO", "text", False, ""),
+    "async-info": ("INFO", "text", True, ""),
+    "async-json": ("INFO", "json", True, ""),
+    "async-sampled": ("INFO", "text", True, "transcription=0.1"),
+}
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; sends are discarded"""
+
+    def __init__(self, index):
+        self.remote_address = ("127.0.0.1", 10000 + index)
+
+    async def send(self, message):
+        pass
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Worst delay past `interval` seen by a task that only sleeps"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_setup(sessions: int, messages: int, log_sample: str):
+    """Send `messages` transcriptions per session and return (msgs/sec, lag ms)"""
+    from server import TranslationServer
+
+    server = TranslationServer(preload="", log_sample=log_sample)
+    travelers = []
+    for index in range(sessions):
+        traveler, assistant = FakeWebSocket(2 * index), FakeWebSocket(2 * index + 1)
+        for websocket, role in ((traveler, "traveler"), (assistant, "assistant")):
+            await server.register_client(websocket)
+            await server.process_message(
+                websocket, {"type": "set_role", "role": role, "session_id": f"s{index}"}
+            )
+        travelers.append(traveler)
+
+    # Translate each phrase once so the run measures the cached hot path
+    for phrase in PHRASES:
+        await server.translator.translate_async(phrase, "es", "en")
+
+    async def talk(traveler):
+        for i in range(messages):
+            await server.process_message(
+                traveler, {"type": "transcription", "text": PHRASES[i % len(PHRASES)]}
+            )
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(talk(traveler) for traveler in travelers))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_lag = await lag
+
+    server.translator.shutdown()
+    return sessions * messages / elapsed, worst_lag * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot-path logging overhead")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions")
+    parser.add_argument("--messages", type=int, default=200, help="Transcriptions per session")
+    parser.add_argument(
+        "--setups",
+        default=",".join(SETUPS),
+        help=f"Comma-separated logging setups to compare: {', '.join(SETUPS)}",
+    )
+    parser.add_argument(
+        "--output",
+        help="File the log lines are written to (default: a temporary file)",
+    )
+    args = parser.parse_args()
+
+    from server import configure_logging
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = args.output or os.path.join(tmp, "benchmark.log")
+        print(f"{args.sessions} sessions x {args.messages} transcriptions, logging to {output}")
+        print(f"{'setup':>14} {'msgs/sec':>10} {'max lag ms':>11} {'log lines':>10}")
+        for name in args.setups.split(","):
+            level, fmt, use_queue, log_sample = SETUPS[name]
+            with open(output, "w", encoding="utf-8") as stream:
+                listener = configure_logging(level, fmt, use_queue, stream)
+                rate, lag_ms = asyncio.run(run_setup(args.sessions, args.messages, log_sample))
+                if listener is not None:
+                    listener.stop()
+                logging.getLogger().handlers.clear()
+            with open(output, encoding="utf-8") as stream:
+                lines = sum(1 for _ in stream)
+            print(f"{name:>14} {rate:>10.0f} {lag_ms:>11.2f} {lines:>10}")
+
+
+if __name__ == "__main__":
+    main()
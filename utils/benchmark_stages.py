@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the stages of one translation for short kiosk utterances:
+the generic pipeline("translation") wrapper against the direct model calls
+OfflineTranslator makes (batched encode with the token cache, reusable input
+buffers, generate under torch.inference_mode, batch_decode).
+Both paths use the same generation settings, so only per-call overhead differs.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UTTERANCES = {
+    "en": ["Yes.", "Gate B12.", "Thank you!", "Your passport, please.", "Breakfast is at seven."],
+    "es": ["Sí.", "¿Dónde está el baño?", "Gracias.", "¿Cuánto cuesta?", "Necesito un taxi."],
+    "fr": ["Oui.", "Où sont les toilettes ?", "Merci.", "Combien ça coûte ?", "J'ai besoin d'un taxi."],
+    "de": ["Ja.", "Wo ist die Toilette?", "Danke.", "Wie viel kostet das?", "Ich brauche ein Taxi."],
+    "it": ["Sì.", "Dov'è il bagno?", "Grazie.", "Quanto costa?", "Ho bisogno di un taxi."],
+    "pt": ["Sim.", "Onde fica o banheiro?", "Obrigado.", "Quanto custa?", "Preciso de um táxi."],
+}
+
+
+def timed(stages, stage, function, *args, **kwargs):
+    """Run function, adding its duration in microseconds to stages[stage]"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    stages.setdefault(stage, []).append((time.perf_counter() - start) * 1e6)
+    return result
+
+
+def run_pipeline(translator, texts, settings, repeats):
+    """Per-stage times of pipeline("translation"): preprocess, forward, postprocess"""
+    import server
+
+    pipe = server.pipeline(
+        "translation", model=translator.model, tokenizer=translator.tokenizer, device=-1
+    )
+    stages = {}
+    for _ in range(repeats):
+        for text, (max_length, num_beams) in zip(texts, settings):
+            params = {"max_new_tokens": max_length - 1, "num_beams": num_beams}
+            preprocess_params, forward_params, postprocess_params = pipe._sanitize_parameters(**params)
+            start = time.perf_counter()
+            inputs = timed(stages, "tokenize", pipe.preprocess, text, **preprocess_params)
+            outputs = timed(stages, "generate", pipe.forward, inputs, **forward_params)
+            timed(stages, "decode", pipe.postprocess, outputs, **postprocess_params)
+            stages.setdefault("stages total", []).append((time.perf_counter() - start) * 1e6)
+            timed(stages, "call", pipe, text, **params)  # Includes the wrapper's own overhead
+    return stages
+
+
+def run_direct(translator, texts, settings, repeats, cached):
+    """Per-stage times of the direct model calls, with a cold or warm token cache"""
+    import server
+
+    stages = {}
+    for _ in range(repeats):
+        for text, (max_length, num_beams) in zip(texts, settings):
+            if not cached:
+                translator.token_cache.clear()
+            start = time.perf_counter()
+            ids = timed(stages, "tokenize", translator.encode, [text])
+            input_ids, attention_mask = timed(stages, "pad", translator._pad, ids)
+            with server.torch.inference_mode():
+                outputs = timed(
+                    stages,
+                    "generate",
+                    translator.model.generate,
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    max_length=max_length,
+                    num_beams=num_beams,
+                )
+            timed(stages, "decode", translator.tokenizer.batch_decode, outputs, skip_special_tokens=True)
+            stages.setdefault("stages total", []).append((time.perf_counter() - start) * 1e6)
+            timed(stages, "call", translator, text, max_length=max_length, num_beams=num_beams)
+    return stages
+
+
+def main(args):
+    import server
+
+    language = args.language
+    key = server.TRANSLATION_MODELS[language]["from_en" if args.from_en else "to_en"]
+    texts = UTTERANCES["en" if args.from_en else language]
+    offline = server.OfflineTranslator(cache_size=0, generation_profile=args.profile, threads=args.threads)
+    translator = offline.load_model(key)
+    if not isinstance(translator, server.Seq2SeqTranslator):
+        sys.exit(f"❌ {key} is not available locally (or torch/transformers are missing)")
+
+    settings = []
+    for token_ids in translator.encode(texts):
+        generation = server.generation_settings(len(token_ids), offline.profile_for(key))
+        settings.append((generation["max_length"], generation["num_beams"]))
+    translator(texts[:1], max_length=settings[0][0])  # Warm-up
+
+    paths = {
+        "pipeline": run_pipeline(translator, texts, settings, args.repeats),
+        "direct (cold)": run_direct(translator, texts, settings, args.repeats, cached=False),
+        "direct (cached)": run_direct(translator, texts, settings, args.repeats, cached=True),
+    }
+    results = {
+        path: {stage: round(statistics.median(values), 1) for stage, values in stages.items()}
+        for path, stages in paths.items()
+    }
+
+    print(f"📊 Model: {key} | profile: {args.profile} | torch threads: {server.torch.get_num_threads()}")
+    print(f"   {len(texts)} utterances x {args.repeats} repeats, median µs per utterance")
+    stage_names = ["tokenize", "pad", "generate", "decode", "stages total", "call"]
+    print(f"{'stage':<14}" + "".join(f"{path:>18}" for path in results))
+    for stage in stage_names:
+        print(f"{stage:<14}" + "".join(f"{results[path].get(stage, '-'):>18}" for path in results))
+
+    baseline = results["pipeline"]["call"]
+    for path in ("direct (cold)", "direct (cached)"):
+        saved = baseline - results[path]["call"]
+        print(f"⏱️  {path}: {saved:.1f} µs saved per call ({saved / baseline:.0%})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"model": key, "profile": args.profile, "results": results}, f, indent=2)
+        print(f"📁 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--language", default="es", help="Traveler language of the model pair")
+    parser.add_argument("--from-en", action="store_true", help="Benchmark the en→X model instead of X→en")
+    parser.add_argument("--profile", default="balanced", help="Generation profile (GENERATION_PROFILE)")
+    parser.add_argument("--threads", default="0", help="torch intra-op threads (TORCH_THREADS)")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per utterance")
+    parser.add_argument("--output", help="Write results as JSON")
+    main(parser.parse_args())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Compare inference backends (torch, quantized, onnx) and generation profiles
+(quality, balanced, fast) per language pair. Reports latency and agreement
+with the first backend and profile as reference, so a backend and profile
+can be chosen for each pair (see MODEL_BACKEND and GENERATION_PROFILE in
+DEPLOYMENT.md).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CORPUS = {
+    "en": [
+        "Your gate is B12.",
+        "Please show your passport.",
+        "The restaurant opens at seven in the morning.",
+        "Breakfast is included with your room.",
+        "The taxi will arrive in ten minutes.",
+        "I'm sorry, that flight has been delayed by two hours.",
+    ],
+    "es": [
+        "¿Dónde está el baño?",
+        "Gracias por su ayuda.",
+        "¿Cuánto cuesta esto?",
+        "He perdido mi pasaporte y no sé qué hacer.",
+        "Necesito un taxi para ir al aeropuerto, por favor.",
+    ],
+    "fr": [
+        "Où sont les toilettes ?",
+        "Merci pour votre aide.",
+        "Combien ça coûte ?",
+        "J'ai perdu mon passeport et je ne sais pas quoi faire.",
+        "Il me faut un taxi pour l'aéroport, s'il vous plaît.",
+    ],
+    "de": [
+        "Wo ist die Toilette?",
+        "Danke für Ihre Hilfe.",
+        "Wie viel kostet das?",
+        "Ich habe meinen Reisepass verloren und weiß nicht, was ich tun soll.",
+        "Ich brauche ein Taxi zum Flughafen, bitte.",
+    ],
+    "it": [
+        "Dov'è il bagno?",
+        "Grazie per il suo aiuto.",
+        "Quanto costa questo?",
+        "Ho perso il passaporto e non so cosa fare.",
+        "Ho bisogno di un taxi per l'aeroporto, per favore.",
+    ],
+    "pt": [
+        "Onde fica o banheiro?",
+        "Obrigado pela sua ajuda.",
+        "Quanto custa isto?",
+        "Perdi o meu passaporte e não sei o que fazer.",
+        "Preciso de um táxi para o aeroporto, por favor.",
+    ],
+}
+
+
+def token_f1(candidate: str, reference: str) -> float:
+    """Bag-of-words F1 between a translation and the reference translation"""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    common = sum(min(cand.count(token), ref.count(token)) for token in set(cand))
+    if not common:
+        return 0.0
+    precision, recall = common / len(cand), common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend, profile, model_key, sentences, repeats):
+    """Translate the sentences with one backend and profile; return outputs and latencies (ms)"""
+    from server import OfflineTranslator
+
+    translator = OfflineTranslator(backend=backend, cache_size=0, generation_profile=profile)
+    start = time.perf_counter()
+    translator.load_model(model_key)
+    load_seconds = time.perf_counter() - start
+    translator.translate_batch(model_key, sentences[:1])  # Warm-up
+
+    outputs, latencies = [], []
+    for sentence in sentences:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = translator.translate_batch(model_key, [sentence])[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+        outputs.append(output)
+
+    stats = translator.translators.stats()
+    return outputs, latencies, load_seconds, stats["models"].get(model_key, 0)
+
+
+def main(args):
+    from server import TRANSLATION_MODELS
+
+    results = []
+    for language in args.languages:
+        for direction in args.directions:
+            model_key = TRANSLATION_MODELS[language][direction]
+            sentences = CORPUS["en" if direction == "from_en" else language]
+            reference = None
+
+            for backend, profile in itertools.product(args.backends, args.profiles):
+                outputs, latencies, load_seconds, size = run_backend(
+                    backend, profile, model_key, sentences, args.repeats
+                )
+                if reference is None:
+                    reference = outputs  # First backend and profile are the reference
+                latencies.sort()
+                results.append(
+                    {
+                        "model": model_key,
+                        "backend": backend,
+                        "profile": profile,
+                        "load_seconds": round(load_seconds, 3),
+                        "size_mb": round(size / 1024 / 1024, 1),
+                        "mean_ms": round(statistics.mean(latencies), 2),
+                        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+                        "exact_match": sum(o == r for o, r in zip(outputs, reference)) / len(outputs),
+                        "token_f1": round(
+                            statistics.mean(token_f1(o, r) for o, r in zip(outputs, reference)), 3
+                        ),
+                    }
+                )
+
+    print(
+        f"{'model':<30} {'backend':<10} {'profile':<9} {'size MB':>8} {'mean ms':>8} {'p95 ms':>8} "
+        f"{'exact':>6} {'F1':>6}"
+    )
+    for row in results:
+        print(
+            f"{row['model']:<30} {row['backend']:<10} {row['profile']:<9} {row['size_mb']:>8} {row['mean_ms']:>8} "
+            f"{row['p95_ms']:>8} {row['exact_match']:>6.2f} {row['token_f1']:>6.3f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📁 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--languages", default="es,fr,de,it,pt", type=lambda v: v.split(","))
+    parser.add_argument("--directions", default="to_en,from_en", type=lambda v: v.split(","))
+    parser.add_argument(
+        "--backends",
+        default="torch,quantized,onnx",
+        type=lambda v: v.split(","),
+        help="Backends to compare; the first is the accuracy reference",
+    )
+    parser.add_argument(
+        "--profiles",
+        default="balanced",
+        type=lambda v: v.split(","),
+        help='Generation profiles to compare per backend, e.g. "quality,balanced,fast" (first is the reference)',
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per sentence")
+    parser.add_argument("--output", help="Write results as JSON")
+    main(parser.parse_args())
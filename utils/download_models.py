@@ -1,143 +1,424 @@
 #!/usr/bin/env python3
 """
-Pre-download translation models for offline deployment.
+Provision translation models for offline deployment.
 Run this script with internet connection to prepare for offline use.
+
+Downloads models in parallel and resumes interrupted work. Each downloaded
+file is checked against the checksum the Hub publishes for it (SHA-256 for
+LFS files, the git blob id for the rest) before the model is recorded in a
+manifest of file sizes and SHA-256 checksums in the model cache. Later runs
+verify against that manifest without loading anything into torch. Packs offline bundles holding only
+the languages a site needs.
+
+    python utils/download_models.py                          # Download every model
+    python utils/download_models.py download --models es,fr  # Same specs as PRELOAD_MODELS
+    python utils/download_models.py verify [--quick]
+    python utils/download_models.py size
+    python utils/download_models.py bundle --models es -o site-es.tar
+    python utils/download_models.py unpack site-es.tar
+
+Set HF_ENDPOINT to download from a mirror, such as utils/model_file_server.py.
 """
 
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import json
 import os
 import sys
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-
-# Model cache directory
-MODELS_CACHE_DIR = os.environ.get("TRANSFORMERS_CACHE", "./models")
-
-# Available offline translation models
-TRANSLATION_MODELS = [
-    "Helsinki-NLP/opus-mt-es-en",  # Spanish to English
-    "Helsinki-NLP/opus-mt-en-es",  # English to Spanish
-    "Helsinki-NLP/opus-mt-fr-en",  # French to English
-    "Helsinki-NLP/opus-mt-en-fr",  # English to French
-    "Helsinki-NLP/opus-mt-de-en",  # German to English
-    "Helsinki-NLP/opus-mt-en-de",  # English to German
-    "Helsinki-NLP/opus-mt-it-en",  # Italian to English
-    "Helsinki-NLP/opus-mt-en-it",  # English to Italian
-    "Helsinki-NLP/opus-mt-pt-en",  # Portuguese to English
-    "Helsinki-NLP/opus-mt-en-pt",  # English to Portuguese
-]
-
-
-def download_models():
-    """Download all translation models for offline use"""
-    os.makedirs(MODELS_CACHE_DIR, exist_ok=True)
-
-    print(f"📦 Downloading translation models to: {MODELS_CACHE_DIR}")
-    print(f"🌐 Total models to download: {len(TRANSLATION_MODELS)}")
-    print("⚠️  This requires internet connection and will take some time...")
-    print()
-
-    for i, model_name in enumerate(TRANSLATION_MODELS, 1):
-        try:
-            print(f"[{i}/{len(TRANSLATION_MODELS)}] 📥 Downloading {model_name}...")
+import tarfile
+import threading
+import time
+from typing import Any, Dict, List
 
-            # Download tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(
-                model_name, cache_dir=MODELS_CACHE_DIR
-            )
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-            # Download model
-            model = AutoModelForSeq2SeqLM.from_pretrained(
-                model_name, cache_dir=MODELS_CACHE_DIR
-            )
+from server import MODELS_CACHE_DIR, resolve_preload_models, write_json_atomic  # noqa: E402
 
-            print(f"✅ Successfully downloaded {model_name}")
+MANIFEST_NAME = "manifest.json"
 
-        except Exception as e:
-            print(f"❌ Failed to download {model_name}: {e}")
-            return False
+# Files the PyTorch pipelines need; TensorFlow, Flax and Rust weights are skipped
+MODEL_FILE_PATTERNS = ["*.json", "*.spm", "*.txt", "*.model", "*.bin", "*.safetensors"]
 
-    print()
-    print("🎉 All models downloaded successfully!")
-    print(f"📁 Models cached in: {MODELS_CACHE_DIR}")
-    print("🔒 Your translation server can now run completely offline!")
-    return True
+
+def resolve_models(spec: str) -> List[str]:
+    """Model keys for a spec: "all", languages/directions ("es,fr:to_en") or full keys"""
+    model_keys = []
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        for model_key in [item] if "/" in item else resolve_preload_models(item):
+            if model_key not in model_keys:
+                model_keys.append(model_key)
+    return model_keys
+
+
+def model_cache_dir(cache_dir: str, model_key: str) -> str:
+    """Hugging Face cache folder of a model (the layout transformers reads)"""
+    return os.path.join(cache_dir, "models--" + model_key.replace("/", "--"))
+
+
+def snapshot_dir(cache_dir: str, model_key: str, revision: str) -> str:
+    return os.path.join(model_cache_dir(cache_dir, model_key), "snapshots", revision)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def git_blob_id(path: str) -> str:
+    """Git blob id of a file, which the Hub publishes for files not stored in LFS"""
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe_snapshot(path: str) -> Dict[str, Dict[str, Any]]:
+    """Size and checksum of every file in a snapshot, keyed by relative path"""
+    files = {}
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(full_path, path).replace(os.sep, "/")
+            files[relative] = {"size": os.path.getsize(full_path), "sha256": hash_file(full_path)}
+    return files
 
 
-def verify_offline_models():
-    """Verify that models can be loaded in offline mode"""
-    print("🔍 Verifying offline models...")
+def check_published(model_key: str, revision: str, path: str, files: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Problems with downloaded files compared to the checksums the Hub publishes for the revision"""
+    from huggingface_hub import HfApi
 
-    for model_name in TRANSLATION_MODELS:
+    info = HfApi().model_info(model_key, revision=revision, files_metadata=True)
+    published = {sibling.rfilename: sibling for sibling in info.siblings or []}
+    problems = []
+    for relative, local in files.items():
+        sibling = published.get(relative)
+        if sibling is None:
+            problems.append(f"{relative}: not published in revision {revision}")
+        elif sibling.lfs is not None:
+            if local["sha256"] != sibling.lfs.sha256:
+                problems.append(f"{relative}: SHA-256 {local['sha256']}, published {sibling.lfs.sha256}")
+        elif sibling.blob_id is None:
+            problems.append(f"{relative}: no published checksum")
+        elif git_blob_id(os.path.join(path, relative)) != sibling.blob_id:
+            problems.append(f"{relative}: git blob id differs from the published {sibling.blob_id}")
+    return problems
+
+
+def discard_files(path: str, relatives: List[str]):
+    """Remove downloaded files (and the blobs they link to) so the next run fetches them again"""
+    for relative in relatives:
+        full_path = os.path.join(path, relative)
+        blob = os.path.realpath(full_path)
+        for target in {full_path, blob}:
+            if os.path.lexists(target):
+                os.remove(target)
+
+
+def load_manifest(cache_dir: str) -> Dict[str, Any]:
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 1, "models": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(cache_dir: str, manifest: Dict[str, Any]):
+    """Write the manifest atomically, so an interrupted run never leaves it half-written"""
+    manifest["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    write_json_atomic(os.path.join(cache_dir, MANIFEST_NAME), manifest, indent=2, sort_keys=True)
+
+
+def verify_model(cache_dir: str, model_key: str, entry: Dict[str, Any], checksums: bool = True) -> List[str]:
+    """Problems with a model's files compared to its manifest entry (empty if it is intact)"""
+    snapshot = snapshot_dir(cache_dir, model_key, entry["revision"])
+    problems = []
+    for relative, expected in entry["files"].items():
+        path = os.path.join(snapshot, relative)
+        if not os.path.exists(path):
+            problems.append(f"{relative}: missing")
+        elif os.path.getsize(path) != expected["size"]:
+            problems.append(f"{relative}: {os.path.getsize(path)} bytes, expected {expected['size']}")
+        elif checksums and hash_file(path) != expected["sha256"]:
+            problems.append(f"{relative}: checksum mismatch")
+    return problems
+
+
+def download_model(model_key: str, cache_dir: str, retries: int, file_workers: int) -> Dict[str, Any]:
+    """Download (or resume) one model, check it against the Hub and describe it for the manifest"""
+    from huggingface_hub import snapshot_download
+
+    for attempt in range(1, retries + 1):
         try:
-            # Test loading in offline mode
-            tokenizer = AutoTokenizer.from_pretrained(
-                model_name, cache_dir=MODELS_CACHE_DIR, local_files_only=True
-            )
-            model = AutoModelForSeq2SeqLM.from_pretrained(
-                model_name, cache_dir=MODELS_CACHE_DIR, local_files_only=True
+            path = snapshot_download(
+                model_key,
+                cache_dir=cache_dir,
+                allow_patterns=MODEL_FILE_PATTERNS,
+                max_workers=file_workers,
             )
-            print(f"✅ {model_name} - OK")
-
+            break
         except Exception as e:
-            print(f"❌ {model_name} - FAILED: {e}")
-            return False
+            if attempt == retries:
+                raise
+            delay = 2 ** attempt
+            print(f"⚠️  {model_key}: attempt {attempt} failed ({e}), resuming in {delay}s")
+            time.sleep(delay)
 
-    print("🎉 All models verified for offline use!")
-    return True
+    revision = os.path.basename(path)
+    files = describe_snapshot(path)
+    problems = check_published(model_key, revision, path, files)
+    if problems:
+        discard_files(path, [problem.split(":")[0] for problem in problems])
+        raise ValueError(f"downloaded files do not match the Hub: {'; '.join(problems)}")
+    return {
+        "revision": revision,
+        "files": files,
+        "bytes": sum(file["size"] for file in files.values()),
+    }
 
 
-def get_cache_size():
-    """Get the total size of the model cache"""
-    total_size = 0
-    if os.path.exists(MODELS_CACHE_DIR):
-        for dirpath, dirnames, filenames in os.walk(MODELS_CACHE_DIR):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                total_size += os.path.getsize(filepath)
+def download_models(
+    model_keys: List[str],
+    cache_dir: str = MODELS_CACHE_DIR,
+    jobs: int = 4,
+    retries: int = 3,
+    file_workers: int = 4,
+    force: bool = False,
+) -> List[str]:
+    """Download models in parallel, recording each in the manifest as it completes.
+
+    Models already in the manifest with intact files are skipped, so rerunning
+    after an interruption only fetches what is missing. Returns the failures.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+    manifest_lock = threading.Lock()
+
+    pending = []
+    for model_key in model_keys:
+        entry = manifest["models"].get(model_key)
+        if not force and entry and not verify_model(cache_dir, model_key, entry, checksums=False):
+            print(f"✅ {model_key} already downloaded")
+        else:
+            pending.append(model_key)
 
-    # Convert to human readable format
+    print(f"📦 Downloading {len(pending)} models to: {cache_dir} ({jobs} at a time)")
+    failures = []
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(download_model, model_key, cache_dir, retries, file_workers): model_key
+            for model_key in pending
+        }
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            model_key = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"[{done}/{len(pending)}] ❌ Failed to download {model_key}: {e}")
+                failures.append(model_key)
+                continue
+            with manifest_lock:
+                manifest["models"][model_key] = entry
+                save_manifest(cache_dir, manifest)
+            print(f"[{done}/{len(pending)}] ✅ {model_key} ({format_size(entry['bytes'])})")
+
+    print(f"⏱️  Finished in {time.perf_counter() - start:.1f}s")
+    return failures
+
+
+def verify_offline_models(
+    model_keys: List[str], cache_dir: str = MODELS_CACHE_DIR, checksums: bool = True, jobs: int = 4
+) -> bool:
+    """Check model files against the manifest; nothing is loaded into torch"""
+    manifest = load_manifest(cache_dir)
+    print(f"🔍 Verifying {len(model_keys)} models ({'checksums' if checksums else 'sizes only'})...")
+
+    def check(model_key):
+        entry = manifest["models"].get(model_key)
+        if entry is None:
+            return ["not in the manifest (run download)"]
+        return verify_model(cache_dir, model_key, entry, checksums)
+
+    ok = True
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        for model_key, problems in zip(model_keys, pool.map(check, model_keys)):
+            if problems:
+                ok = False
+                print(f"❌ {model_key} - FAILED: {'; '.join(problems)}")
+            else:
+                print(f"✅ {model_key} - OK")
+
+    if ok:
+        print("🎉 All models verified for offline use!")
+    return ok
+
+
+def format_size(total_size: int) -> str:
     if total_size > 1024 * 1024 * 1024:  # GB
-        size_str = f"{total_size / (1024 * 1024 * 1024):.2f} GB"
-    elif total_size > 1024 * 1024:  # MB
-        size_str = f"{total_size / (1024 * 1024):.2f} MB"
+        return f"{total_size / (1024 * 1024 * 1024):.2f} GB"
+    if total_size > 1024 * 1024:  # MB
+        return f"{total_size / (1024 * 1024):.2f} MB"
+    return f"{total_size / 1024:.2f} KB"
+
+
+def get_cache_size(cache_dir: str = MODELS_CACHE_DIR) -> str:
+    """Size of the provisioned models, from the manifest when there is one"""
+    manifest = load_manifest(cache_dir)
+    if manifest["models"]:
+        total_size = sum(entry["bytes"] for entry in manifest["models"].values())
     else:
-        size_str = f"{total_size / 1024:.2f} KB"
+        total_size = 0
+        for dirpath, _, filenames in os.walk(cache_dir):
+            for filename in filenames:
+                total_size += os.path.getsize(os.path.join(dirpath, filename))
+    return format_size(total_size)
 
-    return size_str
 
+def build_bundle(model_keys: List[str], output: str, cache_dir: str = MODELS_CACHE_DIR) -> bool:
+    """Pack the given models and their manifest entries into a tar for offline sites"""
+    manifest = load_manifest(cache_dir)
+    missing = [key for key in model_keys if key not in manifest["models"]]
+    if missing:
+        print(f"❌ Not downloaded: {', '.join(missing)}")
+        return False
+    if not verify_offline_models(model_keys, cache_dir, checksums=False):
+        return False
 
-if __name__ == "__main__":
-    print("🚀 Translation Model Downloader")
-    print("=" * 50)
+    bundle_manifest = {"version": 1, "models": {key: manifest["models"][key] for key in model_keys}}
+    mode = "w:gz" if output.endswith((".gz", ".tgz")) else "w"
+    with tarfile.open(output, mode) as bundle:
+        for model_key in model_keys:
+            revision = manifest["models"][model_key]["revision"]
+            model_dir = model_cache_dir(cache_dir, model_key)
+            snapshot = snapshot_dir(cache_dir, model_key, revision)
+            paths = [os.path.join(model_dir, "refs", "main")]
+            for dirpath, _, filenames in os.walk(snapshot):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    paths.append(path)
+                    if os.path.islink(path):
+                        paths.append(os.path.realpath(path))  # The blob it points to
+            for path in paths:
+                if os.path.exists(path):
+                    bundle.add(path, arcname=os.path.relpath(path, cache_dir), recursive=False)
 
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "verify":
-            verify_offline_models()
-            print(f"📊 Cache size: {get_cache_size()}")
-            sys.exit(0)
-        elif sys.argv[1] == "size":
-            print(f"📊 Current cache size: {get_cache_size()}")
-            sys.exit(0)
+        data = json.dumps(bundle_manifest, indent=2, sort_keys=True).encode()
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        bundle.addfile(info, io.BytesIO(data))
 
-    # Download models
-    success = download_models()
+    total = sum(entry["bytes"] for entry in bundle_manifest["models"].values())
+    print(f"📦 Wrote {output}: {len(model_keys)} models, {format_size(total)}")
+    return True
 
-    if success:
-        print()
-        print("🔍 Verifying downloaded models...")
-        if verify_offline_models():
-            print(f"📊 Total cache size: {get_cache_size()}")
-            print()
-            print(
-                "🎯 Setup complete! Your translation server is ready for offline deployment."
-            )
-            print("💡 You can now:")
-            print("   1. Build Docker image: docker build -t translation-server .")
-            print("   2. Run offline: python server.py")
-        else:
-            print(
-                "⚠️ Some models failed verification. Check your internet connection and try again."
-            )
-            sys.exit(1)
+
+def unpack_bundle(bundle_path: str, cache_dir: str = MODELS_CACHE_DIR) -> bool:
+    """Extract a bundle into the cache, verify it and merge its manifest"""
+    os.makedirs(cache_dir, exist_ok=True)
+    root = os.path.realpath(cache_dir)
+    with tarfile.open(bundle_path) as bundle:
+        bundle_manifest = json.load(bundle.extractfile(MANIFEST_NAME))
+        members = []
+        for member in bundle.getmembers():
+            if member.name == MANIFEST_NAME:
+                continue
+            target = os.path.realpath(os.path.join(root, member.name))
+            link_target = os.path.realpath(os.path.join(os.path.dirname(target), member.linkname))
+            if not target.startswith(root + os.sep) or (member.issym() and not link_target.startswith(root + os.sep)):
+                print(f"❌ Refusing to extract {member.name}: outside the model cache")
+                return False
+            if member.isfile() or member.issym() or member.isdir():
+                members.append(member)
+        for member in members:
+            if member.issym() and os.path.lexists(os.path.join(root, member.name)):
+                os.remove(os.path.join(root, member.name))  # tarfile will not replace a symlink
+        bundle.extractall(root, members=members)
+
+    model_keys = list(bundle_manifest["models"])
+    manifest = load_manifest(cache_dir)
+    manifest["models"].update(bundle_manifest["models"])
+    save_manifest(cache_dir, manifest)
+    return verify_offline_models(model_keys, cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provision translation models for offline use")
+    parser.add_argument("--cache-dir", default=MODELS_CACHE_DIR, help="Model cache (TRANSFORMERS_CACHE)")
+    commands = parser.add_subparsers(dest="command")
+
+    download = commands.add_parser("download", help="Download models (the default command)")
+    download.add_argument(
+        "--models",
+        default="all",
+        help='"all", languages/directions as in PRELOAD_MODELS ("es,fr:to_en") or full model keys',
+    )
+    download.add_argument("--jobs", type=int, default=4, help="Models downloaded at once")
+    download.add_argument("--file-workers", type=int, default=4, help="Files downloaded at once per model")
+    download.add_argument("--retries", type=int, default=3, help="Attempts per model; each resumes the last")
+    download.add_argument("--force", action="store_true", help="Download even if the manifest says complete")
+
+    verify = commands.add_parser("verify", help="Check files against the manifest")
+    verify.add_argument("--models", help="Models to check (default: everything in the manifest)")
+    verify.add_argument("--quick", action="store_true", help="Compare sizes only, skip checksums")
+
+    commands.add_parser("size", help="Total size of the provisioned models")
+
+    bundle = commands.add_parser("bundle", help="Pack models for an offline site")
+    bundle.add_argument("--models", required=True, help="Models to include, as for download")
+    bundle.add_argument("-o", "--output", required=True, help="Bundle file (.tar, or .tar.gz to compress)")
+
+    unpack = commands.add_parser("unpack", help="Install a bundle into the model cache and verify it")
+    unpack.add_argument("bundle", help="Bundle file")
+
+    args = parser.parse_args()
+    cache_dir = args.cache_dir
+
+    print("🚀 Translation Model Provisioning")
+    print("=" * 50)
+
+    if args.command == "verify":
+        model_keys = resolve_models(args.models) if args.models else list(load_manifest(cache_dir)["models"])
+        ok = verify_offline_models(model_keys, cache_dir, checksums=not args.quick)
+        print(f"📊 Cache size: {get_cache_size(cache_dir)}")
+        sys.exit(0 if ok else 1)
+    elif args.command == "size":
+        print(f"📊 Current cache size: {get_cache_size(cache_dir)}")
+    elif args.command == "bundle":
+        sys.exit(0 if build_bundle(resolve_models(args.models), args.output, cache_dir) else 1)
+    elif args.command == "unpack":
+        sys.exit(0 if unpack_bundle(args.bundle, cache_dir) else 1)
     else:
-        print("❌ Model download failed. Check your internet connection and try again.")
-        sys.exit(1)
+        options = args if args.command == "download" else download.parse_args([])
+        print("⚠️  This requires internet connection (or HF_ENDPOINT pointing at a mirror)")
+        failures = download_models(
+            resolve_models(options.models),
+            cache_dir,
+            jobs=options.jobs,
+            retries=options.retries,
+            file_workers=options.file_workers,
+            force=options.force,
+        )
+        print(f"📊 Total cache size: {get_cache_size(cache_dir)}")
+        if failures:
+            print(f"❌ {len(failures)} models failed: {', '.join(failures)}")
+            print("💡 Run the same command again to resume")
+            sys.exit(1)
+        print()
+        print("🎯 Setup complete! Your translation server is ready for offline deployment.")
+        print("💡 You can now:")
+        print("   1. Build Docker image: docker build -t translation-server .")
+        print("   2. Run offline: python start_server.py")
+
+
+if __name__ == "__main__":
+    main()
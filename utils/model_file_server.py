@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Hugging Face Hub file endpoints, for testing model
+provisioning without internet access (or serving a site-local mirror).
+Serves model repos laid out as <root>/<org>/<name>/<files>:
+
+    python utils/model_file_server.py --root ./mirror --fake es,fr --port 8080
+    HF_ENDPOINT=http://localhost:8080 python utils/download_models.py download --models es,fr
+
+--flaky cuts the first download of every file halfway, to exercise resuming.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Files the Hub stores in LFS, published with a SHA-256; the rest get a git blob id
+LFS_SUFFIXES = (".bin", ".safetensors", ".model", ".spm")
+
+# Files of a Marian (opus-mt) repo; the weights file gets the requested size
+FAKE_FILES = {
+    "config.json": lambda model_key, size: json.dumps({"_name_or_path": model_key, "model_type": "marian"}).encode(),
+    "generation_config.json": lambda model_key, size: b'{"max_length": 512}',
+    "tokenizer_config.json": lambda model_key, size: b'{"model_max_length": 512}',
+    "vocab.json": lambda model_key, size: b'{"<pad>": 0, "</s>": 1, "<unk>": 2}',
+    "source.spm": lambda model_key, size: hashlib.sha256(f"{model_key}/source".encode()).digest() * 64,
+    "target.spm": lambda model_key, size: hashlib.sha256(f"{model_key}/target".encode()).digest() * 64,
+    "pytorch_model.bin": lambda model_key, size: _pseudo_random_bytes(model_key, size),
+}
+
+
+def _pseudo_random_bytes(seed: str, size: int) -> bytes:
+    """Deterministic filler, so every run serves the same checksums"""
+    block = hashlib.sha256(seed.encode()).digest()
+    chunks = []
+    for i in range((size + len(block) - 1) // len(block)):
+        chunks.append(hashlib.sha256(block + i.to_bytes(8, "big")).digest())
+    return b"".join(chunks)[:size]
+
+
+def create_fake_repos(root: str, model_keys, weights_size: int):
+    """Write placeholder repos for model keys that are not under root yet"""
+    for model_key in model_keys:
+        repo_dir = os.path.join(root, *model_key.split("/"))
+        if os.path.isdir(repo_dir):
+            continue
+        os.makedirs(repo_dir)
+        for filename, make in FAKE_FILES.items():
+            with open(os.path.join(repo_dir, filename), "wb") as f:
+                f.write(make(model_key, weights_size))
+        print(f"Created fake repo {model_key}")
+
+
+class Repo:
+    """Listing, sizes, checksums and a stable commit id of one served repo"""
+
+    def __init__(self, path: str):
+        self.files = {}
+        self.blob_ids = {}
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(full_path, path).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                self.blob_ids[relative] = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+                self.files[relative] = (full_path, os.path.getsize(full_path), digest)
+        listing = "".join(f"{name}:{digest}\n" for name, (_, _, digest) in sorted(self.files.items()))
+        self.commit = hashlib.sha1(listing.encode()).hexdigest()
+
+
+class ModelFileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ModelFileServer/1.0"
+
+    API_ROUTE = re.compile(r"^/api/models/([^/]+/[^/]+)(?:/revision/([^/]+))?/?$")
+    TREE_ROUTE = re.compile(r"^/api/models/([^/]+/[^/]+)/tree/([^/]+)/?$")
+    RESOLVE_ROUTE = re.compile(r"^/([^/]+/[^/]+)/resolve/([^/]+)/(.+)$")
+
+    def repo(self, repo_id: str):
+        return self.server.repo(repo_id)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def handle_request(self, send_body: bool):
+        path = self.path.split("?")[0]
+        api = self.API_ROUTE.match(path)
+        tree = self.TREE_ROUTE.match(path)
+        resolve = self.RESOLVE_ROUTE.match(path)
+        if api or tree:
+            repo_id = (api or tree).group(1)
+            repo = self.repo(repo_id)
+            if repo is None:
+                return self.send_text(404, "Repository not found", send_body)
+            if api:
+                listing = {
+                    "id": repo_id,
+                    "modelId": repo_id,
+                    "sha": repo.commit,
+                    "private": False,
+                    "siblings": [
+                        {
+                            "rfilename": name,
+                            "size": size,
+                            "blobId": repo.blob_ids[name],
+                            "lfs": (
+                                {"sha256": digest, "size": size, "pointerSize": 134}
+                                if name.endswith(LFS_SUFFIXES)
+                                else None
+                            ),
+                        }
+                        for name, (_, size, digest) in sorted(repo.files.items())
+                    ],
+                }
+            else:
+                listing = [
+                    {"type": "file", "path": name, "size": size, "oid": digest[:40]}
+                    for name, (_, size, digest) in sorted(repo.files.items())
+                ]
+            self.send_json(listing, send_body)
+        elif resolve:
+            repo = self.repo(resolve.group(1))
+            entry = repo.files.get(resolve.group(3)) if repo is not None else None
+            if entry is None:
+                return self.send_text(404, "Entry not found", send_body)
+            self.send_file(repo, *entry, send_body=send_body)
+        else:
+            self.send_text(404, "Not found", send_body)
+
+    def send_file(self, repo: Repo, full_path: str, size: int, digest: str, send_body: bool):
+        start = 0
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match:
+            start = min(int(match.group(1)), size)
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{digest}"')
+        self.send_header("X-Repo-Commit", repo.commit)
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.end_headers()
+        if not send_body:
+            return
+
+        with open(full_path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        if self.server.cut_first_download(full_path) and len(data) > 1:
+            self.wfile.write(data[: len(data) // 2])
+            self.close_connection = True
+            self.log_message("Cut %s halfway (--flaky)", self.path)
+            return
+        self.wfile.write(data)
+
+    def send_json(self, payload, send_body: bool):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_text(self, status: int, text: str, send_body: bool):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class ModelFileServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, root: str, flaky: bool):
+        super().__init__(address, ModelFileHandler)
+        self.root = root
+        self.flaky = flaky
+        self.repos = {}
+        self.cut = set()
+        self.lock = threading.Lock()
+
+    def repo(self, repo_id: str):
+        with self.lock:
+            if repo_id not in self.repos:
+                path = os.path.join(self.root, *repo_id.split("/"))
+                self.repos[repo_id] = Repo(path) if os.path.isdir(path) else None
+            return self.repos[repo_id]
+
+    def cut_first_download(self, path: str) -> bool:
+        with self.lock:
+            if not self.flaky or path in self.cut:
+                return False
+            self.cut.add(path)
+            return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve model repos like the Hugging Face Hub")
+    parser.add_argument("--root", required=True, help="Directory of <org>/<name>/ repos")
+    parser.add_argument("--host", default="localhost", help="Bind address")
+    parser.add_argument("--port", type=int, default=8080, help="Port")
+    parser.add_argument(
+        "--fake",
+        default="",
+        help='Create placeholder repos first: "all", languages ("es,fr") or full model keys',
+    )
+    parser.add_argument("--fake-size-kb", type=int, default=512, help="Size of each fake weights file")
+    parser.add_argument("--flaky", action="store_true", help="Cut the first download of every file halfway")
+    args = parser.parse_args()
+
+    if args.fake:
+        from download_models import resolve_models
+
+        create_fake_repos(args.root, resolve_models(args.fake), args.fake_size_kb * 1024)
+
+    server = ModelFileServer((args.host, args.port), args.root, args.flaky)
+    print(f"Serving {args.root} on http://{args.host}:{args.port} (set HF_ENDPOINT to this URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
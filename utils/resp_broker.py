@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for Redis pub/sub (SUBSCRIBE, UNSUBSCRIBE, PUBLISH, PING).
+Lets several translation server nodes share MESSAGE_BUS=redis://localhost:6379
+on a development box without installing Redis.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import _read_resp  # noqa: E402
+
+
+def _encode(value) -> bytes:
+    """Encode a reply in RESP"""
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+    data = value.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class Broker:
+    def __init__(self):
+        self.channels = {}  # channel -> set of writers
+
+    async def handle(self, reader, writer):
+        subscribed = set()
+        try:
+            while True:
+                command = await _read_resp(reader)
+                if not isinstance(command, list) or not command:
+                    continue
+                name, args = command[0].upper(), command[1:]
+
+                if name == "SUBSCRIBE":
+                    for channel in args:
+                        self.channels.setdefault(channel, set()).add(writer)
+                        subscribed.add(channel)
+                        writer.write(_encode(["subscribe", channel, len(subscribed)]))
+                elif name == "UNSUBSCRIBE":
+                    for channel in args or list(subscribed):
+                        self.channels.get(channel, set()).discard(writer)
+                        subscribed.discard(channel)
+                        writer.write(_encode(["unsubscribe", channel, len(subscribed)]))
+                elif name == "PUBLISH":
+                    channel, message = args
+                    receivers = self.channels.get(channel, set())
+                    for receiver in receivers:
+                        receiver.write(_encode(["message", channel, message]))
+                    writer.write(_encode(len(receivers)))
+                elif name == "PING":
+                    writer.write(b"+PONG\r\n")
+                else:
+                    writer.write(f"-ERR unknown command '{name}'\r\n".encode())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+
+async def main(host, port):
+    broker = Broker()
+    server = await asyncio.start_server(broker.handle, host, port)
+    print(f"📡 RESP pub/sub broker listening on redis://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Broker stopped")
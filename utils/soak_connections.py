@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Soak test for large kiosk fleets: holds thousands of mostly-idle WebSocket
+connections (traveler/assistant pairs that only send set_role) while a few
+active sessions keep translating. Reports the server's memory per
+connection, latency of the active traffic, connections lost while idle,
+and whether sessions were freed after everyone disconnected.
+
+Starts `server.py` in a subprocess (mock translations by default), or
+targets a running server with --url (pass --pid to measure its memory).
+Compare connection policies with --server-env, e.g. WS_COMPRESSION=none.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from benchmark_load import CORPUS, git_commit, percentiles, start_server  # noqa: E402
+
+
+def rss_bytes(pid):
+    """Resident memory of a process (Linux /proc), or None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+async def connect(url, session_id, role, language, compression):
+    """Open one connection and join a session; browsers do not ping, so neither do we"""
+    websocket = await websockets.connect(url, compression=compression, ping_interval=None, max_size=None)
+    await websocket.send(
+        json.dumps({"type": "set_role", "role": role, "session_id": session_id, "language": language})
+    )
+    return websocket
+
+
+async def open_fleet(args, url):
+    """Idle traveler/assistant pairs, connected args.connect_batch at a time"""
+    compression = None if args.client_compression == "none" else "deflate"
+    connections, failures = [], 0
+    for start in range(0, args.connections, args.connect_batch):
+        batch = []
+        for i in range(start, min(start + args.connect_batch, args.connections)):
+            role = "traveler" if i % 2 == 0 else "assistant"
+            language = args.traveler_language if role == "traveler" else "en"
+            batch.append(connect(url, f"idle-{i // 2}", role, language, compression))
+        for result in await asyncio.gather(*batch, return_exceptions=True):
+            if isinstance(result, Exception):
+                failures += 1
+            else:
+                connections.append(result)
+    return connections, failures
+
+
+async def active_session(args, url, index, latencies, deadline):
+    """A traveler and an assistant taking turns until the deadline"""
+    session_id = f"active-{index}"
+    traveler = await connect(url, session_id, "traveler", args.traveler_language, "deflate")
+    assistant = await connect(url, session_id, "assistant", "en", "deflate")
+    turn = 0
+    try:
+        while time.monotonic() < deadline:
+            speaker, language = (traveler, args.traveler_language) if turn % 2 == 0 else (assistant, "en")
+            message = {"type": "transcription", "text": CORPUS[language][turn % len(CORPUS[language])]}
+            if speaker is assistant:
+                message["traveler_language"] = args.traveler_language
+            sent = time.perf_counter()
+            await speaker.send(json.dumps(message))
+            while True:  # Skip broadcasts from the previous turn
+                data = json.loads(await asyncio.wait_for(speaker.recv(), args.timeout))
+                if data.get("type") in ("transcription_sent", "response_sent", "overloaded"):
+                    break
+            latencies.append(time.perf_counter() - sent)
+            turn += 1
+            await asyncio.sleep(args.interval)
+    finally:
+        await traveler.close()
+        await assistant.close()
+
+
+async def scrape_gauge(metrics_url, name):
+    """One unlabelled sample from the /metrics endpoint, or None"""
+    if not metrics_url:
+        return None
+    host, _, port = metrics_url.rpartition(":")
+    reader, writer = await asyncio.open_connection(host, int(port))
+    writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    body = (await reader.read()).decode()
+    writer.close()
+    for line in body.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return None
+
+
+async def run_soak(args, url, pid, metrics_url):
+    memory = {"baseline": rss_bytes(pid) if pid else None}
+
+    start = time.perf_counter()
+    fleet, failures = await open_fleet(args, url)
+    connect_seconds = time.perf_counter() - start
+    await asyncio.sleep(args.settle)
+    memory["connected"] = rss_bytes(pid) if pid else None
+
+    latencies = []
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(
+        *(active_session(args, url, i, latencies, deadline) for i in range(args.active))
+    )
+    memory["after_hold"] = rss_bytes(pid) if pid else None
+    dropped = sum(1 for websocket in fleet if websocket.close_code is not None)
+    connections_during = await scrape_gauge(metrics_url, "translation_active_connections")
+    sessions_during = await scrape_gauge(metrics_url, "translation_active_sessions")
+
+    await asyncio.gather(*(websocket.close() for websocket in fleet), return_exceptions=True)
+    await asyncio.sleep(args.settle)
+    memory["closed"] = rss_bytes(pid) if pid else None
+    connections_after = await scrape_gauge(metrics_url, "translation_active_connections")
+    sessions_after = await scrape_gauge(metrics_url, "translation_active_sessions")
+
+    per_connection = None
+    if memory["baseline"] is not None and fleet:
+        per_connection = round((memory["connected"] - memory["baseline"]) / len(fleet))
+    return {
+        "connections": len(fleet),
+        "connect_failures": failures,
+        "connect_seconds": round(connect_seconds, 2),
+        "dropped_while_idle": dropped,
+        "memory_bytes": memory,
+        "memory_per_connection_bytes": per_connection,
+        "active_messages": len(latencies),
+        "active_latency_ms": percentiles(latencies),
+        "server_connections": connections_during,
+        "server_sessions": sessions_during,
+        "server_connections_after_close": connections_after,
+        "server_sessions_after_close": sessions_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the server with many idle connections")
+    parser.add_argument("--url", help="Soak a running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="Process id of the --url server, to measure its memory")
+    parser.add_argument("--metrics-url", help="host:port of the --url server's metrics endpoint")
+    parser.add_argument("--port", type=int, default=8798, help="Port for the started server")
+    parser.add_argument("--connections", type=int, default=2000, help="Idle connections to hold")
+    parser.add_argument("--connect-batch", type=int, default=200, help="Connections opened at once")
+    parser.add_argument("--active", type=int, default=5, help="Sessions translating while the fleet idles")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between an active session's turns")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to hold the fleet")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds to wait before measuring memory")
+    parser.add_argument(
+        "--client-compression",
+        choices=["deflate", "none"],
+        default="deflate",
+        help="Whether idle clients offer permessage-deflate (browsers do)",
+    )
+    parser.add_argument("--traveler-language", default="es", help="Language travelers speak")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a confirmation")
+    parser.add_argument("--startup-timeout", type=float, default=600.0, help="Seconds to wait for the server")
+    parser.add_argument(
+        "--server-env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Environment variable for the started server (repeatable)",
+    )
+    parser.add_argument("--output", help="Write the results JSON here as well as to stdout")
+    args = parser.parse_args()
+    args.mode = "mock"
+
+    # Both ends need a descriptor per connection; the server inherits the limit
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process = log = None
+        url, pid, metrics_url = args.url, args.pid, args.metrics_url
+        if url is None:
+            metrics_port = args.port + 1
+            args.server_env = args.server_env + [f"METRICS_PORT={metrics_port}"]
+            process, log = start_server(args, workdir)
+            url, pid, metrics_url = f"ws://localhost:{args.port}", process.pid, f"localhost:{metrics_port}"
+        try:
+            results = asyncio.run(run_soak(args, url, pid, metrics_url))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+                log.close()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("url", "connections", "active", "duration", "client_compression", "server_env")
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()